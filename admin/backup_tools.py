@@ -12,11 +12,24 @@ from datetime import datetime
 from typing import Tuple
 from config import DB_PATH
 from database.operations import load_albums, load_concerts, get_database_stats
+from utils.render_profiler import profiled
 
+@profiled()
 def admin_backup_page():
-    """Admin database backup and restore page"""
-    st.subheader("🔧 Admin Tools - Database Management")
+    """Admin Tools: database management, background services and performance"""
+    st.subheader("🔧 Admin Tools")
     
+    tab_database, tab_services, tab_performance = st.tabs(["🗄️ Database", "⚙️ Services", "📈 Performance"])
+    with tab_database:
+        render_database_tools()
+    with tab_services:
+        render_service_tools()
+    with tab_performance:
+        from admin.performance import admin_performance_page
+        admin_performance_page()
+
+def render_database_tools():
+    """Database statistics, backup/restore, quick actions and bulk import"""
     # Show database statistics
     stats = get_database_stats()
     if stats:
@@ -138,7 +151,7 @@ def admin_backup_page():
     st.markdown("---")
     st.markdown("### ⚡ Quick Actions")
     
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     
     with col1:
         if st.button("💾 Create Quick Backup", key="quick_backup", use_container_width=True):
@@ -163,6 +176,212 @@ def admin_backup_page():
                 """)
             else:
                 st.error("❌ Could not verify database")
+    
+    with col3:
+        if st.button("🧬 Recompute Genre Verdicts", key="reclassify_genres", use_container_width=True,
+                     help="Re-run the metal classifier over the stored artist tags"):
+            from services.genre_classifier import reclassify_all_artists
+            count = reclassify_all_artists()
+            st.success(f"✅ Reclassified {count} artists")
+    
+    # Bulk album import
+    st.markdown("---")
+    st.markdown("### 📥 Bulk Import Albums")
+    
+    from admin.bulk_import import admin_bulk_import_page
+    admin_bulk_import_page()
+
+def render_service_tools():
+    """Status and controls of the background services and provider clients"""
+    # Related-artist graph
+    st.markdown("### 🕸️ Related-Artist Graph")
+    
+    from services.artist_graph import get_graph_stats, schedule_graph_build, GRAPH_BUILD_JOB
+    from utils.background import get_job_status, is_job_running
+    
+    graph_stats = get_graph_stats()
+    col_nodes, col_stale, col_build = st.columns(3)
+    with col_nodes:
+        st.metric("🎤 Artists in graph", graph_stats['nodes'])
+    with col_stale:
+        st.metric("⏳ Stale nodes", graph_stats['stale'])
+    with col_build:
+        if is_job_running(GRAPH_BUILD_JOB):
+            st.info("🔄 Graph build in progress...")
+        elif st.button("🕸️ Build / Refresh Graph", key="build_graph", use_container_width=True):
+            from services.spotify_service import get_spotify_client
+            from services.lastfm_service import get_lastfm_client
+            schedule_graph_build(get_spotify_client(), get_lastfm_client())
+            st.success("✅ Graph build started in the background")
+    
+    for job in get_job_status(GRAPH_BUILD_JOB):
+        if job['state'] == 'done' and job['result']:
+            st.caption(f"Last build: {job['finished_at']:%Y-%m-%d %H:%M} • "
+                       f"{job['result']['refreshed']}/{job['result']['checked']} artists refreshed")
+        elif job['state'] == 'failed':
+            st.caption(f"Last build failed: {job['last_error']}")
+    
+    # Pre-warmed discovery pool
+    st.markdown("---")
+    st.markdown("### 🎲 Discovery Pool")
+    
+    from services.discovery_pool import get_pool_stats
+    pool_stats = get_pool_stats()
+    col_depth, col_hit, col_rate, col_pools = st.columns(4)
+    with col_depth:
+        st.metric("📦 Ready (global)", pool_stats['global_depth'],
+                  help=f"{pool_stats['total_depth']} ready discoveries in total")
+    with col_hit:
+        st.metric("🎯 Hit rate", f"{pool_stats['hit_rate']:.0%}",
+                  help=f"{pool_stats['hits']} hits / {pool_stats['misses']} misses")
+    with col_rate:
+        st.metric("♻️ Refill rate", f"{pool_stats['refill_rate_per_min']:.1f}/min",
+                  help=f"{pool_stats['produced']} produced, {pool_stats['expired']} expired, {pool_stats['failed']} failed")
+    with col_pools:
+        st.metric("🎤 Artist pools", pool_stats['artist_pools'])
+    
+    # External provider budgets (shared rate-limited HTTP client)
+    st.markdown("---")
+    st.markdown("### 🌐 Provider Budgets")
+    
+    from services.http_client import get_provider_status
+    from services.circuit_breaker import get_breaker_stats
+    breakers = get_breaker_stats()
+    st.dataframe(
+        [
+            {
+                'Provider': provider,
+                'Circuit': breakers.get(provider, {}).get('state', 'closed'),
+                'Failure rate': f"{breakers.get(provider, {}).get('failure_rate', 0.0):.0%}",
+                'p95 latency (ms)': round(breakers.get(provider, {}).get('p95_latency', 0.0) * 1000),
+                'Tokens left': f"{status['tokens']:.1f} / {status['capacity']}",
+                'Rate (req/s)': status['rate'],
+                'Requests': status['requests'],
+                'Queued': status['queued'],
+                'Avg wait (ms)': round(status['avg_wait'] * 1000, 1),
+                'Max wait (ms)': round(status['max_wait'] * 1000, 1),
+                'Throttled (429)': status['throttled'],
+                'Retries': status['retries'],
+                'Errors': status['errors'],
+                'Head fetches': status['head_fetches'],
+                'KB read': round(status['bytes_read'] / 1024, 1)
+            }
+            for provider, status in get_provider_status().items()
+        ],
+        use_container_width=True,
+        hide_index=True
+    )
+
+    # Providers that reach arbitrary sites have one breaker per host
+    host_breakers = {key: stats for key, stats in breakers.items() if ':' in key}
+    if host_breakers:
+        with st.expander(f"🔌 Per-host circuits ({len(host_breakers)})"):
+            st.dataframe(
+                [
+                    {
+                        'Host': key,
+                        'Circuit': stats['state'],
+                        'Failure rate': f"{stats['failure_rate']:.0%}",
+                        'p95 latency (ms)': round(stats['p95_latency'] * 1000),
+                        'Times opened': stats['times_opened'],
+                        'Rejected': stats['rejected']
+                    }
+                    for key, stats in sorted(host_breakers.items(), key=lambda item: item[1]['state'] == 'closed')
+                ],
+                use_container_width=True,
+                hide_index=True
+            )
+
+    # Metadata extractors (per platform and source)
+    st.markdown("---")
+    st.markdown("### 🧩 Metadata Extractors")
+    
+    from services.metadata_extractor import get_extractor_stats
+    extractor_stats = get_extractor_stats()
+    if extractor_stats:
+        st.dataframe(
+            [
+                {
+                    'Platform': stats['platform'],
+                    'Source': stats['source'],
+                    'Calls': stats['calls'],
+                    'Success rate': f"{stats['hit_rate']:.0%}",
+                    'Avg (ms)': round(stats['avg_ms'], 1),
+                    'Max (ms)': round(stats['max_ms'], 1)
+                }
+                for stats in extractor_stats
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.caption("No metadata extracted since the app started.")
+    
+    # Cover thumbnail cache
+    st.markdown("---")
+    st.markdown("### 🖼️ Cover Cache")
+    
+    from services.cover_cache import get_cover_cache_stats
+    from config import COVER_CACHE_MAX_BYTES
+    cover_stats = get_cover_cache_stats()
+    if not cover_stats['enabled']:
+        st.caption("Pillow is not installed: album cards link the original cover images.")
+    else:
+        col_c1, col_c2, col_c3, col_c4 = st.columns(4)
+        with col_c1:
+            st.metric("Thumbnails", cover_stats['files'])
+        with col_c2:
+            st.metric("Size on disk", f"{cover_stats['bytes'] / (1024 * 1024):.1f} / {COVER_CACHE_MAX_BYTES / (1024 * 1024):.0f} MB")
+        with col_c3:
+            st.metric("Fetched / failed", f"{cover_stats['fetched']} / {cover_stats['failed']}")
+        with col_c4:
+            st.metric("Evicted", cover_stats['evicted'])
+    
+    # Link health (read from the database, never fetched live here)
+    st.markdown("---")
+    st.markdown("### 🩺 Link Health")
+    
+    from services.link_health import LINK_HEALTH_JOB, schedule_link_health_check
+    from database.operations import get_link_health_summary, load_broken_links
+    from utils.background import get_job_status
+    health = get_link_health_summary()
+    col_h1, col_h2, col_h3, col_h4 = st.columns(4)
+    with col_h1:
+        st.metric("Albums checked", health['checked'])
+    with col_h2:
+        st.metric("Broken links", health['broken_urls'])
+    with col_h3:
+        st.metric("Broken covers", health['broken_covers'])
+    with col_h4:
+        st.metric("Covers refreshed", health['refreshed'])
+    if health['last_checked']:
+        st.caption(f"Last check: {health['last_checked'].strftime('%Y-%m-%d %H:%M')}")
+    
+    job = next(iter(get_job_status(LINK_HEALTH_JOB)), None)
+    if job and job['state'] == 'running':
+        st.info("⏳ Link health check running in the background...")
+    elif st.button("🩺 Check Links", key="link_health_check"):
+        schedule_link_health_check()
+        st.rerun()
+    
+    broken = load_broken_links()
+    if broken:
+        st.dataframe(
+            [
+                {
+                    'Artist': item['artist'],
+                    'Album': item['album_name'],
+                    'Posted by': item['username'],
+                    'Page': {True: '✅', None: '—'}.get(item['url_ok'], f"❌ {item['url_status'] or 'host not found'}"),
+                    'Cover': {True: '✅', None: '—'}.get(item['cover_ok'], f"❌ {item['cover_status'] or 'host not found'}"),
+                    'URL': item['url'],
+                    'Checked': item['checked_at'].strftime('%Y-%m-%d %H:%M')
+                }
+                for item in broken
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
 
 def export_database_to_json() -> str:
     """Export entire database to JSON format"""
@@ -0,0 +1,105 @@
+# File: metalwall_app/admin/bulk_import.py
+# ===========================
+# ADMIN BULK ALBUM IMPORT
+# ===========================
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st
+from config import BULK_IMPORT_CONCURRENCY, BULK_IMPORT_PER_HOST, BULK_IMPORT_BATCH_SIZE
+from services.bulk_import import parse_import_list, prepare_import, run_bulk_import
+
+def admin_bulk_import_page():
+    """Import many albums at once from a pasted list or an uploaded CSV/text file"""
+    st.markdown("Paste one URL per line (optionally followed by `#tags`), or upload a CSV with `url,tags` rows.")
+
+    text = st.text_area("URLs", height=200, key="bulk_import_text",
+                        placeholder="https://band.bandcamp.com/album/record #doom #death")
+    uploaded = st.file_uploader("...or upload a file", type=['csv', 'txt'], key="bulk_import_file")
+    default_tags = st.text_input("Tags added to every album", placeholder="#import", key="bulk_import_tags")
+    concurrency = st.slider("Concurrent fetches", 1, 16, BULK_IMPORT_CONCURRENCY, key="bulk_import_concurrency")
+
+    if not st.button("📥 Import Albums", type="primary", key="bulk_import_run"):
+        return
+
+    source = uploaded.getvalue().decode('utf-8', errors='replace') if uploaded else text
+    # A .csv upload is always CSV; pasted text and .txt files only when they start with a header row
+    csv_format = True if uploaded and uploaded.name.lower().endswith('.csv') else None
+    items, skipped = prepare_import(parse_import_list(source or "", csv_format), default_tags)
+    if skipped:
+        with st.expander(f"⏭️ Skipped {len(skipped)} links"):
+            st.dataframe(skipped, use_container_width=True, hide_index=True)
+    if not items:
+        st.warning("No new album URLs to import.")
+        return
+
+    progress = st.progress(0.0, text=f"Importing {len(items)} albums...")
+    status = st.empty()
+    failures = []
+    imported = 0
+    for event in run_bulk_import(st.session_state.current_user, items, concurrency=concurrency):
+        progress.progress(event['done'] / event['total'], text=f"{event['done']} / {event['total']} links processed")
+        if event['event'] == 'fetched':
+            status.caption(f"✅ {event['artist']} — {event['album_name']}")
+        elif event['event'] == 'failed':
+            failures.append({'URL': event['url'], 'Error': event['error']})
+        elif event['event'] == 'saved':
+            imported += event['count']
+            if event.get('error'):
+                st.error(f"❌ {event['error']}")
+
+    st.success(f"✅ Imported {imported} of {len(items)} albums")
+    if failures:
+        st.error(f"❌ {len(failures)} links failed")
+        st.dataframe(failures, use_container_width=True, hide_index=True)
+
+    if imported:
+        # New wall artists need related-artist nodes for discovery
+        from services.artist_graph import schedule_graph_build
+        from services.spotify_service import get_spotify_client
+        from services.lastfm_service import get_lastfm_client
+        schedule_graph_build(get_spotify_client(), get_lastfm_client())
+
+def main():
+    """Command-line bulk import: python admin/bulk_import.py urls.csv --user Admin"""
+    parser = argparse.ArgumentParser(description="Bulk import albums into MetalWall from a list of URLs")
+    parser.add_argument('file', help="text file (one URL per line, optional #tags) or CSV with url,tags rows")
+    parser.add_argument('--user', required=True, help="username the albums are posted as")
+    parser.add_argument('--tags', default="", help="tags added to every album, e.g. '#import #doom'")
+    parser.add_argument('--concurrency', type=int, default=BULK_IMPORT_CONCURRENCY)
+    parser.add_argument('--per-host', type=int, default=BULK_IMPORT_PER_HOST)
+    parser.add_argument('--batch-size', type=int, default=BULK_IMPORT_BATCH_SIZE)
+    parser.add_argument('--dry-run', action='store_true', help="fetch metadata but don't write to the database")
+    args = parser.parse_args()
+
+    from database.init_db import init_db
+    init_db()
+
+    with open(args.file, encoding='utf-8') as f:
+        csv_format = True if args.file.lower().endswith('.csv') else None
+        items, skipped = prepare_import(parse_import_list(f.read(), csv_format), args.tags)
+    for item in skipped:
+        print(f"SKIP    {item['url']} ({item['reason']})")
+
+    imported = failed = 0
+    for event in run_bulk_import(args.user, items, concurrency=args.concurrency, per_host=args.per_host,
+                                 batch_size=args.batch_size, dry_run=args.dry_run):
+        prefix = f"[{event['done']}/{event['total']}]"
+        if event['event'] == 'fetched':
+            print(f"{prefix} OK      {event['artist']} - {event['album_name']}")
+        elif event['event'] == 'failed':
+            failed += 1
+            print(f"{prefix} FAILED  {event['url']}: {event['error']}", file=sys.stderr)
+        elif event['event'] == 'saved':
+            imported += event['count']
+            print(f"{prefix} SAVED   batch of {event['count']}" + (f" ({event['error']})" if event.get('error') else ""))
+
+    print(f"\nImported {imported}, failed {failed}, skipped {len(skipped)}" + (" (dry run)" if args.dry_run else ""))
+    return 1 if failed and not imported else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
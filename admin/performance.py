@@ -0,0 +1,433 @@
+# File: metalwall_app/admin/performance.py
+# ===========================
+# ADMIN PERFORMANCE DASHBOARD
+# ===========================
+
+import html
+import streamlit as st
+from datetime import datetime
+from typing import Dict, Optional
+from utils.metrics import summarize_histogram, sum_counter, snapshot_metrics
+
+# Baseline snapshot taken by "Reset metrics" (this admin session only)
+METRICS_BASELINE_KEY = 'metrics_baseline'
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+def _rate(part: float, total: float) -> str:
+    return f"{part / total:.0%}" if total else "—"
+
+def admin_performance_page():
+    """Metrics dashboard, pipeline traces and rerun render timings"""
+    # Everything below reads the shared metrics registry (utils/metrics.py), as differences
+    # from the baseline taken by "Reset metrics": the exported counters themselves never go back
+    reset = st.session_state.get(METRICS_BASELINE_KEY)
+    since = reset['taken_at'] if reset else None
+    baseline = reset['values'] if reset else None
+    discoveries = sum_counter("metalwall_discoveries_total", by=("source", "result"), baseline=baseline)
+    discovery_latency = summarize_histogram("metalwall_discovery_seconds", by="source", baseline=baseline)
+    http_outcomes = sum_counter("metalwall_http_requests_total", by=("provider", "outcome"), baseline=baseline)
+    http_latency = summarize_histogram("metalwall_http_request_seconds", by="provider", baseline=baseline)
+    db_latency = summarize_histogram("metalwall_db_operation_seconds", by="operation", baseline=baseline)
+    caches = sum_counter("metalwall_cache_requests_total", by=("cache", "result"), baseline=baseline)
+    reruns = summarize_histogram("metalwall_rerun_seconds", by="page", baseline=baseline)
+
+    pipeline_runs = sum(v for (source, _), v in discoveries.items() if source == 'pipeline')
+    pipeline_found = discoveries.get(('pipeline', 'found'), 0)
+    pool_served = discoveries.get(('pool', 'found'), 0)
+    http_total = sum(http_outcomes.values())
+    http_failed = sum(v for (_, outcome), v in http_outcomes.items() if outcome not in ('ok', 'client_error'))
+    all_db = summarize_histogram("metalwall_db_operation_seconds", baseline=baseline).get('all', {})
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("🎲 Discovery success", _rate(pipeline_found, pipeline_runs),
+                  help=f"{pipeline_found:.0f} of {pipeline_runs:.0f} pipeline runs; {pool_served:.0f} served from the pool")
+    with col2:
+        p95 = discovery_latency.get('pipeline', {}).get('p95')
+        st.metric("⏱️ Discovery p95", f"{p95:.1f} s" if p95 is not None else "—")
+    with col3:
+        st.metric("🌐 API failure rate", _rate(http_failed, http_total),
+                  help="Throttled, 5xx, network errors and breaker/deadline rejections")
+    with col4:
+        db_p95 = all_db.get('p95')
+        st.metric("🗄️ DB op p95", f"{db_p95 * 1000:.1f} ms" if db_p95 is not None else "—")
+
+    col_reset, col_since = st.columns([1, 3])
+    with col_reset:
+        if st.button("🔄 Reset metrics", key="reset_metrics"):
+            st.session_state[METRICS_BASELINE_KEY] = {'taken_at': datetime.now(), 'values': snapshot_metrics()}
+            st.rerun()
+    with col_since:
+        st.caption(f"Showing activity since {since.strftime('%Y-%m-%d %H:%M:%S')}" if since
+                   else "Showing activity since the app started")
+    
+    from utils.metrics_exporter import get_metrics_server_address
+    address = get_metrics_server_address()
+    st.caption(f"Prometheus endpoint: http://{address}/metrics" if address
+               else "Prometheus endpoint not running in this process.")
+
+    # Database operations
+    st.markdown("---")
+    st.markdown("### 🗄️ Database Operations")
+    if db_latency:
+        st.dataframe(
+            sorted(
+                [
+                    {
+                        'Operation': operation,
+                        'Calls': stats['count'],
+                        'Mean (ms)': _ms(stats['mean']),
+                        'p50 (ms)': _ms(stats['p50']),
+                        'p95 (ms)': _ms(stats['p95']),
+                        'p99 (ms)': _ms(stats['p99']),
+                        'Total (s)': round((stats['mean'] or 0) * stats['count'], 2)
+                    }
+                    for operation, stats in db_latency.items()
+                ],
+                key=lambda row: row['Total (s)'],
+                reverse=True
+            ),
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.caption("No database operations recorded yet.")
+    
+    # SQL statements, slow-query log and query plans
+    st.markdown("---")
+    st.markdown("### 🐢 SQL Statements")
+    
+    from config import SLOW_QUERY_THRESHOLD_MS
+    from database.connection import (
+        get_statement_stats, get_slow_queries, explain_all_statements, reset_query_stats
+    )
+    statements = get_statement_stats()
+    if statements:
+        st.dataframe(
+            [
+                {
+                    'Statement': entry['statement'][:120],
+                    'Operations': ', '.join(entry['operations']),
+                    'Calls': entry['calls'],
+                    'Rows': entry['rows'],
+                    'Avg (ms)': round(entry['avg_ms'], 2),
+                    'Max (ms)': round(entry['max_ms'], 2),
+                    'Total (s)': round(entry['total'], 2),
+                    'Slow': entry['slow'],
+                    'Errors': entry['errors']
+                }
+                for entry in statements
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.caption("No SQL executed since the app started.")
+    
+    slow_queries = get_slow_queries()
+    st.caption(f"Slow-query threshold: {SLOW_QUERY_THRESHOLD_MS:g} ms (METALWALL_SLOW_QUERY_MS)")
+    if slow_queries:
+        with st.expander(f"🐢 Slow queries ({len(slow_queries)})"):
+            st.dataframe(
+                [
+                    {
+                        'At': query['at'].strftime('%H:%M:%S'),
+                        'Operation': query['operation'] or '',
+                        'Duration (ms)': round(query['duration_ms'], 1),
+                        'Rows': query['rows'],
+                        'Statement': query['statement'][:160],
+                        'Params': query['params'],
+                        'Error': query['error'] or ''
+                    }
+                    for query in slow_queries
+                ],
+                use_container_width=True,
+                hide_index=True
+            )
+    
+    col_q1, col_q2 = st.columns(2)
+    with col_q1:
+        explain = st.button("🔍 Explain query plans", key="explain_queries", use_container_width=True,
+                            help="Runs EXPLAIN QUERY PLAN for every statement executed so far")
+    with col_q2:
+        if st.button("🗑️ Reset SQL stats", key="reset_query_stats", use_container_width=True):
+            reset_query_stats()
+            st.rerun()
+    if explain:
+        plans = explain_all_statements()
+        scans = sum(1 for plan in plans if plan['full_scans'])
+        if scans:
+            st.warning(f"⚠️ {scans} of {len(plans)} statements scan a whole table")
+        else:
+            st.success(f"✅ No full table scans in {len(plans)} statements")
+        for plan in plans:
+            flag = '⚠️ SCAN' if plan['full_scans'] else '🟡 TEMP B-TREE' if plan['temp_btrees'] else '✅'
+            with st.expander(f"{flag} · {', '.join(plan['operations']) or plan['kind']} · {plan['statement'][:90]}"):
+                st.code(plan['statement'], language='sql')
+                if plan['error']:
+                    st.error(plan['error'])
+                else:
+                    st.code('\n'.join(plan['plan']) or '(no plan rows)')
+
+    # Caches
+    st.markdown("---")
+    st.markdown("### 🧠 Cache Hit Rates")
+    cache_names = sorted({cache for cache, _ in caches})
+    if cache_names:
+        st.dataframe(
+            [
+                {
+                    'Cache': cache,
+                    'Hits': int(caches.get((cache, 'hit'), 0)),
+                    'Misses': int(caches.get((cache, 'miss'), 0)),
+                    'Hit rate': _rate(caches.get((cache, 'hit'), 0),
+                                      caches.get((cache, 'hit'), 0) + caches.get((cache, 'miss'), 0))
+                }
+                for cache in cache_names
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.caption("No cache lookups recorded yet.")
+
+    # External APIs
+    st.markdown("---")
+    st.markdown("### 🌐 External APIs")
+    providers = sorted({provider for provider, _ in http_outcomes})
+    if providers:
+        rows = []
+        for provider in providers:
+            outcomes = {outcome: v for (p, outcome), v in http_outcomes.items() if p == provider}
+            total = sum(outcomes.values())
+            latency = http_latency.get(provider, {})
+            rows.append({
+                'Provider': provider,
+                'Requests': int(total),
+                'p50 (ms)': _ms(latency.get('p50')),
+                'p95 (ms)': _ms(latency.get('p95')),
+                'p99 (ms)': _ms(latency.get('p99')),
+                'Error rate': _rate(outcomes.get('server_error', 0) + outcomes.get('network_error', 0), total),
+                'Throttled': int(outcomes.get('throttled', 0)),
+                '4xx': int(outcomes.get('client_error', 0)),
+                'Rejected': int(outcomes.get('rejected', 0))
+            })
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+    else:
+        st.caption("No provider requests recorded yet.")
+
+    # Discoveries
+    st.markdown("---")
+    st.markdown("### 🎲 Discoveries")
+    if discoveries:
+        attempts = summarize_histogram("metalwall_discovery_attempts", baseline=baseline).get('all', {})
+        st.dataframe(
+            [
+                {
+                    'Source': source,
+                    'Found': int(discoveries.get((source, 'found'), 0)),
+                    'Failed': int(discoveries.get((source, 'failed'), 0)),
+                    'Timed out': int(discoveries.get((source, 'timeout'), 0)),
+                    'p50 (s)': round(discovery_latency[source]['p50'], 2) if source in discovery_latency else None,
+                    'p95 (s)': round(discovery_latency[source]['p95'], 2) if source in discovery_latency else None
+                }
+                for source in sorted({source for source, _ in discoveries})
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+        if attempts.get('mean') is not None:
+            st.caption(f"Candidates evaluated per successful discovery: {attempts['mean']:.1f} on average")
+    else:
+        st.caption("No discoveries since the app started.")
+
+    # Reruns
+    st.markdown("---")
+    st.markdown("### 🖥️ Reruns")
+    if reruns:
+        st.dataframe(
+            [
+                {
+                    'Page': page,
+                    'Reruns': stats['count'],
+                    'p50 (ms)': _ms(stats['p50']),
+                    'p95 (ms)': _ms(stats['p95']),
+                    'p99 (ms)': _ms(stats['p99'])
+                }
+                for page, stats in reruns.items()
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.caption("No reruns recorded yet.")
+
+    # Background jobs
+    st.markdown("---")
+    st.markdown("### ⚙️ Background Jobs")
+    from utils.background import get_job_status
+    jobs = get_job_status()
+    if jobs:
+        st.dataframe(
+            [
+                {
+                    'Job': job['name'],
+                    'State': job['state'],
+                    'Runs': job['runs'],
+                    'Started': job['started_at'].strftime('%H:%M:%S'),
+                    'Duration (s)': round((job['finished_at'] - job['started_at']).total_seconds(), 1)
+                                    if job['finished_at'] else None,
+                    'Last error': job['last_error'] or ''
+                }
+                for job in sorted(jobs, key=lambda j: j['started_at'], reverse=True)[:50]
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.caption("No background jobs have run yet.")
+    
+    # Pipeline traces (discoveries, posts, Bandcamp lookups)
+    st.markdown("---")
+    st.markdown("### 🧵 Pipeline Traces")
+    
+    from utils.tracing import get_recent_traces, export_traces_json, clear_traces
+    traces = get_recent_traces()
+    if traces:
+        col_t1, col_t2, col_t3 = st.columns([3, 1, 1])
+        with col_t1:
+            names = sorted({t['name'] for t in traces})
+            trace_filter = st.selectbox("Pipeline", ["All"] + names, key="trace_filter")
+        with col_t2:
+            st.download_button(
+                label="💾 Export JSON",
+                data=export_traces_json(),
+                file_name=f"metalwall_traces_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                mime="application/json",
+                use_container_width=True
+            )
+        with col_t3:
+            if st.button("🗑️ Clear", key="clear_traces", use_container_width=True):
+                clear_traces()
+                st.rerun()
+        
+        shown = [t for t in traces if trace_filter == "All" or t['name'] == trace_filter]
+        for trace in shown[:20]:
+            outcome = '❌' if any(s['error'] for s in trace['spans']) else '✅'
+            title = (f"{outcome} {trace['name']} · {trace['duration_ms'] or 0:.0f} ms · "
+                     f"{len(trace['spans'])} spans · {trace['started_at'][11:19]}")
+            with st.expander(title):
+                render_trace_waterfall(trace)
+    else:
+        st.caption("No traces recorded since the app started.")
+    
+    # Rerun render timings
+    st.markdown("---")
+    st.markdown("### ⏱️ Render Timings")
+    
+    from utils.render_profiler import (
+        get_render_stats, reset_render_stats, request_profile, PROFILE_RESULT_KEY
+    )
+    render_stats = get_render_stats()
+    sessions = render_stats['sessions']
+    col_r1, col_r2, col_r3 = st.columns(3)
+    with col_r1:
+        st.metric("Active sessions", sessions['active'])
+    with col_r2:
+        st.metric("Avg reruns/min", f"{sessions['avg_reruns_per_min']:.1f}")
+    with col_r3:
+        st.metric("Max reruns/min", f"{sessions['max_reruns_per_min']:.1f}")
+    
+    if render_stats['pages']:
+        st.caption("Whole reruns by page")
+        st.dataframe(
+            [
+                {
+                    'Page': page,
+                    'Reruns': stats['count'],
+                    'p50 (ms)': round(stats['p50_ms'], 1),
+                    'p95 (ms)': round(stats['p95_ms'], 1),
+                    'p99 (ms)': round(stats['p99_ms'], 1),
+                    'Max (ms)': round(stats['max_ms'], 1),
+                    'Widgets': stats['widgets_last'],
+                    'Max widgets': stats['widgets_max']
+                }
+                for page, stats in render_stats['pages'].items()
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption("Sections (per call, inclusive of nested sections)")
+        st.dataframe(
+            sorted(
+                [
+                    {
+                        'Section': name,
+                        'Calls': stats['count'],
+                        'Calls/rerun': round(stats['calls_per_rerun'], 1),
+                        'p50 (ms)': round(stats['p50_ms'], 2),
+                        'p95 (ms)': round(stats['p95_ms'], 2),
+                        'p99 (ms)': round(stats['p99_ms'], 2),
+                        'Max (ms)': round(stats['max_ms'], 2)
+                    }
+                    for name, stats in render_stats['sections'].items()
+                ],
+                key=lambda row: row['p95 (ms)'] * row['Calls/rerun'],
+                reverse=True
+            ),
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    col_p1, col_p2 = st.columns(2)
+    with col_p1:
+        if st.button("🔬 Profile my next rerun", key="request_render_profile", use_container_width=True,
+                     help="Captures cProfile data for the next page you open or the next click"):
+            request_profile()
+            st.info("The next rerun of your session will be profiled; come back here to download it.")
+    with col_p2:
+        if st.button("🗑️ Reset timings", key="reset_render_stats", use_container_width=True):
+            reset_render_stats()
+            st.rerun()
+    
+    profile = st.session_state.get(PROFILE_RESULT_KEY)
+    if profile:
+        st.caption(f"Last capture: {profile['page']} · {profile['elapsed'] * 1000:.0f} ms")
+        st.download_button(
+            label="💾 Download cProfile (.prof)",
+            data=profile['data'],
+            file_name=f"metalwall_rerun_{profile['captured_at']}.prof",
+            mime="application/octet-stream"
+        )
+        with st.expander("Top functions (cumulative time)"):
+            st.code(profile['summary'])
+
+def render_trace_waterfall(trace: Dict):
+    """Draw a trace's spans as horizontal bars on a shared time axis"""
+    total = max(trace['duration_ms'] or 0.0, 0.001)
+    depth = {}
+    rows = []
+    for span in trace['spans']:
+        level = depth.get(span['parent_id'], -1) + 1
+        depth[span['span_id']] = level
+        duration = span['duration_ms'] if span['duration_ms'] is not None else total - span['start_ms']
+        left = min(100.0, span['start_ms'] / total * 100)
+        width = max(0.3, min(100.0 - left, duration / total * 100))
+        color = '#c0392b' if span['error'] else '#8e44ad' if span['parent_id'] is None else '#2980b9'
+        details = ', '.join(f"{k}={v}" for k, v in span['attributes'].items())
+        if span['error']:
+            details = f"{details} · {span['error']}" if details else span['error']
+        tooltip = html.escape(f"{span['name']} ({duration:.1f} ms) [{span['thread']}] {details}")
+        rows.append(
+            f'<div title="{tooltip}" style="display:flex;align-items:center;font-size:12px;margin:1px 0;">'
+            f'<div style="width:32%;padding-left:{level * 12}px;white-space:nowrap;overflow:hidden;'
+            f'text-overflow:ellipsis;">{html.escape(span["name"])}</div>'
+            f'<div style="width:58%;position:relative;height:14px;background:#222;">'
+            f'<div style="position:absolute;left:{left:.2f}%;width:{width:.2f}%;height:100%;background:{color};"></div>'
+            f'</div><div style="width:10%;text-align:right;">{duration:.0f} ms</div></div>'
+        )
+    st.markdown(''.join(rows), unsafe_allow_html=True)
+    if trace['dropped_spans']:
+        st.caption(f"{trace['dropped_spans']} spans dropped (per-trace limit)")
@@ -0,0 +1,445 @@
+# File: metalwall_app/benchmarks/bench_database.py
+# ===========================
+# DATABASE SCALE BENCHMARK
+# ===========================
+"""
+Time every database/operations.py function and the data path of each page
+(what a rerun loads, sorts and filters before rendering) on synthetic walls
+of increasing size, to see which ones stop scaling.
+
+Each scale's database is generated once by generate_scale_data.py into
+--data-dir and reused; every run works on a fresh copy of it, in its own
+process, so writes and caches never leak from one scale into the next.
+
+    python benchmarks/bench_database.py
+    python benchmarks/bench_database.py --scales 10k 100k 1m --repeat 3 --output results/db.json
+    python benchmarks/bench_database.py --db metal_music_backup.db --only 'load_|records'
+
+Per operation it reports the first call (cold page cache) and p50/p95 of the
+repeats; page paths also report rows and peak Python memory. The slowest SQL
+statements of each run and any full table scans (from database/connection.py)
+are included.
+
+load_albums-based paths grow linearly with the wall (tens of seconds per call
+at 1m): combine --repeat 1 and --only for quick runs at that scale.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+GENERATOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generate_scale_data.py')
+
+def percentile(values: List[float], pct: int) -> Optional[float]:
+    """Inclusive percentile (None for an empty sample)"""
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+class Case:
+    """One timed call; `before`/`after` run untimed around each repeat (to keep the data unchanged)"""
+
+    def __init__(self, name: str, run: Callable, before: Optional[Callable] = None,
+                 after: Optional[Callable] = None):
+        self.name = name
+        self.run = run
+        self.before = before
+        self.after = after
+
+def _rows(result) -> Optional[int]:
+    return len(result) if isinstance(result, list) else None
+
+def measure(case: Case, repeat: int, memory: bool = False) -> Dict:
+    samples, result = [], None
+    for _ in range(repeat):
+        if case.before:
+            case.before()
+        started = time.perf_counter()
+        result = case.run()
+        samples.append((time.perf_counter() - started) * 1000)
+        if case.after:
+            case.after()
+    stats = {
+        'first_ms': samples[0],
+        'mean_ms': statistics.fmean(samples),
+        'p50_ms': percentile(samples, 50),
+        'p95_ms': percentile(samples, 95),
+        'max_ms': max(samples),
+        'rows': _rows(result)
+    }
+    if memory:
+        # A separate, untimed run: tracemalloc slows allocation-heavy code down a lot
+        if case.before:
+            case.before()
+        tracemalloc.start()
+        case.run()
+        stats['peak_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+        if case.after:
+            case.after()
+    return stats
+
+# ============ WORKER (one database, one process) ============
+
+def _sample(db_path: str) -> Dict:
+    """Real keys from the database to call the operations with"""
+    import sqlite3
+    conn = sqlite3.connect(db_path)
+    try:
+        one = lambda sql: conn.execute(sql).fetchone()
+        album = one('SELECT id, url, artist, album_name, cover_url, platform, tags, likes, username '
+                    'FROM albums ORDER BY id LIMIT 1 OFFSET (SELECT COUNT(*) / 2 FROM albums)')
+        concert = one('SELECT id, bands, date, venue, city, tags, info, likes FROM concerts '
+                      'ORDER BY id LIMIT 1 OFFSET (SELECT COUNT(*) / 2 FROM concerts)')
+        heavy_user = one('SELECT username FROM albums GROUP BY username ORDER BY COUNT(*) DESC LIMIT 1')
+        top_tag = one("SELECT tags FROM albums WHERE tags != '[]' GROUP BY tags ORDER BY COUNT(*) DESC LIMIT 1")
+        artists = conn.execute('SELECT artist_key, artist_name, tags, similar FROM lastfm_artist_cache '
+                               'LIMIT 50').fetchall()
+        spotify = conn.execute('SELECT artist_key, artist_name, spotify_id, genres FROM spotify_artists '
+                               'LIMIT 50').fetchall()
+        genres = conn.execute('SELECT artist_key, is_metal, confidence FROM artist_genre LIMIT 50').fetchall()
+        graph = one('SELECT artist_key, artist_name, related, source FROM artist_graph LIMIT 1')
+        metadata = one('SELECT canonical_url, artist, album_name, cover_url, platform FROM url_metadata LIMIT 1')
+        health = conn.execute('SELECT album_id, url_status, url_ok, url_etag, cover_status, cover_ok '
+                              'FROM link_health LIMIT 50').fetchall()
+        counts = {table: one(f'SELECT COUNT(*) FROM {table}')[0]
+                  for table in ('albums', 'concerts', 'album_discoveries', 'lastfm_artist_cache',
+                                'artist_genre', 'artist_graph', 'spotify_artists', 'bandcamp_links',
+                                'url_metadata', 'link_health')}
+    finally:
+        conn.close()
+    return {'album': album, 'concert': concert, 'heavy_user': heavy_user[0] if heavy_user else 'nobody',
+            'top_tag': eval(top_tag[0])[0] if top_tag else 'deathmetal', 'artists': artists,
+            'spotify': spotify, 'genres': genres, 'graph': graph, 'metadata': metadata,
+            'health': health, 'counts': counts}
+
+def operation_cases(db_path: str, s: Dict) -> List[Case]:
+    """A case per function in database/operations.py, called like the app calls it"""
+    import sqlite3
+    from database import operations as ops
+
+    def sql(statement: str, params=()):
+        # Untimed cleanup on a plain connection
+        conn = sqlite3.connect(db_path)
+        conn.execute(statement, params)
+        conn.commit()
+        conn.close()
+
+    album_id, url, artist, album_name, cover, plat, tags, likes, user = s['album'] or (0, '', '', '', '', '', '[]', '[]', '')
+    concert_id, bands, date, venue, city, ctags, info, clikes = s['concert'] or (0, '', '', '', '', '[]', '', '[]')
+    keys = [row[0] for row in s['artists']]
+    key = keys[0] if keys else 'nobody'
+    ids = [row[2] for row in s['spotify'] if row[2]]
+    now = datetime.now()
+    bench_user = 'bench-scale'
+    pending = {}
+
+    def last_id(table: str) -> int:
+        conn = sqlite3.connect(db_path)
+        row = conn.execute(f'SELECT MAX(id) FROM {table} WHERE username = ?', (bench_user,)).fetchone()
+        conn.close()
+        return row[0] or 0
+
+    def throwaway_album():
+        ops.save_album(bench_user, 'https://example.org/bench/delete-me', 'Bench', 'Delete Me', '', 'Other', [])
+        pending['albums'] = last_id('albums')
+
+    def throwaway_concert():
+        ops.save_concert(bench_user, 'Bench', '2999-01-01', 'Bench Hall', 'Bench City', [], '')
+        pending['concerts'] = last_id('concerts')
+
+    clean_albums = lambda: sql('DELETE FROM albums WHERE username = ?', (bench_user,))
+    clean_concerts = lambda: sql('DELETE FROM concerts WHERE username = ?', (bench_user,))
+    batch = [{'username': bench_user, 'url': f'https://example.org/bench/{n}', 'artist': 'Bench',
+              'album_name': f'Batch {n}', 'cover_url': '', 'platform': 'Other', 'tags': ['bench']}
+             for n in range(50)]
+
+    return [
+        # ---- albums ----
+        Case('save_album', lambda: ops.save_album(bench_user, 'https://example.org/bench/1', artist, album_name,
+                                                  cover, plat, eval(tags)), after=clean_albums),
+        Case('save_albums_batch', lambda: ops.save_albums_batch(batch), after=clean_albums),
+        Case('load_album_urls', ops.load_album_urls),
+        Case('load_albums', ops.load_albums),
+        Case('update_album', lambda: ops.update_album(album_id, url, artist, album_name, cover, plat, eval(tags))),
+        Case('update_album_likes', lambda: ops.update_album_likes(album_id, eval(likes))),
+        Case('update_album_cover', lambda: ops.update_album_cover(album_id, cover)),
+        Case('delete_album', lambda: ops.delete_album(pending['albums']), before=throwaway_album, after=clean_albums),
+        Case('check_duplicate_url', lambda: ops.check_duplicate_url(url)),
+        # ---- concerts ----
+        Case('save_concert', lambda: ops.save_concert(bench_user, bands, date, venue, city, eval(ctags), info),
+             after=clean_concerts),
+        # The first call deletes the generated past concerts; the repeats show the steady state
+        Case('delete_past_concerts', ops.delete_past_concerts),
+        Case('load_concerts', ops.load_concerts),
+        Case('update_concert', lambda: ops.update_concert(concert_id, bands, date, venue, city, eval(ctags), info)),
+        Case('update_concert_likes', lambda: ops.update_concert_likes(concert_id, eval(clikes))),
+        Case('delete_concert', lambda: ops.delete_concert(pending['concerts']), before=throwaway_concert,
+             after=clean_concerts),
+        # ---- discoveries ----
+        Case('save_discovery', lambda: ops.save_discovery(bench_user, artist, album_name, 'Bench', 'Found',
+                                                          'https://example.org/found', ''),
+             after=lambda: sql('DELETE FROM album_discoveries WHERE username = ?', (bench_user,))),
+        Case('load_discoveries', ops.load_discoveries),
+        Case('load_discoveries[user]', lambda: ops.load_discoveries(s['heavy_user'])),
+        # ---- provider caches ----
+        Case('load_lastfm_artist', lambda: ops.load_lastfm_artist(key)),
+        Case('save_lastfm_artist', lambda: ops.save_lastfm_artist(
+            key, s['artists'][0][1], json.loads(s['artists'][0][2]), json.loads(s['artists'][0][3]))
+            if s['artists'] else None),
+        Case('load_artist_genres', ops.load_artist_genres),
+        Case('load_artist_genres[50]', lambda: ops.load_artist_genres(keys)),
+        Case('save_artist_genre', lambda: ops.save_artist_genre(key, key.title(), ['death metal'], True, 0.9)),
+        Case('update_artist_genre_verdicts', lambda: ops.update_artist_genre_verdicts(
+            [(k, bool(metal), confidence) for k, metal, confidence in s['genres']])),
+        Case('load_wall_artists', ops.load_wall_artists),
+        Case('load_artist_graph_node', lambda: ops.load_artist_graph_node(s['graph'][0] if s['graph'] else key)),
+        Case('load_artist_graph_freshness', ops.load_artist_graph_freshness),
+        Case('save_artist_graph_node', lambda: ops.save_artist_graph_node(
+            s['graph'][0], s['graph'][1], json.loads(s['graph'][2]), s['graph'][3]) if s['graph'] else None),
+        Case('load_spotify_artists[50]', lambda: ops.load_spotify_artists(keys)),
+        Case('save_spotify_artists[50]', lambda: ops.save_spotify_artists([
+            {'artist_key': k, 'artist_name': n, 'spotify_id': i, 'genres': json.loads(g) if g else None}
+            for k, n, i, g in s['spotify']])),
+        Case('load_spotify_genres[50]', lambda: ops.load_spotify_genres(ids)),
+        Case('save_spotify_genres[50]', lambda: ops.save_spotify_genres(
+            {i: json.loads(g) for _, _, i, g in s['spotify'] if i and g})),
+        Case('save_bandcamp_link', lambda: ops.save_bandcamp_link(f'{key}|bench', None)),
+        Case('load_bandcamp_link', lambda: ops.load_bandcamp_link(f'{key}|bench')),
+        Case('load_url_metadata', lambda: ops.load_url_metadata(s['metadata'][0] if s['metadata'] else url)),
+        Case('save_url_metadata', lambda: ops.save_url_metadata(
+            s['metadata'][0], {'artist': s['metadata'][1], 'album_name': s['metadata'][2],
+                               'cover_url': s['metadata'][3], 'platform': s['metadata'][4]})
+            if s['metadata'] else None),
+        # ---- link health ----
+        Case('load_link_health_candidates', lambda: ops.load_link_health_candidates(now - timedelta(days=7), 50)),
+        Case('save_link_health[50]', lambda: ops.save_link_health([
+            {'album_id': a, 'url_status': us, 'url_ok': bool(uo), 'url_etag': e, 'cover_status': cs,
+             'cover_ok': None if co is None else bool(co)} for a, us, uo, e, cs, co in s['health']])),
+        Case('load_broken_links', ops.load_broken_links),
+        Case('get_link_health_summary', ops.get_link_health_summary),
+        Case('get_database_stats', ops.get_database_stats),
+    ]
+
+def page_cases(s: Dict) -> List[Case]:
+    """
+    What each page loads and computes on a rerun, without the rendering
+    (mirrors ui/pages.py and ui/components.py; keep them in step).
+    """
+    from database import operations as ops
+
+    user, tag = s['heavy_user'], s['top_tag']
+    album_id = s['album'][0] if s['album'] else 0
+    rng = random.Random(0)
+
+    def records_votes():
+        return sorted(ops.load_albums(), key=lambda x: len(x.likes), reverse=True)
+
+    def records_tag():
+        return [a for a in ops.load_albums() if tag.lower() in [t.lower() for t in a.tags]]
+
+    def like_album():
+        # toggle_album_like: read the likes of the post, save, rerun (which reloads the wall)
+        album = next(a for a in ops.load_albums() if a.id == album_id)
+        likes = [u for u in album.likes if u != 'bench-scale'] + ['bench-scale']
+        ops.update_album_likes(album_id, likes)
+        return ops.load_albums()
+
+    def gigs():
+        ops.delete_past_concerts()
+        return ops.load_concerts()
+
+    def profile():
+        albums, concerts = ops.load_albums(), ops.load_concerts()
+        mine = [a for a in albums if a.username == user]
+        liked = [a for a in albums if user in a.likes]
+        return mine + liked + [c for c in concerts if c.username == user]
+
+    def random_pick():
+        albums = ops.load_albums()
+        return [rng.choice(albums)] if albums else []
+
+    def admin_database():
+        return [ops.get_database_stats(), ops.get_link_health_summary(), *ops.load_broken_links()]
+
+    return [
+        Case('records[timeline]', ops.load_albums),
+        Case('records[votes]', records_votes),
+        Case('records[tag]', records_tag),
+        Case('records[like]', like_album),
+        Case('gigs', gigs),
+        Case('profile[heavy user]', profile),
+        Case('random_album[wall pick]', random_pick),
+        Case('admin[database]', admin_database),
+    ]
+
+def run_worker(db_path: str, repeat: int, only: Optional[str]) -> Dict:
+    # config reads this at import time, so it must be set before any app module is imported
+    os.environ['METALWALL_DB_PATH'] = db_path
+    from database import operations as ops
+    from database.connection import explain_all_statements, get_statement_stats
+    from database.init_db import init_db
+
+    # Backups and older databases may predate the cache tables: migrate the working copy first
+    init_db()
+    sample = _sample(db_path)
+    pattern = re.compile(only) if only else None
+    selected = lambda cases: [c for c in cases if not pattern or pattern.search(c.name)]
+
+    cases = operation_cases(db_path, sample)
+    operations, pages = {}, {}
+    for case in selected(cases):
+        print(f"  {case.name}", file=sys.stderr)
+        operations[case.name] = measure(case, repeat)
+    for case in selected(page_cases(sample)):
+        print(f"  page {case.name}", file=sys.stderr)
+        pages[case.name] = measure(case, repeat, memory=True)
+
+    # Operations added to operations.py without a case here should not go unnoticed
+    public = {name for name, value in vars(ops).items()
+              if callable(value) and not name.startswith('_') and getattr(value, '__module__', '') == ops.__name__}
+    covered = {case.name.split('[', 1)[0] for case in cases}
+
+    statements = get_statement_stats()
+    return {
+        'db_size_mb': os.path.getsize(db_path) / (1024 * 1024),
+        'rows': sample['counts'],
+        'operations': operations,
+        'pages': pages,
+        'not_benchmarked': sorted(public - covered),
+        'slowest_statements': [
+            {'statement': st['statement'][:200], 'operations': st['operations'], 'calls': st['calls'],
+             'avg_ms': st['avg_ms'], 'max_ms': st['max_ms']}
+            for st in statements[:10]
+        ],
+        'full_scans': [
+            {'statement': plan['statement'][:200], 'operations': plan['operations'], 'plan': plan['full_scans']}
+            for plan in explain_all_statements() if plan['full_scans']
+        ]
+    }
+
+# ============ DRIVER ============
+
+def scale_database(data_dir: str, scale: str, seed: int) -> str:
+    """Path of the generated database for a scale, generating it on first use"""
+    path = os.path.join(data_dir, f"metalwall_{scale.lower()}_s{seed}.db")
+    if not os.path.exists(path):
+        print(f"Generating the {scale} database in {path} ...")
+        subprocess.run([sys.executable, GENERATOR, '--scale', scale, '--seed', str(seed),
+                        '--output', path, '--quiet'], check=True)
+    return path
+
+def run_scale(source: str, repeat: int, only: Optional[str]) -> Dict:
+    """Benchmark a fresh copy of `source` in a child process"""
+    work_dir = tempfile.mkdtemp(prefix='metalwall-dbbench-')
+    work = os.path.join(work_dir, 'bench.db')
+    try:
+        shutil.copyfile(source, work)
+        command = [sys.executable, os.path.abspath(__file__), '--worker', work, '--repeat', str(repeat)]
+        if only:
+            command += ['--only', only]
+        completed = subprocess.run(command, stdout=subprocess.PIPE, check=True)
+        return json.loads(completed.stdout)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def print_table(title: str, results: Dict[str, Dict], section: str):
+    scales = list(results)
+    names = list(dict.fromkeys(name for result in results.values() for name in result[section]))
+    fmt = lambda v: '-' if v is None else f"{v:.1f}" if v < 100 else f"{v:.0f}"
+    print(f"\n{title} (p50 ms)")
+    print(f"  {'':<32}" + ''.join(f"{scale:>11}" for scale in scales))
+    for name in names:
+        cells = [results[scale][section].get(name, {}).get('p50_ms') for scale in scales]
+        print(f"  {name:<32}" + ''.join(f"{fmt(cell):>11}" for cell in cells))
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', nargs='+', default=['10k', '100k'],
+                        help='wall sizes to generate and benchmark (10k, 100k, 1m or a number)')
+    parser.add_argument('--db', help='benchmark (a copy of) this database instead of generated ones')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'metalwall-scale'),
+                        help='where generated databases are kept between runs')
+    parser.add_argument('--seed', type=int, default=666)
+    parser.add_argument('--repeat', type=int, default=5, help='timed calls per operation')
+    parser.add_argument('--only', help='regular expression: benchmark only matching operations/pages')
+    parser.add_argument('--label', default='', help='free-form label stored with the results')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    return parser
+
+def main():
+    args = make_parser().parse_args()
+    if args.worker:
+        # stdout carries the JSON result; the operations' own error prints go to stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            result = run_worker(args.worker, args.repeat, args.only)
+        json.dump(result, sys.stdout, default=str)
+        return 0
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    sources = ({os.path.basename(args.db): os.path.abspath(args.db)} if args.db else
+               {scale: scale_database(args.data_dir, scale, args.seed) for scale in args.scales})
+
+    results = {}
+    for scale, source in sources.items():
+        print(f"\n[{scale}] {source}")
+        started = time.perf_counter()
+        results[scale] = run_scale(source, args.repeat, args.only)
+        print(f"  done in {time.perf_counter() - started:.1f}s")
+
+    print_table('Operations', results, 'operations')
+    print_table('Page data paths', results, 'pages')
+    for scale, result in results.items():
+        if result['not_benchmarked']:
+            print(f"\n[{scale}] no case for: {', '.join(result['not_benchmarked'])}")
+        for scan in result['full_scans']:
+            print(f"[{scale}] full scan in {', '.join(scan['operations']) or '?'}: {'; '.join(scan['plan'])}")
+
+    report = {
+        'benchmark': 'database',
+        'label': args.label,
+        'revision': git_revision(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'settings': {'repeat': args.repeat, 'seed': args.seed, 'only': args.only, 'db': args.db},
+        'summary': {
+            scale: {name: stats['p50_ms'] for name, stats in result['pages'].items()}
+            for scale, result in results.items()
+        },
+        'scales': results
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+# File: metalwall_app/benchmarks/bench_discovery.py
+# ===========================
+# DISCOVERY PIPELINE BENCHMARK
+# ===========================
+"""
+Drive N discoveries against the offline provider stand-ins and report what
+each click costs: latency percentiles, calls per provider per discovery,
+attempts per success and cache hit rates.
+
+The stand-in server is embedded by default (or pass --base to use one that is
+already running) and the wall is seeded into a scratch database, so nothing
+touches the real providers or metal_music.db. Each run makes a cold pass and
+then a warm pass over the same base albums.
+
+    python benchmarks/bench_discovery.py -n 50 --output results/discovery.json
+    python benchmarks/bench_discovery.py --latency-ms 80 --provider lastfm:latency_ms=250
+    python benchmarks/bench_discovery.py --concurrency 1 --label sequential
+
+Compare two saved results with any JSON diff; the 'summary' block holds the
+numbers worth tracking between versions.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from devtools.standin_server import build_server, make_parser as make_standin_parser
+
+_ATTEMPTS = re.compile(r'after (\d+) attempts')
+
+def percentile(values: List[float], pct: int) -> Optional[float]:
+    """Inclusive percentile (None for an empty sample)"""
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+def standin_call(base: str, path: str) -> Dict:
+    """GET /__stats or POST /__reset on the stand-in server"""
+    data = b'' if path == '/__reset' else None
+    with urllib.request.urlopen(urllib.request.Request(base + path, data=data), timeout=10) as response:
+        return json.loads(response.read())
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+def seed_wall(catalog, count: int, seed: int) -> List[Dict]:
+    """Insert `count` albums by metal artists of the catalog; returns them as base album dicts"""
+    from database.init_db import init_db
+    from database.operations import save_albums_batch
+
+    init_db()
+    rng = random.Random(seed)
+    metal = [a for a in catalog.artists if 'metal' in ' '.join(a['tags'])]
+    wall = []
+    for artist in rng.sample(metal, min(count, len(metal))):
+        album = catalog.albums[rng.choice(artist['albums'])]
+        wall.append({
+            'username': 'benchmark',
+            'url': f"https://open.spotify.com/album/{album['id']}",
+            'artist': artist['name'],
+            'album_name': album['name'],
+            'cover_url': catalog.image_url(album['id']),
+            'platform': 'Spotify',
+            'tags': ['#benchmark']
+        })
+    save_albums_batch(wall)
+    return wall
+
+def wait_for_background(timeout: float = 30.0):
+    """Let background Bandcamp lookups finish so their calls land in the pass that caused them"""
+    from utils.background import get_job_status
+    until = time.monotonic() + timeout
+    while time.monotonic() < until:
+        if not any(job['state'] == 'running' for job in get_job_status('bandcamp:')):
+            return
+        time.sleep(0.05)
+
+def cache_snapshot() -> Dict[str, Dict]:
+    """Hit/miss counters of the in-memory caches on the discovery path"""
+    from services.lastfm_service import get_lastfm_cache_stats
+    from services.spotify_service import get_spotify_cache_stats
+    spotify = get_spotify_cache_stats()
+    return {
+        'lastfm_artists': get_lastfm_cache_stats(),
+        'spotify_artist_ids': spotify['artist_ids'],
+        'spotify_genres': spotify['genres']
+    }
+
+def cache_delta(before: Dict[str, Dict], after: Dict[str, Dict]) -> Dict[str, Dict]:
+    delta = {}
+    for name, stats in after.items():
+        hits = stats['hits'] - before[name]['hits']
+        misses = stats['misses'] - before[name]['misses']
+        delta[name] = {'hits': hits, 'misses': misses,
+                       'hit_rate': hits / (hits + misses) if hits + misses else None}
+    return delta
+
+def run_pass(name: str, base: str, wall: List[Dict], discoveries: int, spotify_client, lastfm_client,
+             max_attempts: int, concurrency: Optional[int], deadline: Optional[float]) -> Dict:
+    """Run `discoveries` pipelines (base albums taken round-robin from the wall) and collect the costs"""
+    from services.random_album import find_discovery
+
+    standin_call(base, '/__reset')
+    caches_before = cache_snapshot()
+    latencies, attempts, errors = [], [], {}
+    successes = 0
+
+    for i in range(discoveries):
+        started = time.perf_counter()
+        data, error = find_discovery(spotify_client, lastfm_client, wall[i % len(wall)],
+                                     max_attempts, concurrency, deadline)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if data:
+            successes += 1
+            attempts.append(data['attempts'])
+        else:
+            match = _ATTEMPTS.search(error or '')
+            if match:
+                attempts.append(int(match.group(1)))
+            reason = _ATTEMPTS.sub('after N attempts', error or 'unknown')
+            errors[reason] = errors.get(reason, 0) + 1
+
+    wait_for_background()
+    server_stats = standin_call(base, '/__stats')
+    calls = server_stats['requests']
+    return {
+        'pass': name,
+        'discoveries': discoveries,
+        'successes': successes,
+        'success_rate': successes / discoveries if discoveries else 0.0,
+        'latency_ms': {
+            'mean': statistics.fmean(latencies) if latencies else None,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': max(latencies) if latencies else None
+        },
+        'attempts_per_success': sum(attempts) / successes if successes else None,
+        'calls': calls,
+        'calls_per_discovery': {provider: count / discoveries for provider, count in calls.items()},
+        'calls_per_success': {provider: count / successes for provider, count in calls.items()} if successes else {},
+        'endpoints': server_stats['endpoints'],
+        'injected': {'errors': server_stats['injected_errors'], 'throttles': server_stats['injected_throttles']},
+        'caches': cache_delta(caches_before, cache_snapshot()),
+        'errors': errors
+    }
+
+def print_pass(result: Dict):
+    latency = result['latency_ms']
+    fmt = lambda v: '-' if v is None else f"{v:.0f}"
+    print(f"\n[{result['pass']}] {result['successes']}/{result['discoveries']} discoveries succeeded")
+    print(f"  latency ms   p50 {fmt(latency['p50'])}  p95 {fmt(latency['p95'])}  "
+          f"p99 {fmt(latency['p99'])}  max {fmt(latency['max'])}")
+    per_success = result['attempts_per_success']
+    print(f"  attempts per success  {'-' if per_success is None else f'{per_success:.1f}'}")
+    calls = '  '.join(f"{p} {n:.1f}" for p, n in sorted(result['calls_per_discovery'].items()))
+    print(f"  calls per discovery   {calls or '-'}")
+    for name, cache in result['caches'].items():
+        rate = '-' if cache['hit_rate'] is None else f"{cache['hit_rate']:.0%}"
+        print(f"  cache {name:<20} {rate:>5}  ({cache['hits']} hits / {cache['misses']} misses)")
+    for reason, count in result['errors'].items():
+        print(f"  error x{count}: {reason}")
+
+def make_parser() -> argparse.ArgumentParser:
+    # Fault-injection flags are the stand-in server's own
+    standin = make_standin_parser()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     parents=[standin], add_help=False, conflict_handler='resolve')
+    parser.add_argument('-h', '--help', action='help')
+    parser.add_argument('-n', '--discoveries', type=int, default=30, help='discoveries per pass')
+    parser.add_argument('--wall-albums', type=int, default=25, help='albums seeded on the scratch wall')
+    parser.add_argument('--max-attempts', type=int, default=15)
+    parser.add_argument('--concurrency', type=int, help='candidate evaluation concurrency (default: config)')
+    parser.add_argument('--deadline', type=float, help='pipeline deadline in seconds (default: config)')
+    parser.add_argument('--cold-only', action='store_true', help='skip the warm pass')
+    parser.add_argument('--base', help='use an already running stand-in server at this URL')
+    parser.add_argument('--port', type=int, default=0, help='port of the embedded server (0 = any free port)')
+    parser.add_argument('--label', default='', help='free-form label stored with the results')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    return parser
+
+def main():
+    args = make_parser().parse_args()
+
+    server = None
+    if args.base:
+        base = args.base.rstrip('/')
+    else:
+        server = build_server(args)
+        server.start()
+        base = server.base_url
+
+    # config reads these at import time, so they must be set before any app module is imported
+    scratch = tempfile.mkdtemp(prefix='metalwall-bench-')
+    os.environ['METALWALL_PROVIDER_BASE'] = base
+    os.environ['METALWALL_DB_PATH'] = os.path.join(scratch, 'bench.db')
+
+    from config import DISCOVERY_CONCURRENCY, DISCOVERY_DEADLINE
+    from devtools.catalog import Catalog
+    from services.lastfm_service import create_lastfm_client
+    from services.spotify_service import create_spotify_client
+
+    catalog = server.catalog if server else Catalog(args.artists, args.seed)
+    wall = seed_wall(catalog, args.wall_albums, args.seed)
+    spotify_client = create_spotify_client('benchmark', 'benchmark')
+    lastfm_client = create_lastfm_client('benchmark', 'benchmark')
+
+    print(f"Stand-ins at {base}, {len(wall)} wall albums, scratch DB in {scratch}")
+    passes = []
+    for name in (['cold'] if args.cold_only else ['cold', 'warm']):
+        result = run_pass(name, base, wall, args.discoveries, spotify_client, lastfm_client,
+                          args.max_attempts, args.concurrency, args.deadline)
+        print_pass(result)
+        passes.append(result)
+
+    cold = passes[0]
+    report = {
+        'benchmark': 'discovery',
+        'label': args.label,
+        'revision': git_revision(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'settings': {
+            'discoveries': args.discoveries,
+            'wall_albums': len(wall),
+            'max_attempts': args.max_attempts,
+            'concurrency': args.concurrency or DISCOVERY_CONCURRENCY,
+            'deadline': args.deadline or DISCOVERY_DEADLINE,
+            'catalog_artists': args.artists,
+            'seed': args.seed,
+            'latency_ms': args.latency_ms,
+            'jitter_ms': args.jitter_ms,
+            'error_rate': args.error_rate,
+            'throttle_rate': args.throttle_rate,
+            'provider_faults': [f"{p}:{k}={v}" for p, k, v in args.provider or []],
+            'external_server': bool(args.base)
+        },
+        'summary': {
+            'cold_p50_ms': cold['latency_ms']['p50'],
+            'cold_p95_ms': cold['latency_ms']['p95'],
+            'warm_p50_ms': passes[-1]['latency_ms']['p50'] if len(passes) > 1 else None,
+            'warm_p95_ms': passes[-1]['latency_ms']['p95'] if len(passes) > 1 else None,
+            'cold_calls_per_discovery': sum(cold['calls_per_discovery'].values()),
+            'attempts_per_success': cold['attempts_per_success'],
+            'success_rate': cold['success_rate']
+        },
+        'passes': passes
+    }
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if server:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+# File: metalwall_app/benchmarks/bench_metadata_parser.py
+# ===========================
+# META-TAG PARSER BENCHMARK
+# ===========================
+"""
+Compare the legacy full-tree html.parser extraction with parse_meta_tags
+over a corpus of saved pages (benchmarks/corpus/*.html). The bundled pages
+mirror the markup of Bandcamp (og + JSON-LD), Spotify, YouTube and a
+twitter-only page; add real ones with --save.
+
+    python benchmarks/bench_metadata_parser.py
+    python benchmarks/bench_metadata_parser.py --save https://band.bandcamp.com/album/x ...
+"""
+
+import argparse
+import hashlib
+import os
+import statistics
+import sys
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from services.metadata_extractor import parse_meta_tags, HTML_PARSER
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+def legacy_parse(html: str) -> dict:
+    """The previous extraction: full html.parser tree, two find_all('meta') passes"""
+    soup = BeautifulSoup(html, 'html.parser')
+    metadata = {}
+    for meta in soup.find_all('meta', property=True):
+        prop = meta.get('property', '')
+        content = meta.get('content', '')
+        if prop == 'og:title':
+            metadata['og_title'] = content
+        elif prop == 'og:description':
+            metadata['og_description'] = content
+        elif prop == 'og:image':
+            metadata['og_image'] = content
+    if not metadata.get('og_title'):
+        for meta in soup.find_all('meta'):
+            name = meta.get('name', '')
+            content = meta.get('content', '')
+            if name.lower() == 'description':
+                metadata['og_description'] = content
+            elif name.lower() == 'twitter:title':
+                metadata['og_title'] = content
+            elif name.lower() == 'twitter:image':
+                metadata['og_image'] = content
+    return metadata
+
+def save_pages(urls):
+    """Download full pages into the corpus (full bodies, so both parsers see real pages)"""
+    import requests
+    from services.http_client import USER_AGENT
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    for url in urls:
+        response = requests.get(url, headers={'User-Agent': USER_AGENT}, timeout=15)
+        response.raise_for_status()
+        host = urlparse(url).netloc.replace('.', '_')
+        name = f"{host}_{hashlib.sha1(url.encode()).hexdigest()[:8]}.html"
+        with open(os.path.join(CORPUS_DIR, name), 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        print(f"Saved {url} -> {name} ({len(response.content) / 1024:.0f} KB)")
+
+def time_parser(parse, html: str, repeat: int) -> float:
+    """Median wall time of `parse(html)` in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse(html)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--save', nargs='+', metavar='URL', help='download pages into the corpus first')
+    parser.add_argument('--repeat', type=int, default=20, help='runs per page and parser (median is reported)')
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.save)
+
+    pages = sorted(f for f in os.listdir(CORPUS_DIR) if f.endswith('.html')) if os.path.isdir(CORPUS_DIR) else []
+    if not pages:
+        print(f"No pages in {CORPUS_DIR}; add some with --save URL ...")
+        return 1
+
+    print(f"Parser: {HTML_PARSER}, {args.repeat} runs per page\n")
+    print(f"{'page':<48} {'KB':>7} {'legacy ms':>10} {'new ms':>8} {'speedup':>8}  jsonld")
+    totals = [0.0, 0.0]
+    for name in pages:
+        with open(os.path.join(CORPUS_DIR, name), encoding='utf-8', errors='replace') as f:
+            html = f.read()
+        legacy = time_parser(legacy_parse, html, args.repeat)
+        new = time_parser(parse_meta_tags, html, args.repeat)
+        totals[0] += legacy
+        totals[1] += new
+        parsed = parse_meta_tags(html)
+        if legacy_parse(html).get('og_title') != parsed.get('og_title'):
+            print(f"  ! og:title differs for {name}")
+        print(f"{name[:48]:<48} {len(html) / 1024:>7.0f} {legacy:>10.2f} {new:>8.2f} "
+              f"{legacy / new if new else 0:>7.1f}x  {'yes' if parsed.get('jsonld') else '-'}")
+
+    print(f"\n{'total':<48} {'':>7} {totals[0]:>10.2f} {totals[1]:>8.2f} "
+          f"{totals[0] / totals[1] if totals[1] else 0:>7.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+# File: metalwall_app/benchmarks/generate_scale_data.py
+# ===========================
+# SCALE-TEST DATA GENERATOR
+# ===========================
+"""
+Fill a scratch database with a synthetic wall of 10k, 100k or 1M albums, plus
+proportional concerts, discoveries and provider caches, shaped like the real
+data in metal_music_backup.db:
+
+- a few heavy posters and a long tail of users (Zipf weights)
+- popular artists posted again and again, tags squashed like 'deathmetal'
+- likes with a long tail (most posts 0-2 likes, a few hundreds)
+- concerts both past and upcoming, ~12% of them festival ranges ('2026-06-18 | 2026-06-21')
+- Last.fm/Spotify/genre/graph caches for every wall artist, link health for most albums
+
+    python benchmarks/generate_scale_data.py --scale 100k --output /tmp/metalwall_100k.db
+    python benchmarks/generate_scale_data.py --scale 250000 --seed 7 --output big.db --force
+
+The same seed and scale always give the same database.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from itertools import accumulate
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+# Rows per executemany call while filling
+CHUNK_SIZE = 20_000
+
+_HANDLES = ['Morbid', 'Grim', 'Necro', 'Doom', 'Frost', 'Goat', 'Riff', 'Skull', 'Void', 'Thrash',
+            'Crust', 'Sludge', 'Blast', 'Tremolo', 'Pit', 'Spike', 'Leather', 'Raven']
+_VENUES = ['Sala Hollander', 'La Guarida del Ángel', 'Sala Custom', 'Razzmatazz', 'Sala But',
+           'Rock Palace', 'The Underworld', 'Backstage', 'Kafe Antzokia', 'Sala Cero']
+_CITIES = ['Sevilla', 'Madrid', 'Barcelona', 'Bilbao', 'Valencia', 'Jerez de la Frontera',
+           'Granada', 'Málaga', 'Lisboa', 'Porto', 'Clisson (France)', 'Wacken (Germany)']
+_EXTRA_TAGS = ['osdm', 'newrelease', 'classic', 'underground', 'demo', 'spanishmetal', 'aotw']
+_GIG_TAGS = ['liveshow', 'festival', 'tour', 'soldout', 'freeentry']
+
+def parse_scale(text: str) -> int:
+    """'10k', '1M' or a plain number of albums"""
+    key = text.strip().lower()
+    if key in SCALES:
+        return SCALES[key]
+    try:
+        return int(key.replace('_', ''))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"unknown scale {text!r} (use {', '.join(SCALES)} or a number)")
+
+def scale_name(albums: int) -> str:
+    return next((name for name, size in SCALES.items() if size == albums), str(albums))
+
+def squash_tag(tag: str) -> str:
+    """'death metal' -> 'deathmetal', as process_tags leaves user tags"""
+    return ''.join(c for c in tag.lower() if c.isalnum() or c == '_')
+
+def _zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    """Cumulative Zipf weights (built once: random.choices would redo the sum on every call)"""
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+def _timestamp(moment: datetime) -> str:
+    # The format CURRENT_TIMESTAMP writes, which is what the app stores
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+def _chunks(rows: Iterable[tuple], size: int = CHUNK_SIZE) -> Iterable[List[tuple]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class ScaleData:
+    """Generators for each table; all randomness comes from one seeded RNG"""
+
+    def __init__(self, albums: int, seed: int, now: datetime, artists: Optional[int] = None,
+                 users: Optional[int] = None):
+        from devtools.catalog import Catalog
+
+        self.rng = random.Random(seed)
+        self.albums = albums
+        self.now = now
+        # Walls repeat artists: ~1 artist per 50 posts, capped so the catalog stays quick to build
+        self.catalog = Catalog(artists or max(50, min(albums // 50, 20_000)), seed)
+        self.users = self._usernames(users or max(20, albums // 100))
+        self.user_weights = _zipf_weights(len(self.users))
+        artists_by_popularity = sorted(self.catalog.artists, key=lambda a: a['popularity'], reverse=True)
+        self.artists = artists_by_popularity
+        self.artist_weights = _zipf_weights(len(self.artists), 0.9)
+        self.posted_artists: Dict[str, Dict] = {}
+
+    def _usernames(self, count: int) -> List[str]:
+        names = []
+        for n in range(count):
+            handle = f"{self.rng.choice(_HANDLES)}{self.rng.choice(_HANDLES)}"
+            names.append(handle if n < len(_HANDLES) else f"{handle}_{n}")
+        return names
+
+    def _user(self) -> str:
+        return self.rng.choices(self.users, cum_weights=self.user_weights)[0]
+
+    def _artist(self) -> Dict:
+        return self.rng.choices(self.artists, cum_weights=self.artist_weights)[0]
+
+    def _likes(self, scale: float = 1.0) -> List[str]:
+        # Pareto tail: most posts get a couple of likes, a handful get hundreds
+        count = min(len(self.users), int((self.rng.paretovariate(1.3) - 1) * 2 * scale))
+        return self.rng.sample(self.users, count) if count else []
+
+    def _tags(self, artist: Dict) -> List[str]:
+        tags = [squash_tag(t) for t in self.rng.sample(artist['tags'][:4], self.rng.randint(1, 3))]
+        if self.rng.random() < 0.2:
+            tags.append(self.rng.choice(_EXTRA_TAGS))
+        return list(dict.fromkeys(tags))[:5]
+
+    def album_rows(self) -> Iterable[tuple]:
+        """(username, url, artist, album_name, cover_url, platform, tags, likes, timestamp, created_at)"""
+        span = timedelta(days=3 * 365).total_seconds()
+        start = self.now - timedelta(days=3 * 365)
+        seen_urls = set()
+        for i in range(self.albums):
+            artist = self._artist()
+            self.posted_artists[artist['id']] = artist
+            album = self.catalog.albums[self.rng.choice(artist['albums'])]
+            roll = self.rng.random()
+            if roll < 0.7:
+                platform, url = 'Spotify', f"https://open.spotify.com/album/{album['id']}"
+            elif roll < 0.95:
+                platform, url = 'Bandcamp', self.catalog.bandcamp_url(album)
+            else:
+                platform, url = 'YouTube Music', f"https://music.youtube.com/playlist?list=OLAK5uy_{album['id']}"
+            if url in seen_urls:
+                # Reposts of the same album come from a share link
+                url = f"{url}{'&' if '?' in url else '?'}si={i:x}"
+            seen_urls.add(url)
+            # Posts arrive in order, with a little jitter
+            posted = start + timedelta(seconds=span * i / self.albums + self.rng.uniform(0, 600))
+            stamp = _timestamp(posted)
+            yield (self._user(), url, artist['name'], album['name'], self.catalog.image_url(album['id']),
+                   platform, str(self._tags(artist)), str(self._likes()), stamp, stamp)
+
+    def concert_rows(self, count: int) -> Iterable[tuple]:
+        """(username, bands, date, venue, city, tags, info, likes, timestamp, created_at)"""
+        for _ in range(count):
+            # 40% already past (delete_past_concerts' work), the rest within the next year
+            day = self.now.date() + timedelta(days=self.rng.randint(-180, -1) if self.rng.random() < 0.4
+                                              else self.rng.randint(0, 365))
+            if self.rng.random() < 0.12:
+                length = self.rng.randint(1, 3)
+                date = f"{day} | {day + timedelta(days=length)}"
+                fest = f"{self.rng.choice(self.catalog.artists)['name'].split()[-1]}fest"
+                bands = f"{fest} {day.year}"
+                venue = f"{fest} Festival"
+                tags = ['festival'] + self.rng.sample(_GIG_TAGS[2:], self.rng.randint(0, 2))
+                info = f"Line Up: https://example.org/{squash_tag(bands)}/lineup"
+            else:
+                date = str(day)
+                bands = ', '.join(a['name'] for a in self.rng.sample(self.artists[:2000], self.rng.randint(1, 4)))
+                venue = self.rng.choice(_VENUES)
+                tags = [squash_tag(t) for t in self.rng.sample(self._artist()['tags'][:4], self.rng.randint(0, 2))]
+                info = f"{self.rng.randint(8, 35)} € anticipada"
+            posted = _timestamp(self.now - timedelta(days=self.rng.randint(0, 200), seconds=self.rng.randint(0, 86400)))
+            yield (self._user(), bands, date, venue, self.rng.choice(_CITIES), str(tags), info,
+                   str(self._likes(0.5)), posted, posted)
+
+    def discovery_rows(self, count: int) -> Iterable[tuple]:
+        """(username, base_artist, base_album, discovered_artist, discovered_album, discovered_url, cover_url, discovered_at)"""
+        posted = list(self.posted_artists.values())
+        for _ in range(count):
+            base = self.rng.choice(posted)
+            found = self.catalog.by_id[self.rng.choice(base['similar'])]
+            album = self.catalog.albums[self.rng.choice(found['albums'])]
+            when = self.now - timedelta(seconds=self.rng.randint(0, 2 * 365 * 86400))
+            yield (self._user(), base['name'], self.catalog.albums[base['albums'][0]]['name'],
+                   found['name'], album['name'], f"https://open.spotify.com/album/{album['id']}",
+                   self.catalog.image_url(album['id']), _timestamp(when))
+
+    def link_health_rows(self, album_ids: Iterable[int]) -> Iterable[tuple]:
+        """80% of albums checked in the last two weeks, a few broken pages and covers"""
+        for album_id in album_ids:
+            if self.rng.random() >= 0.8:
+                continue
+            url_ok = self.rng.random() > 0.03
+            cover_ok = self.rng.random() > 0.05
+            checked = self.now - timedelta(hours=self.rng.randint(1, 24 * 14))
+            yield (album_id, 200 if url_ok else 404, int(url_ok), f'"{album_id:x}"', None,
+                   200 if cover_ok else 404, int(cover_ok), None, None, 0, None, checked.isoformat())
+
+    def cache_rows(self) -> Dict[str, List[tuple]]:
+        """Provider caches as the discovery pipeline leaves them for every wall artist"""
+        from utils.helpers import normalize_artist_key
+
+        fetched = (self.now - timedelta(days=2)).isoformat()
+        lastfm, genres, graph, spotify = [], [], [], []
+        for artist in self.posted_artists.values():
+            key = normalize_artist_key(artist['name'])
+            similar = [self.catalog.by_id[a]['name'] for a in artist['similar']]
+            metal = 'metal' in ' '.join(artist['tags'])
+            lastfm.append((key, artist['name'], json.dumps(artist['tags']), json.dumps(similar), fetched, fetched))
+            genres.append((key, artist['name'], json.dumps(artist['tags']), int(metal),
+                           round(self.rng.uniform(0.6, 1.0), 2), fetched))
+            graph.append((key, artist['name'], json.dumps(similar), 'lastfm', fetched))
+            spotify.append((key, artist['name'], artist['id'], json.dumps(artist['genres']), fetched, fetched))
+        return {'lastfm_artist_cache': lastfm, 'artist_genre': genres, 'artist_graph': graph,
+                'spotify_artists': spotify}
+
+def _fill(conn, table: str, columns: str, rows: Iterable[tuple],
+          progress: Optional[Callable[[str], None]] = None) -> int:
+    placeholders = ','.join('?' * len(columns.split(',')))
+    total = 0
+    for chunk in _chunks(rows):
+        conn.executemany(f"INSERT OR REPLACE INTO {table} ({columns}) VALUES ({placeholders})", chunk)
+        total += len(chunk)
+        if progress:
+            progress(f"  {table}: {total:,}")
+    return total
+
+def generate(albums: int, seed: int = 666, concerts: Optional[int] = None, discoveries: Optional[int] = None,
+             now: Optional[datetime] = None, artists: Optional[int] = None,
+             progress: Optional[Callable[[str], None]] = print) -> Dict:
+    """
+    Create the schema in config.DB_PATH and fill it. Concerts default to a
+    tenth of the albums and discoveries to half. `artists` sizes the catalog
+    the wall draws from; the first N artists of a seed's catalog are the same
+    at any size, so a wall built with N <= the stand-in server's --artists
+    only has artists the stand-ins know. Returns row counts per table.
+    """
+    import sqlite3
+    from config import DB_PATH
+    from database.init_db import init_db
+    from utils.helpers import canonicalize_url
+
+    init_db()
+    data = ScaleData(albums, seed, now or datetime.now(), artists)
+    counts = {}
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        # A scratch database: no journal, no fsync
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        counts['albums'] = _fill(conn, 'albums', 'username, url, artist, album_name, cover_url, platform, '
+                                 'tags, likes, timestamp, created_at', data.album_rows(), progress)
+        counts['concerts'] = _fill(conn, 'concerts', 'username, bands, date, venue, city, tags, info, '
+                                   'likes, timestamp, created_at',
+                                   data.concert_rows(albums // 10 if concerts is None else concerts), progress)
+        counts['album_discoveries'] = _fill(conn, 'album_discoveries', 'username, base_artist, base_album, '
+                                            'discovered_artist, discovered_album, discovered_url, cover_url, '
+                                            'discovered_at',
+                                            data.discovery_rows(albums // 2 if discoveries is None else discoveries),
+                                            progress)
+        columns = {
+            'lastfm_artist_cache': 'artist_key, artist_name, tags, similar, tags_fetched_at, similar_fetched_at',
+            'artist_genre': 'artist_key, artist_name, source_tags, is_metal, confidence, computed_at',
+            'artist_graph': 'artist_key, artist_name, related, source, fetched_at',
+            'spotify_artists': 'artist_key, artist_name, spotify_id, genres, resolved_at, genres_fetched_at'
+        }
+        for table, rows in data.cache_rows().items():
+            counts[table] = _fill(conn, table, columns[table], rows)
+
+        # Metadata cache and link health follow the albums just written (streamed, not fetched)
+        checked = (data.now - timedelta(days=1)).isoformat()
+        counts['url_metadata'] = _fill(conn, 'url_metadata', 'canonical_url, artist, album_name, cover_url, '
+                                       'platform, found, fetched_at', (
+            (canonicalize_url(url), artist, album, cover, platform, 1, checked)
+            for url, artist, album, cover, platform in conn.execute(
+                'SELECT url, artist, album_name, cover_url, platform FROM albums')
+        ))
+        counts['link_health'] = _fill(conn, 'link_health', 'album_id, url_status, url_ok, url_etag, '
+                                      'url_last_modified, cover_status, cover_ok, cover_etag, '
+                                      'cover_last_modified, refreshed, error, checked_at',
+                                      data.link_health_rows(album_id for (album_id,) in
+                                                            conn.execute('SELECT id FROM albums')))
+        conn.commit()
+        conn.execute('ANALYZE')
+    finally:
+        conn.close()
+    return counts
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=parse_scale, default=SCALES['10k'],
+                        help=f"albums to generate: {', '.join(SCALES)} or a number (default 10k)")
+    parser.add_argument('--output', required=True, help='database file to create')
+    parser.add_argument('--concerts', type=int, help='concerts (default: albums / 10)')
+    parser.add_argument('--discoveries', type=int, help='discoveries (default: albums / 2)')
+    parser.add_argument('--seed', type=int, default=666)
+    parser.add_argument('--force', action='store_true', help='overwrite an existing file')
+    parser.add_argument('--quiet', action='store_true')
+    return parser
+
+def main():
+    args = make_parser().parse_args()
+    output = os.path.abspath(args.output)
+    if os.path.exists(output):
+        if not args.force:
+            print(f"{output} already exists (use --force to overwrite)")
+            return 1
+        os.remove(output)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+
+    # config reads this at import time, so it must be set before any app module is imported
+    os.environ['METALWALL_DB_PATH'] = output
+
+    started = time.perf_counter()
+    counts = generate(args.scale, args.seed, args.concerts, args.discoveries,
+                      progress=None if args.quiet else lambda line: print(line, end='\r'))
+    size_mb = os.path.getsize(output) / (1024 * 1024)
+    print(f"\n{scale_name(args.scale)} wall written to {output} ({size_mb:.1f} MB) "
+          f"in {time.perf_counter() - started:.1f}s")
+    for table, count in counts.items():
+        print(f"  {table:<20} {count:>10,}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,556 @@
+# File: metalwall_app/benchmarks/load_test.py
+# ===========================
+# MULTI-SESSION LOAD TEST
+# ===========================
+"""
+Simulate N concurrent users of the app against one shared database and set
+of provider stand-ins, and see where reruns start queueing.
+
+Each session is a headless streamlit.testing AppTest in its own process that
+picks weighted random actions with think time in between: browse Records,
+sort by votes, click tags, like posts, open Gigs and Profile, run discoveries.
+Providers are the offline stand-ins (embedded, or --base) and the wall is a
+scratch database seeded by generate_scale_data.py (or a copy of --db).
+
+    python benchmarks/load_test.py --sessions 1 5 10 20 --duration 60
+    python benchmarks/load_test.py --sessions 10 --mix discover=3,like=0 --latency-ms 80
+    python benchmarks/load_test.py --sessions 25 --albums 500 --output results/load.json
+
+For every stage (one per --sessions value) it reports action latency as the
+user sees it (an AppTest run, including any st.rerun() it triggers), script
+time per page from the render profiler, DB lock failures and COMMIT times
+from database/connection.py, CPU per session (script thread) and CPU/RSS of
+the session processes. AppTest skips the websocket and protobuf transport,
+so these are server-side numbers.
+
+AppTest is not thread-safe: every run installs a mock Runtime singleton and
+swaps st.secrets process-wide, and clears them when it finishes. Sessions
+therefore never share an interpreter; each process sends its samples and
+metric snapshots back to the parent, which merges them per stage. Unlike a
+real server the sessions don't share a GIL or in-memory caches, so contention
+shows up in SQLite (locks, COMMIT times) rather than in CPU queueing.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from queue import Empty
+from typing import Callable, Dict, List, Optional, Set
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from devtools.standin_server import build_server, make_parser as make_standin_parser
+
+APP = os.path.join(ROOT, 'app.py')
+
+SECRETS = {'SPOTIFY_CLIENT_ID': 'loadtest', 'SPOTIFY_CLIENT_SECRET': 'loadtest',
+           'LASTFM_API_KEY': 'loadtest', 'LASTFM_API_SECRET': 'loadtest'}
+
+# action -> (weight, needs a logged-in user)
+ACTIONS = {
+    'browse_records': (3, False),
+    'sort_votes': (2, False),
+    'sort_timeline': (1, False),
+    'click_tag': (2, False),
+    'clear_filter': (1, False),
+    'like': (2, True),
+    'open_gigs': (2, False),
+    'open_profile': (1, True),
+    'discover': (1, True),
+}
+
+def percentile(values: List[float], pct: int) -> Optional[float]:
+    """Inclusive percentile (None for an empty sample)"""
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+def rss_mb() -> float:
+    """Resident memory of this process"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        # No /proc: peak RSS is the closest we get (KB on Linux, bytes on macOS)
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """'discover=3,like=0' -> weight overrides"""
+    mix = {}
+    for item in filter(None, text.split(',')):
+        name, _, weight = item.partition('=')
+        if name not in ACTIONS or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f"expected ACTION=WEIGHT with ACTION in {', '.join(ACTIONS)}")
+        mix[name] = int(weight)
+    return mix
+
+class Session:
+    """One simulated user: an AppTest and the samples of every action it took"""
+
+    def __init__(self, index: int, username: Optional[str], weights: Dict[str, int], think: float,
+                 timeout: float, seed: int):
+        from config import USER_NAV_OPTIONS
+        self.records, self.gigs, self.random_album, self.profile = USER_NAV_OPTIONS
+        self.index = index
+        self.username = username
+        self.rng = random.Random(seed * 1000 + index)
+        self.think = think
+        self.timeout = timeout
+        self.actions = [name for name, (_, login) in ACTIONS.items() if username or not login]
+        self.weights = [weights[name] for name in self.actions]
+        self.at = None
+        self.page = None
+        self.samples: List[tuple] = []   # (action, ms, ok)
+        self.errors: Dict[str, int] = {}
+        self.skipped = 0
+
+    # ---- AppTest plumbing ----
+
+    def _run(self, action: str, step: Callable):
+        started = time.perf_counter()
+        ok = True
+        try:
+            step()
+            if self.at.exception:
+                ok = False
+                message = str(self.at.exception[0].value).splitlines()[0][:120]
+                self.errors[message] = self.errors.get(message, 0) + 1
+        except Exception as e:
+            ok = False
+            message = f"{type(e).__name__}: {e}".splitlines()[0][:120]
+            self.errors[message] = self.errors.get(message, 0) + 1
+        self.samples.append((action, (time.perf_counter() - started) * 1000, ok))
+
+    def open(self):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file(APP, default_timeout=self.timeout)
+        for key, value in SECRETS.items():
+            self.at.secrets[key] = value
+        if self.username:
+            self.at.session_state['current_user'] = self.username
+        self._run('open_app', self.at.run)
+        self.page = self.records
+
+    def goto(self, page: str, action: str = 'navigate'):
+        if self.page != page:
+            self._run(action, lambda: self.at.sidebar.radio[0].set_value(page).run())
+            self.page = page
+
+    def click(self, action: str, key: Optional[str] = None, prefix: Optional[str] = None) -> bool:
+        buttons = [b for b in self.at.button
+                   if b.key and (b.key == key or (prefix is not None and b.key.startswith(prefix)))]
+        if not buttons:
+            return False
+        button = self.rng.choice(buttons)
+        self._run(action, lambda: button.click().run())
+        return True
+
+    def refresh(self, action: str, page: str):
+        if self.page == page:
+            self._run(action, self.at.run)
+        else:
+            self.goto(page, action)
+
+    # ---- actions ----
+
+    def act(self, action: str) -> bool:
+        """Take one action; False when it does not apply right now (e.g. no filter to clear)"""
+        if action == 'browse_records':
+            self.refresh(action, self.records)
+            return True
+        if action == 'open_gigs':
+            self.refresh(action, self.gigs)
+            return True
+        if action == 'open_profile':
+            self.refresh(action, self.profile)
+            return True
+        if action == 'discover':
+            self.goto(self.random_album)
+            return self.click(action, key='discover_main')
+        self.goto(self.records)
+        if action in ('sort_votes', 'sort_timeline'):
+            return self.click(action, key=action)
+        if action == 'click_tag':
+            return self.click(action, prefix='feed_tag_')
+        if action == 'clear_filter':
+            return self.click(action, key='clear_feed_filter')
+        if action == 'like':
+            return self.click(action, prefix='like_')
+        return False
+
+    def loop(self, start_at: float, deadline: float):
+        # Wall-clock times: the schedule is shared by every session process
+        time.sleep(max(0.0, start_at - time.time()))
+        self.open()
+        while time.time() < deadline:
+            action = self.rng.choices(self.actions, self.weights)[0]
+            if not self.act(action):
+                self.skipped += 1
+                continue
+            time.sleep(self.think * self.rng.uniform(0.5, 1.5))
+
+    def totals(self) -> Dict:
+        """Rerun totals the render profiler kept in this session's state"""
+        from utils.render_profiler import SESSION_TOTALS_KEY
+        try:
+            return dict(self.at.session_state[SESSION_TOTALS_KEY])
+        except Exception:
+            return {'reruns': 0, 'seconds': 0.0, 'cpu_seconds': 0.0}
+
+    def report(self) -> Dict:
+        return {'index': self.index, 'user': self.username, 'samples': self.samples,
+                'errors': self.errors, 'skipped': self.skipped, 'totals': self.totals()}
+
+class MemoryMonitor:
+    """Samples process RSS in the background while a stage runs"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.peak = rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='load-rss', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_mb())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_mb())
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else seconds * 1000
+
+def latency_summary(values: List[float]) -> Dict:
+    return {'count': len(values), 'p50': percentile(values, 50), 'p95': percentile(values, 95),
+            'p99': percentile(values, 99), 'max': max(values) if values else None}
+
+def _metric_snapshots() -> Dict:
+    """What this session process recorded, in a form the parent can merge"""
+    from database.connection import get_statement_stats
+    from utils.metrics import get_family, sum_counter
+
+    def snapshots(name: str, label: str) -> List[tuple]:
+        family = get_family(name)
+        return [(labels.get(label, 'all'), snapshot) for labels, snapshot in (family['samples'] if family else [])]
+
+    commit = next((entry for entry in get_statement_stats() if entry['statement'] == 'COMMIT'), None)
+    return {
+        'rerun_seconds': snapshots('metalwall_rerun_seconds', 'page'),
+        'statement_seconds': snapshots('metalwall_db_statement_seconds', 'kind'),
+        'lock_errors': sum_counter('metalwall_db_lock_errors_total').get((), 0.0),
+        'slow_statements': sum(sum_counter('metalwall_db_slow_statements_total').values()),
+        'commit_max_ms': commit['max_ms'] if commit else None
+    }
+
+def session_process(index: int, username: Optional[str], weights: Dict[str, int], settings: Dict,
+                    queue, go, start):
+    """One session's process: a single AppTest, reporting 'ready' and then its 'result' on `queue`"""
+    try:
+        # Import everything up front so the baseline RSS excludes only the session itself
+        from streamlit.testing.v1 import AppTest  # noqa: F401
+        session = Session(index, username, weights, settings['think'], settings['timeout'], settings['seed'])
+        baseline = rss_mb()
+    except Exception as e:
+        queue.put(('failed', index, f"{type(e).__name__}: {e}"))
+        return
+    queue.put(('ready', index, None))
+
+    go.wait()
+    started = start.value
+    cpu_started = time.process_time()
+    try:
+        with MemoryMonitor() as memory:
+            session.loop(started + settings['ramp'] * index / settings['count'],
+                         started + settings['ramp'] + settings['duration'])
+    except Exception as e:
+        queue.put(('failed', index, f"{type(e).__name__}: {e}"))
+        return
+    queue.put(('result', index, {**session.report(), 'cpu_seconds': time.process_time() - cpu_started,
+                                 'baseline_mb': baseline, 'peak_mb': memory.peak,
+                                 'metrics': _metric_snapshots()}))
+
+def _gather(queue, processes: List, kind: str, waiting: Set[int], timeout: float,
+            failed: Dict[int, str]) -> Dict[int, object]:
+    """Wait for a `kind` message from every session in `waiting`; crashes and timeouts go to `failed`"""
+    received: Dict[int, object] = {}
+    deadline = time.time() + timeout
+    while waiting - received.keys() - failed.keys():
+        try:
+            message, index, payload = queue.get(timeout=0.5)
+        except Empty:
+            for index in waiting - received.keys() - failed.keys():
+                if not processes[index].is_alive():
+                    failed[index] = f"session process exited with code {processes[index].exitcode}"
+                elif time.time() > deadline:
+                    failed[index] = f"no {kind} message after {timeout:.0f}s"
+            continue
+        if message == 'failed':
+            failed[index] = payload
+        elif message == kind:
+            received[index] = payload
+    return received
+
+def run_stage(count: int, args, weights: Dict[str, int]) -> Dict:
+    """Run `count` sessions (one process each) for the configured duration and collect what they cost"""
+    from utils.metrics import summarize_snapshots
+
+    # spawn: a fresh interpreter per session, nothing inherited from this one's threads or the stand-in server
+    ctx = multiprocessing.get_context('spawn')
+    queue, go, start = ctx.Queue(), ctx.Event(), ctx.Value('d', 0.0)
+    users = max(1, round(count * (1 - args.guest_share)))
+    settings = {'think': args.think_ms / 1000, 'timeout': args.timeout, 'seed': args.seed,
+                'ramp': args.ramp, 'duration': args.duration, 'count': count}
+    processes = [ctx.Process(target=session_process, name=f"load-session-{i}", daemon=True,
+                             args=(i, f"loadtest{i}" if i < users else None, weights, settings, queue, go, start))
+                 for i in range(count)]
+    for process in processes:
+        process.start()
+
+    failed: Dict[int, str] = {}
+    ready = _gather(queue, processes, 'ready', set(range(count)), 120 + args.timeout, failed)
+    start.value = started = time.time()
+    go.set()
+    results = _gather(queue, processes, 'result', set(ready), args.ramp + args.duration + 2 * args.timeout + 60,
+                      failed)
+    wall = time.time() - started
+    for process in processes:
+        process.join(timeout=10)
+        if process.is_alive():
+            process.terminate()
+
+    sessions = [results[i] for i in sorted(results)]
+    samples = [tuple(sample) for s in sessions for sample in s['samples']]
+    by_action: Dict[str, List[tuple]] = {}
+    for action, ms, ok in samples:
+        by_action.setdefault(action, []).append((ms, ok))
+    errors: Dict[str, int] = {}
+    for s in sessions:
+        for message, n in s['errors'].items():
+            errors[message] = errors.get(message, 0) + n
+    for index, message in failed.items():
+        message = f"session {index}: {message}".splitlines()[0][:120]
+        errors[message] = errors.get(message, 0) + 1
+
+    rerun_by_page: Dict[str, List[Dict]] = {}
+    commit_snapshots = []
+    for s in sessions:
+        for page, snapshot in s['metrics']['rerun_seconds']:
+            rerun_by_page.setdefault(page, []).append(snapshot)
+        commit_snapshots.extend(snapshot for kind, snapshot in s['metrics']['statement_seconds'] if kind == 'commit')
+    commit = summarize_snapshots(commit_snapshots)
+    commit_max = [s['metrics']['commit_max_ms'] for s in sessions if s['metrics']['commit_max_ms'] is not None]
+
+    per_session = []
+    for s in sessions:
+        per_session.append({
+            'session': s['index'],
+            'user': s['user'],
+            'actions': len(s['samples']),
+            'skipped': s['skipped'],
+            'errors': sum(s['errors'].values()),
+            'p95_ms': percentile([ms for _, ms, _ in s['samples']], 95),
+            'reruns': s['totals']['reruns'],
+            'script_seconds': s['totals']['seconds'],
+            'cpu_seconds': s['totals']['cpu_seconds'],
+            'process_cpu_seconds': s['cpu_seconds'],
+            'peak_mb': s['peak_mb']
+        })
+    session_cpu = [p['cpu_seconds'] for p in per_session]
+    cpu = sum(s['cpu_seconds'] for s in sessions)
+
+    return {
+        'sessions': count,
+        'logged_in': users,
+        'failed_sessions': len(failed),
+        'wall_seconds': wall,
+        'actions': len(samples),
+        'actions_per_second': len(samples) / wall if wall else 0.0,
+        'error_rate': sum(1 for _, _, ok in samples if not ok) / len(samples) if samples else 0.0,
+        'latency_ms': latency_summary([ms for _, ms, _ in samples]),
+        'by_action': {action: {**latency_summary([ms for ms, _ in values]),
+                               'errors': sum(1 for _, ok in values if not ok)}
+                      for action, values in sorted(by_action.items())},
+        'script_ms_by_page': {page: {k: _ms(v) if k != 'count' else v
+                                     for k, v in summarize_snapshots(snapshots).items()}
+                              for page, snapshots in sorted(rerun_by_page.items())},
+        'db': {
+            'lock_errors': sum(s['metrics']['lock_errors'] for s in sessions),
+            'commits': commit['count'],
+            'commit_ms': {q: _ms(commit[q]) for q in ('p50', 'p95', 'p99')} if commit['count'] else {},
+            'commit_max_ms': max(commit_max) if commit_max else None,
+            'slow_statements': sum(s['metrics']['slow_statements'] for s in sessions)
+        },
+        'cpu': {
+            'process_seconds': cpu,
+            # Cores kept busy by the session processes (AppTest's own overhead included)
+            'process_utilization': cpu / wall if wall else 0.0,
+            'session_mean_seconds': statistics.fmean(session_cpu) if session_cpu else 0.0,
+            'session_max_seconds': max(session_cpu) if session_cpu else 0.0
+        },
+        'memory': {
+            'baseline_mb': statistics.fmean(s['baseline_mb'] for s in sessions) if sessions else 0.0,
+            # Every session process together (their peaks may not coincide)
+            'peak_mb': sum(s['peak_mb'] for s in sessions),
+            'per_session_mb': statistics.fmean(s['peak_mb'] - s['baseline_mb'] for s in sessions) if sessions else 0.0
+        },
+        'errors': errors,
+        'per_session': per_session
+    }
+
+def print_stage(stage: Dict):
+    fmt = lambda v, d=0: '-' if v is None else f"{v:.{d}f}"
+    latency, db, cpu, memory = stage['latency_ms'], stage['db'], stage['cpu'], stage['memory']
+    print(f"\n[{stage['sessions']} sessions] {stage['actions']} actions in {stage['wall_seconds']:.0f}s "
+          f"({stage['actions_per_second']:.1f}/s), {stage['error_rate']:.1%} errors")
+    print(f"  latency ms   p50 {fmt(latency['p50'])}  p95 {fmt(latency['p95'])}  "
+          f"p99 {fmt(latency['p99'])}  max {fmt(latency['max'])}")
+    for action, stats in stage['by_action'].items():
+        print(f"    {action:<16} x{stats['count']:<5} p50 {fmt(stats['p50']):>6}  p95 {fmt(stats['p95']):>6}"
+              + (f"  ({stats['errors']} errors)" if stats['errors'] else ''))
+    print(f"  db           {fmt(db['lock_errors'])} lock errors, {db['commits']} commits "
+          f"(p95 {fmt(db['commit_ms'].get('p95'), 1)} ms, max {fmt(db['commit_max_ms'], 1)} ms)")
+    print(f"  cpu          {cpu['process_utilization']:.2f} cores busy, "
+          f"{cpu['session_mean_seconds']:.2f}s script CPU per session")
+    print(f"  memory       {memory['peak_mb']:.0f} MB over all session processes, "
+          f"~{memory['per_session_mb']:.1f} MB per session above the {memory['baseline_mb']:.0f} MB baseline")
+    if stage['failed_sessions']:
+        print(f"  {stage['failed_sessions']} session processes failed")
+    for message, count in sorted(stage['errors'].items(), key=lambda item: -item[1])[:5]:
+        print(f"  error x{count}: {message}")
+
+def seed_database(args, artists: int) -> str:
+    """Scratch database for the run: a copy of --db, or a generated wall"""
+    scratch = tempfile.mkdtemp(prefix='metalwall-load-')
+    path = os.path.join(scratch, 'load.db')
+    if args.db:
+        shutil.copyfile(args.db, path)
+    # config reads these at import time, so they must be set before any app module is imported
+    os.environ['METALWALL_DB_PATH'] = path
+    if not args.db:
+        from generate_scale_data import generate
+        generate(args.albums, args.seed, artists=min(artists, max(50, args.albums // 50)), progress=None)
+    return path
+
+def make_parser() -> argparse.ArgumentParser:
+    # Fault-injection flags are the stand-in server's own
+    standin = make_standin_parser()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     parents=[standin], add_help=False, conflict_handler='resolve')
+    parser.add_argument('-h', '--help', action='help')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 5, 10],
+                        help='concurrent sessions; one stage per value')
+    parser.add_argument('--duration', type=float, default=60.0, help='seconds of activity per stage')
+    parser.add_argument('--ramp', type=float, default=5.0, help='seconds over which sessions start')
+    parser.add_argument('--think-ms', type=float, default=1000.0, help='mean pause between actions')
+    parser.add_argument('--mix', type=parse_mix, default={}, help='action weights, e.g. discover=3,like=0')
+    parser.add_argument('--guest-share', type=float, default=0.2, help='share of sessions not logged in')
+    parser.add_argument('--timeout', type=float, default=60.0, help='AppTest timeout per script run')
+    parser.add_argument('--albums', type=int, default=150, help='albums on the generated wall')
+    parser.add_argument('--db', help='run against a copy of this database instead')
+    parser.add_argument('--base', help='use an already running stand-in server at this URL')
+    parser.add_argument('--port', type=int, default=0, help='port of the embedded server (0 = any free port)')
+    parser.add_argument('--label', default='', help='free-form label stored with the results')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    return parser
+
+def main():
+    args = make_parser().parse_args()
+    weights = {name: args.mix.get(name, weight) for name, (weight, _) in ACTIONS.items()}
+
+    server = None
+    if args.base:
+        base = args.base.rstrip('/')
+    else:
+        server = build_server(args)
+        server.start()
+        base = server.base_url
+    os.environ['METALWALL_PROVIDER_BASE'] = base
+    db_path = seed_database(args, args.artists)
+
+    print(f"Stand-ins at {base}, scratch DB {db_path}")
+    stages = []
+    for count in args.sessions:
+        stage = run_stage(count, args, weights)
+        print_stage(stage)
+        stages.append(stage)
+
+    report = {
+        'benchmark': 'load',
+        'label': args.label,
+        'revision': git_revision(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'settings': {
+            'sessions': args.sessions,
+            'duration': args.duration,
+            'ramp': args.ramp,
+            'think_ms': args.think_ms,
+            'weights': weights,
+            'guest_share': args.guest_share,
+            'albums': None if args.db else args.albums,
+            'db': args.db,
+            'latency_ms': args.latency_ms,
+            'error_rate': args.error_rate,
+            'throttle_rate': args.throttle_rate,
+            'external_server': bool(args.base)
+        },
+        'summary': [
+            {'sessions': s['sessions'], 'actions_per_second': s['actions_per_second'],
+             'p50_ms': s['latency_ms']['p50'], 'p95_ms': s['latency_ms']['p95'], 'p99_ms': s['latency_ms']['p99'],
+             'error_rate': s['error_rate'], 'failed_sessions': s['failed_sessions'],
+             'lock_errors': s['db']['lock_errors'], 'commit_p95_ms': s['db']['commit_ms'].get('p95'),
+             'cpu_utilization': s['cpu']['process_utilization'], 'mb_per_session': s['memory']['per_session_mb']}
+            for s in stages
+        ],
+        'stages': stages
+    }
+
+    print(f"\n{'sessions':>8} {'actions/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'locks':>6} {'cores':>6}")
+    for row in report['summary']:
+        print(f"{row['sessions']:>8} {row['actions_per_second']:>10.1f} {row['p50_ms'] or 0:>8.0f} "
+              f"{row['p95_ms'] or 0:>8.0f} {row['p99_ms'] or 0:>8.0f} {row['lock_errors']:>6.0f} "
+              f"{row['cpu_utilization']:>6.2f}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\nResults written to {args.output}")
+    if server:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
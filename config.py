@@ -3,6 +3,7 @@
 # CONFIGURATION AND CONSTANTS
 # ===========================
 
+import os
 import streamlit as st
 
 # Streamlit configuration
@@ -13,13 +14,73 @@ PAGE_CONFIG = {
     "initial_sidebar_state": "expanded"
 }
 
-# Database configuration
-DB_PATH = "metal_music.db"
+# Database configuration (METALWALL_DB_PATH lets benchmarks use a scratch database)
+DB_PATH = os.environ.get("METALWALL_DB_PATH", "metal_music.db")
+
+# Slow-query log: statements at or over this duration (ms) are kept in a ring buffer
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("METALWALL_SLOW_QUERY_MS", "50"))
+SLOW_QUERY_LOG_SIZE = 200
 
 # API service names
 SPOTIFY = "spotify"
 LASTFM = "lastfm"
 BANDCAMP = "bandcamp"
+WEB = "web"  # arbitrary platform pages (metadata extraction)
+LINK_HEALTH = "link_health"  # background link checks (own budget, never starves WEB)
+
+# Offline development: METALWALL_PROVIDER_BASE (e.g. http://127.0.0.1:8765) sends every
+# provider request to the devtools stand-in server; platform pages go to <base>/web/<host>/...
+PROVIDER_BASE = os.environ.get("METALWALL_PROVIDER_BASE", "").rstrip("/")
+
+# Provider endpoints
+LASTFM_API_URL = f"{PROVIDER_BASE}/2.0/" if PROVIDER_BASE else "https://ws.audioscrobbler.com/2.0/"
+BANDCAMP_SEARCH_URL = f"{PROVIDER_BASE}/search" if PROVIDER_BASE else "https://bandcamp.com/search"
+SPOTIFY_API_PREFIX = f"{PROVIDER_BASE}/v1/" if PROVIDER_BASE else "https://api.spotify.com/v1/"
+SPOTIFY_TOKEN_URL = f"{PROVIDER_BASE}/api/token" if PROVIDER_BASE else "https://accounts.spotify.com/api/token"
+
+# Per-provider token buckets shared by every session: (requests/second, burst)
+PROVIDER_RATE_LIMITS = {
+    SPOTIFY: (8.0, 16),
+    LASTFM: (4.0, 5),
+    BANDCAMP: (1.0, 3),
+    WEB: (5.0, 10),
+    LINK_HEALTH: (3.0, 6),
+    'default': (5.0, 10),
+}
+
+# HTTP retries: attempts, jittered exponential backoff (seconds) and the longest
+# Retry-After we are willing to wait before giving up
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_BASE = 0.5
+HTTP_BACKOFF_MAX = 8.0
+HTTP_RETRY_AFTER_MAX = 30.0
+
+# Keep-alive connection pools: hosts kept per provider session and sockets per host
+HTTP_POOL_HOSTS = 20
+HTTP_POOL_MAXSIZE = 10
+
+# Metadata pages are read only up to </head>, never past this many decoded bytes
+HEAD_FETCH_MAX_BYTES = 256 * 1024
+HEAD_FETCH_CHUNK_SIZE = 16 * 1024
+
+# Circuit breakers: rolling window of calls, minimum calls before tripping,
+# failure share that opens the breaker, latency counted as a failure (seconds)
+# and how long an open breaker waits before letting a probe through (seconds)
+_BREAKER_DEFAULTS = {'window': 20, 'min_calls': 5, 'failure_threshold': 0.5, 'cooldown': 30.0}
+CIRCUIT_BREAKER_SETTINGS = {
+    SPOTIFY: {**_BREAKER_DEFAULTS, 'slow_call_seconds': 4.0},
+    LASTFM: {**_BREAKER_DEFAULTS, 'slow_call_seconds': 4.0},
+    BANDCAMP: {**_BREAKER_DEFAULTS, 'slow_call_seconds': 6.0, 'cooldown': 60.0},
+    WEB: {**_BREAKER_DEFAULTS, 'slow_call_seconds': 6.0, 'min_calls': 10},
+    LINK_HEALTH: {**_BREAKER_DEFAULTS, 'slow_call_seconds': 10.0, 'min_calls': 10, 'cooldown': 120.0},
+    'default': {**_BREAKER_DEFAULTS, 'slow_call_seconds': 6.0},
+}
+# Providers that reach arbitrary sites get one breaker per host (using the
+# provider's settings above), so one failing site can't block all the others
+CIRCUIT_BREAKER_PER_HOST = {WEB, LINK_HEALTH}
+
+# Total time budget of the album posting pipeline (seconds)
+POST_PIPELINE_DEADLINE = 10
 
 # Platform mappings
 PLATFORMS = {
@@ -37,6 +98,93 @@ PLATFORMS = {
     'jiosaavn': 'JioSaavn',
 }
 
+# Last.fm cache configuration (seconds / entries)
+LASTFM_CACHE_TTL = 7 * 24 * 3600
+LASTFM_MEMORY_CACHE_SIZE = 2048
+LASTFM_MEMORY_CACHE_TTL = 3600
+
+# Artist genre index: verdict lifetime (seconds) and the confidence needed
+# to skip a known non-metal artist during discovery without any API call
+ARTIST_GENRE_TTL = 30 * 24 * 3600
+ARTIST_GENRE_REJECT_CONFIDENCE = 0.8
+
+# Random album discovery: candidates evaluated in parallel and total time budget (seconds)
+DISCOVERY_CONCURRENCY = 4
+DISCOVERY_DEADLINE = 25
+
+# Related-artist graph: adjacency lists older than this (seconds) are refreshed;
+# empty lists expire sooner so a one-off miss doesn't block discovery for weeks
+ARTIST_GRAPH_TTL = 14 * 24 * 3600
+ARTIST_GRAPH_EMPTY_TTL = 24 * 3600
+
+# Background jobs: finished per-key jobs ("kind:key") are dropped from the
+# registry after this many seconds; named singleton jobs are always kept
+BACKGROUND_JOB_RETENTION = 30 * 60
+
+# Pre-warmed discovery pool: ready discoveries per base artist / global,
+# entry lifetime and minimum spacing between background productions (seconds)
+DISCOVERY_POOL_DEPTH = 3
+DISCOVERY_POOL_GLOBAL_DEPTH = 5
+DISCOVERY_POOL_TTL = 30 * 60
+DISCOVERY_POOL_MAX_ARTISTS = 50
+DISCOVERY_POOL_REFILL_INTERVAL = 2.0
+
+# Spotify artist resolver: lifetime of a resolved ID, of a "not found" answer
+# and of cached artist genres (seconds); album pages fetched per artist
+SPOTIFY_ARTIST_TTL = 30 * 24 * 3600
+SPOTIFY_NEGATIVE_TTL = 24 * 3600
+SPOTIFY_GENRES_TTL = 7 * 24 * 3600
+SPOTIFY_ALBUM_PAGES = 4
+
+# Bandcamp link cache: lifetime of a found link and of a "not on Bandcamp" answer (seconds)
+BANDCAMP_LINK_TTL = 30 * 24 * 3600
+BANDCAMP_NEGATIVE_TTL = 3 * 24 * 3600
+
+# URL metadata cache: lifetime of extracted metadata and of a failed extraction (seconds)
+URL_METADATA_TTL = 30 * 24 * 3600
+URL_METADATA_NEGATIVE_TTL = 3600
+
+# Bulk import: metadata fetches in flight, per host, and albums per insert transaction
+BULK_IMPORT_CONCURRENCY = 8
+BULK_IMPORT_PER_HOST = 2
+BULK_IMPORT_BATCH_SIZE = 50
+
+# Cover thumbnail cache: served by Streamlit static file serving from ./static/covers
+# (relative URL app/static/covers/...); display heights in px, pixel density of the
+# stored files, total size on disk before the oldest thumbnails are evicted, fetch workers
+COVER_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "covers")
+COVER_CACHE_URL = "app/static/covers"
+COVER_SIZES = (180, 80)
+COVER_PIXEL_DENSITY = 2
+COVER_CACHE_MAX_BYTES = 200 * 1024 * 1024
+COVER_FETCH_WORKERS = 4
+
+# Link health checker: recheck interval (seconds), albums per run, requests in
+# flight, per host, and minimum spacing between requests to one host (seconds)
+LINK_HEALTH_MAX_AGE = 7 * 24 * 3600
+LINK_HEALTH_BATCH = 500
+LINK_HEALTH_CONCURRENCY = 8
+LINK_HEALTH_PER_HOST = 2
+LINK_HEALTH_HOST_INTERVAL = 0.5
+
+# Tracing: finished pipeline traces kept in memory and spans recorded per trace
+# (METALWALL_TRACING=0 turns recording off)
+TRACING_ENABLED = os.environ.get("METALWALL_TRACING", "1") != "0"
+TRACE_BUFFER_SIZE = 100
+TRACE_MAX_SPANS = 500
+
+# Render profiler: samples kept per page/section and window (seconds) for rerun rates
+# (METALWALL_RENDER_PROFILING=0 turns it off; admin cProfile captures still work)
+RENDER_PROFILING_ENABLED = os.environ.get("METALWALL_RENDER_PROFILING", "1") != "0"
+RENDER_PROFILE_SAMPLES = 1000
+RENDER_RATE_WINDOW = 60
+
+# Prometheus text endpoint (side-car listener, one per process): GET http://host:port/metrics
+# (METALWALL_METRICS=0 disables it)
+METRICS_ENABLED = os.environ.get("METALWALL_METRICS", "1") != "0"
+METRICS_HOST = os.environ.get("METALWALL_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("METALWALL_METRICS_PORT", "9464"))
+
 # Default values
 DEFAULT_SORT_OPTION = "Timeline"
 SORT_OPTIONS = ["Timeline", "Votes"]
@@ -0,0 +1,300 @@
+# File: metalwall_app/database/connection.py
+# ===========================
+# TIMED DATABASE CONNECTIONS
+# ===========================
+"""
+`get_connection()` returns a sqlite3 connection whose statements are timed.
+
+Every execute/executemany (and commit, which is where lock waits show up) is
+recorded in a per-statement registry and in the metrics registry; statements
+slower than SLOW_QUERY_THRESHOLD_MS also go to a ring buffer of slow queries.
+For SELECTs the time spent fetching counts too: a statement is recorded once
+its rows are exhausted or its cursor is closed, with the number of rows read.
+The registry keeps one sample of each statement's parameters so Admin Tools
+can run EXPLAIN QUERY PLAN on everything the app has executed and flag table
+scans.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+from config import DB_PATH, SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_LOG_SIZE
+from utils.metrics import counter, histogram
+
+DB_STATEMENT_SECONDS = histogram("metalwall_db_statement_seconds", "Duration of SQL statements", ["kind"])
+DB_SLOW_STATEMENTS = counter("metalwall_db_slow_statements_total", "Statements over the slow-query threshold",
+                             ["kind"])
+DB_LOCK_ERRORS = counter("metalwall_db_lock_errors_total", "Statements that failed with 'database is locked'")
+
+# Name of the operations.py function running the statement (set by its decorator)
+_operation: ContextVar = ContextVar('db_operation', default=None)
+
+_statements: Dict[str, Dict] = {}
+_slow_queries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+_lock = threading.Lock()
+
+_WHITESPACE = re.compile(r'\s+')
+_PLACEHOLDER_LIST = re.compile(r'\?(\s*,\s*\?)+')
+
+def normalize_sql(sql: str) -> str:
+    """One key per statement shape: collapsed whitespace, IN (?, ?, ...) lists folded"""
+    return _PLACEHOLDER_LIST.sub('?, ...', _WHITESPACE.sub(' ', sql).strip())
+
+def _kind(statement: str) -> str:
+    return statement.split(' ', 1)[0].lower() if statement else 'unknown'
+
+@contextmanager
+def operation_scope(name: str):
+    """Attribute the statements run inside to a database operation"""
+    token = _operation.set(name)
+    try:
+        yield
+    finally:
+        _operation.reset(token)
+
+def _record(sql: str, params, elapsed: float, rows: int = 0, error: Optional[Exception] = None,
+            operation: Optional[str] = None):
+    statement = normalize_sql(sql)
+    kind = _kind(statement)
+    operation = operation or _operation.get()
+    DB_STATEMENT_SECONDS.observe(elapsed, kind=kind)
+    if error is not None and 'locked' in str(error):
+        DB_LOCK_ERRORS.inc()
+    slow = elapsed * 1000 >= SLOW_QUERY_THRESHOLD_MS
+    if slow:
+        DB_SLOW_STATEMENTS.inc(kind=kind)
+
+    with _lock:
+        entry = _statements.get(statement)
+        if entry is None:
+            entry = _statements[statement] = {
+                'statement': statement, 'kind': kind, 'operations': set(),
+                'sample_sql': sql, 'sample_params': params,
+                'calls': 0, 'rows': 0, 'total': 0.0, 'max': 0.0, 'errors': 0, 'slow': 0
+            }
+        if operation:
+            entry['operations'].add(operation)
+        entry['calls'] += 1
+        entry['rows'] += rows
+        entry['total'] += elapsed
+        entry['max'] = max(entry['max'], elapsed)
+        entry['errors'] += 1 if error is not None else 0
+        entry['slow'] += 1 if slow else 0
+        if slow:
+            _slow_queries.append({
+                'at': datetime.now(),
+                'operation': operation,
+                'statement': statement,
+                'params': repr(params)[:200] if params is not None else '',
+                'rows': rows,
+                'duration_ms': elapsed * 1000,
+                'error': str(error) if error is not None else None
+            })
+
+class TimedCursor(sqlite3.Cursor):
+    """
+    Cursor that records the duration of every statement. A statement with a
+    result set stays pending while its rows are fetched, so fetch time and the
+    real row count are part of its entry.
+    """
+
+    _pending: Optional[Dict] = None
+
+    def _flush(self):
+        """Record the pending statement (if any)"""
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            _record(**pending)
+
+    def _executed(self, sql, params, started: float):
+        self._flush()
+        pending = {'sql': sql, 'params': params, 'elapsed': time.perf_counter() - started,
+                   'rows': 0, 'operation': _operation.get()}
+        if self.description is None:
+            # No result set (INSERT/UPDATE/DDL): rowcount is the number of rows written
+            pending['rows'] = max(self.rowcount, 0)
+            _record(**pending)
+        else:
+            self._pending = pending
+
+    def _fetched(self, started: float, rows: int, done: bool, error: Optional[Exception] = None):
+        pending = self._pending
+        if pending is None:
+            return
+        pending['elapsed'] += time.perf_counter() - started
+        pending['rows'] += rows
+        if error is not None:
+            pending['error'] = error
+        if done or error is not None:
+            self._flush()
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            result = super().execute(sql, parameters)
+        except sqlite3.Error as e:
+            self._flush()
+            _record(sql, parameters, time.perf_counter() - started, 0, e)
+            raise
+        self._executed(sql, parameters, started)
+        return result
+
+    def executemany(self, sql, seq_of_parameters):
+        seq_of_parameters = list(seq_of_parameters)
+        started = time.perf_counter()
+        try:
+            result = super().executemany(sql, seq_of_parameters)
+        except sqlite3.Error as e:
+            self._flush()
+            _record(sql, None, time.perf_counter() - started, 0, e)
+            raise
+        self._executed(sql, seq_of_parameters[0] if seq_of_parameters else None, started)
+        return result
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            row = super().fetchone()
+        except sqlite3.Error as e:
+            self._fetched(started, 0, True, e)
+            raise
+        self._fetched(started, 0 if row is None else 1, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        started = time.perf_counter()
+        try:
+            rows = super().fetchmany(size)
+        except sqlite3.Error as e:
+            self._fetched(started, 0, True, e)
+            raise
+        self._fetched(started, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            rows = super().fetchall()
+        except sqlite3.Error as e:
+            self._fetched(started, 0, True, e)
+            raise
+        self._fetched(started, len(rows), True)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0, True)
+            raise
+        except sqlite3.Error as e:
+            self._fetched(started, 0, True, e)
+            raise
+        self._fetched(started, 1, False)
+        return row
+
+    def close(self):
+        self._flush()
+        super().close()
+
+    def __del__(self):
+        # Rows left unread (e.g. fetchone() of a single row): record what was read
+        try:
+            self._flush()
+        except Exception:
+            pass
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors (and conn.execute) are timed, commits included"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    # The C implementations of these shortcuts don't go through cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        started = time.perf_counter()
+        try:
+            super().commit()
+        except sqlite3.Error as e:
+            _record('COMMIT', None, time.perf_counter() - started, 0, e)
+            raise
+        _record('COMMIT', None, time.perf_counter() - started)
+
+def get_connection(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """Open a timed connection to the app database"""
+    return sqlite3.connect(db_path or DB_PATH, factory=TimedConnection)
+
+# ============ INSPECTION ============
+
+def get_statement_stats() -> List[Dict]:
+    """Per-statement counters, slowest total time first"""
+    with _lock:
+        entries = [dict(entry, operations=sorted(entry['operations'])) for entry in _statements.values()]
+    for entry in entries:
+        entry['avg_ms'] = entry['total'] / entry['calls'] * 1000 if entry['calls'] else 0.0
+        entry['max_ms'] = entry['max'] * 1000
+    return sorted(entries, key=lambda entry: entry['total'], reverse=True)
+
+def get_slow_queries() -> List[Dict]:
+    """Slow statements, newest first"""
+    with _lock:
+        return list(reversed(_slow_queries))
+
+def reset_query_stats():
+    with _lock:
+        _statements.clear()
+        _slow_queries.clear()
+
+def explain_query_plan(sql: str, params=None) -> Dict:
+    """
+    EXPLAIN QUERY PLAN for a statement (with sample parameters, or NULLs).
+    Returns {'plan': [detail, ...], 'full_scans': [...], 'temp_btrees': [...], 'error'}.
+    """
+    if sql == 'COMMIT':
+        return {'plan': [], 'full_scans': [], 'temp_btrees': [], 'error': None}
+    if params is None:
+        params = (None,) * sql.count('?')
+    try:
+        # A plain connection: explaining must not show up in the statement stats
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        finally:
+            conn.close()
+    except Exception as e:
+        return {'plan': [], 'full_scans': [], 'temp_btrees': [], 'error': str(e)}
+    plan = [row[-1] for row in rows]
+    return {
+        'plan': plan,
+        # "SCAN t" reads the whole table; "SCAN t USING (COVERING) INDEX" walks an index in order
+        'full_scans': [d for d in plan if d.startswith('SCAN') and 'USING' not in d],
+        'temp_btrees': [d for d in plan if 'TEMP B-TREE' in d],
+        'error': None
+    }
+
+def explain_all_statements() -> List[Dict]:
+    """EXPLAIN QUERY PLAN for every statement executed since the app started"""
+    with _lock:
+        samples = [(entry['statement'], entry['kind'], sorted(entry['operations']),
+                    entry['sample_sql'], entry['sample_params']) for entry in _statements.values()]
+    results = []
+    for statement, kind, operations, sql, params in samples:
+        if kind in ('commit', 'create', 'drop', 'pragma'):
+            continue
+        results.append({'statement': statement, 'kind': kind, 'operations': operations,
+                        **explain_query_plan(sql, params)})
+    return sorted(results, key=lambda r: (not r['full_scans'], not r['temp_btrees'], r['statement']))
@@ -60,11 +60,102 @@ def init_db():
     )
     ''')
     
+    # Last.fm artist cache (top tags and similar artists, JSON encoded)
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS lastfm_artist_cache (
+        artist_key TEXT PRIMARY KEY,
+        artist_name TEXT NOT NULL,
+        tags TEXT,
+        similar TEXT,
+        tags_fetched_at TIMESTAMP,
+        similar_fetched_at TIMESTAMP
+    )
+    ''')
+    
+    # Artist genre classification index (verdicts computed from source tags)
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS artist_genre (
+        artist_key TEXT PRIMARY KEY,
+        artist_name TEXT NOT NULL,
+        source_tags TEXT NOT NULL,
+        is_metal INTEGER NOT NULL,
+        confidence REAL NOT NULL,
+        computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Related-artist graph: one adjacency list (JSON) per wall artist
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS artist_graph (
+        artist_key TEXT PRIMARY KEY,
+        artist_name TEXT NOT NULL,
+        related TEXT NOT NULL,
+        source TEXT,
+        fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Spotify artist resolver (normalized name -> artist ID, NULL = not found)
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS spotify_artists (
+        artist_key TEXT PRIMARY KEY,
+        artist_name TEXT NOT NULL,
+        spotify_id TEXT,
+        genres TEXT,
+        resolved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        genres_fetched_at TIMESTAMP
+    )
+    ''')
+    
+    # Bandcamp link cache (found = 0 records a miss)
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS bandcamp_links (
+        lookup_key TEXT PRIMARY KEY,
+        url TEXT,
+        bandcamp_artist TEXT,
+        bandcamp_album TEXT,
+        found INTEGER NOT NULL,
+        checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Extracted metadata by canonical URL (found = 0 records a failed extraction)
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS url_metadata (
+        canonical_url TEXT PRIMARY KEY,
+        artist TEXT,
+        album_name TEXT,
+        cover_url TEXT,
+        platform TEXT,
+        found INTEGER NOT NULL,
+        fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
+    # Link health of each album's page and cover (status 0 = network error)
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS link_health (
+        album_id INTEGER PRIMARY KEY,
+        url_status INTEGER,
+        url_ok INTEGER,
+        url_etag TEXT,
+        url_last_modified TEXT,
+        cover_status INTEGER,
+        cover_ok INTEGER,
+        cover_etag TEXT,
+        cover_last_modified TEXT,
+        refreshed INTEGER DEFAULT 0,
+        error TEXT,
+        checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
     # Create indexes
     c.execute('''CREATE INDEX IF NOT EXISTS idx_albums_username ON albums(username)''')
     c.execute('''CREATE INDEX IF NOT EXISTS idx_concerts_username ON concerts(username)''')
     c.execute('''CREATE INDEX IF NOT EXISTS idx_concerts_date ON concerts(date)''')
     c.execute('''CREATE INDEX IF NOT EXISTS idx_discoveries_username ON album_discoveries(username)''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_spotify_artists_id ON spotify_artists(spotify_id)''')
     
     conn.commit()
     conn.close()
\ No newline at end of file
@@ -3,19 +3,36 @@
 # DATABASE CRUD OPERATIONS
 # ===========================
 
-import sqlite3
+import functools
+import json
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from .models import Album, Concert, AlbumDiscovery
+from .connection import get_connection, operation_scope
 from config import DB_PATH
+from utils.metrics import histogram
+from utils.tracing import traced
+
+DB_OPERATION_SECONDS = histogram("metalwall_db_operation_seconds", "Duration of database operations", ["operation"])
+
+def _db_operation(func):
+    """Trace and time a database operation; its statements are attributed to it in the query log"""
+    traced_func = traced()(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with DB_OPERATION_SECONDS.time(operation=func.__name__), operation_scope(func.__name__):
+            return traced_func(*args, **kwargs)
+    return wrapper
 
 # ============ ALBUM OPERATIONS ============
 
+@_db_operation
 def save_album(username: str, url: str, artist: str, album_name: str, 
                cover_url: str, platform: str, tags: List[str]) -> bool:
     """Save a new album to database"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         c = conn.cursor()
         c.execute('''
         INSERT INTO albums (username, url, artist, album_name, cover_url, platform, tags, likes)
@@ -28,10 +45,48 @@ def save_album(username: str, url: str, artist: str, album_name: str,
         print(f"Error saving album: {e}")
         return False
 
+@_db_operation
+def save_albums_batch(albums: List[Dict]) -> int:
+    """Insert many albums in one transaction; returns the number inserted"""
+    try:
+        if not albums:
+            return 0
+        conn = get_connection()
+        c = conn.cursor()
+        c.executemany('''
+        INSERT INTO albums (username, url, artist, album_name, cover_url, platform, tags, likes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (a['username'], a['url'], a['artist'], a['album_name'], a['cover_url'],
+             a['platform'], str(a['tags']), str([]))
+            for a in albums
+        ])
+        conn.commit()
+        conn.close()
+        return len(albums)
+    except Exception as e:
+        print(f"Error saving album batch: {e}")
+        return 0
+
+@_db_operation
+def load_album_urls() -> List[str]:
+    """Load the URL of every album on the wall"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('SELECT url FROM albums')
+        urls = [row[0] for row in c.fetchall()]
+        conn.close()
+        return urls
+    except Exception as e:
+        print(f"Error loading album URLs: {e}")
+        return []
+
+@_db_operation
 def load_albums() -> List[Album]:
     """Load all albums from database"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         c = conn.cursor()
         c.execute('SELECT * FROM albums ORDER BY timestamp DESC')
         rows = c.fetchall()
@@ -42,11 +97,12 @@ def load_albums() -> List[Album]:
         print(f"Error loading albums: {e}")
         return []
 
+@_db_operation
 def update_album(album_id: int, url: str, artist: str, album_name: str, 
                  cover_url: str, platform: str, tags: List[str]) -> bool:
     """Update an existing album"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         c = conn.cursor()
         c.execute('''
         UPDATE albums 
@@ -60,10 +116,11 @@ def update_album(album_id: int, url: str, artist: str, album_name: str,
         print(f"Error updating album: {e}")
         return False
 
+@_db_operation
 def update_album_likes(album_id: int, likes_list: List[str]) -> bool:
     """Update album likes"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         c = conn.cursor()
         c.execute('UPDATE albums SET likes = ? WHERE id = ?', (str(likes_list), album_id))
         conn.commit()
@@ -73,12 +130,14 @@ def update_album_likes(album_id: int, likes_list: List[str]) -> bool:
         print(f"Error updating album likes: {e}")
         return False
 
+@_db_operation
 def delete_album(album_id: int) -> bool:
     """Delete an album"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         c = conn.cursor()
         c.execute('DELETE FROM albums WHERE id = ?', (album_id,))
+        c.execute('DELETE FROM link_health WHERE album_id = ?', (album_id,))
         conn.commit()
         conn.close()
         return True
@@ -86,10 +145,11 @@ def delete_album(album_id: int) -> bool:
         print(f"Error deleting album: {e}")
         return False
 
+@_db_operation
 def check_duplicate_url(url: str) -> bool:
     """Check if URL already exists in database"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         c = conn.cursor()
         c.execute('SELECT COUNT(*) FROM albums WHERE url = ?', (url,))
         count = c.fetchone()[0]
@@ -101,11 +161,12 @@ def check_duplicate_url(url: str) -> bool:
 
 # ============ CONCERT OPERATIONS ============
 
+@_db_operation
 def save_concert(username: str, bands: str, date: str, venue: str, 
                  city: str, tags: List[str], info: str) -> bool:
     """Save a new concert"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         c = conn.cursor()
         c.execute('''
         INSERT INTO concerts (username, bands, date, venue, city, tags, info, likes)
@@ -118,10 +179,11 @@ def save_concert(username: str, bands: str, date: str, venue: str,
         print(f"Error saving concert: {e}")
         return False
 
+@_db_operation
 def load_concerts() -> List[Concert]:
     """Load all concerts"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         c = conn.cursor()
         c.execute('SELECT * FROM concerts ORDER BY date ASC')
         rows = c.fetchall()
@@ -132,11 +194,12 @@ def load_concerts() -> List[Concert]:
         print(f"Error loading concerts: {e}")
         return []
 
+@_db_operation
 def update_concert(concert_id: int, bands: str, date: str, venue: str, 
                    city: str, tags: List[str], info: str) -> bool:
     """Update an existing concert"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         c = conn.cursor()
         c.execute('''
         UPDATE concerts 
@@ -150,10 +213,11 @@ def update_concert(concert_id: int, bands: str, date: str, venue: str,
         print(f"Error updating concert: {e}")
         return False
 
+@_db_operation
 def update_concert_likes(concert_id: int, likes_list: List[str]) -> bool:
     """Update concert likes"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         c = conn.cursor()
         c.execute('UPDATE concerts SET likes = ? WHERE id = ?', (str(likes_list), concert_id))
         conn.commit()
@@ -163,10 +227,11 @@ def update_concert_likes(concert_id: int, likes_list: List[str]) -> bool:
         print(f"Error updating concert likes: {e}")
         return False
 
+@_db_operation
 def delete_concert(concert_id: int) -> bool:
     """Delete a concert"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         c = conn.cursor()
         c.execute('DELETE FROM concerts WHERE id = ?', (concert_id,))
         conn.commit()
@@ -176,10 +241,11 @@ def delete_concert(concert_id: int) -> bool:
         print(f"Error deleting concert: {e}")
         return False
 
+@_db_operation
 def delete_past_concerts():
     """Delete past concerts"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         c = conn.cursor()
         today = datetime.now().strftime('%Y-%m-%d')
         c.execute('DELETE FROM concerts WHERE date < ?', (today,))
@@ -190,12 +256,13 @@ def delete_past_concerts():
 
 # ============ DISCOVERY OPERATIONS ============
 
+@_db_operation
 def save_discovery(username: str, base_artist: str, base_album: str,
                    discovered_artist: str, discovered_album: str,
                    discovered_url: str, cover_url: str) -> bool:
     """Save an album discovery"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         c = conn.cursor()
         c.execute('''
         INSERT INTO album_discoveries 
@@ -209,10 +276,11 @@ def save_discovery(username: str, base_artist: str, base_album: str,
         print(f"Error saving discovery: {e}")
         return False
 
+@_db_operation
 def load_discoveries(username: Optional[str] = None) -> List[AlbumDiscovery]:
     """Load album discoveries, optionally filtered by username"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         c = conn.cursor()
         
         if username:
@@ -228,13 +296,568 @@ def load_discoveries(username: Optional[str] = None) -> List[AlbumDiscovery]:
         print(f"Error loading discoveries: {e}")
         return []
 
+# ============ LAST.FM CACHE OPERATIONS ============
+
+@_db_operation
+def load_lastfm_artist(artist_key: str) -> Optional[Dict]:
+    """Load a cached Last.fm artist entry by normalized name"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''
+        SELECT artist_name, tags, similar, tags_fetched_at, similar_fetched_at
+        FROM lastfm_artist_cache WHERE artist_key = ?
+        ''', (artist_key,))
+        row = c.fetchone()
+        conn.close()
+        
+        if not row:
+            return None
+        return {
+            'name': row[0],
+            'tags': json.loads(row[1]) if row[1] is not None else None,
+            'similar': json.loads(row[2]) if row[2] is not None else None,
+            'tags_fetched_at': datetime.fromisoformat(row[3]) if row[3] else None,
+            'similar_fetched_at': datetime.fromisoformat(row[4]) if row[4] else None
+        }
+    except Exception as e:
+        print(f"Error loading Last.fm cache: {e}")
+        return None
+
+@_db_operation
+def save_lastfm_artist(artist_key: str, artist_name: str,
+                       tags: Optional[List[str]] = None,
+                       similar: Optional[List[str]] = None) -> bool:
+    """Insert or update a cached Last.fm artist entry (only the fields given)"""
+    try:
+        now = datetime.now().isoformat()
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''
+        INSERT OR IGNORE INTO lastfm_artist_cache (artist_key, artist_name) VALUES (?, ?)
+        ''', (artist_key, artist_name))
+        c.execute('UPDATE lastfm_artist_cache SET artist_name = ? WHERE artist_key = ?', (artist_name, artist_key))
+        if tags is not None:
+            c.execute('''
+            UPDATE lastfm_artist_cache SET tags = ?, tags_fetched_at = ? WHERE artist_key = ?
+            ''', (json.dumps(tags), now, artist_key))
+        if similar is not None:
+            c.execute('''
+            UPDATE lastfm_artist_cache SET similar = ?, similar_fetched_at = ? WHERE artist_key = ?
+            ''', (json.dumps(similar), now, artist_key))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Error saving Last.fm cache: {e}")
+        return False
+
+# ============ ARTIST GENRE OPERATIONS ============
+
+def _artist_genre_from_row(row) -> Dict:
+    """Build an artist_genre dict from a database row"""
+    return {
+        'artist_key': row[0],
+        'artist_name': row[1],
+        'source_tags': json.loads(row[2]),
+        'is_metal': bool(row[3]),
+        'confidence': row[4],
+        'computed_at': datetime.fromisoformat(row[5])
+    }
+
+@_db_operation
+def load_artist_genres(artist_keys: Optional[List[str]] = None) -> List[Dict]:
+    """Load stored genre verdicts, optionally only for the given normalized names"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        
+        if artist_keys is None:
+            c.execute('SELECT * FROM artist_genre')
+        else:
+            if not artist_keys:
+                conn.close()
+                return []
+            placeholders = ','.join('?' * len(artist_keys))
+            c.execute(f'SELECT * FROM artist_genre WHERE artist_key IN ({placeholders})', list(artist_keys))
+        
+        rows = c.fetchall()
+        conn.close()
+        
+        return [_artist_genre_from_row(row) for row in rows]
+    except Exception as e:
+        print(f"Error loading artist genres: {e}")
+        return []
+
+@_db_operation
+def save_artist_genre(artist_key: str, artist_name: str, source_tags: List[str],
+                      is_metal: bool, confidence: float) -> bool:
+    """Insert or replace the genre verdict for an artist"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''
+        INSERT OR REPLACE INTO artist_genre 
+        (artist_key, artist_name, source_tags, is_metal, confidence, computed_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', (artist_key, artist_name, json.dumps(source_tags), int(is_metal), confidence,
+              datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Error saving artist genre: {e}")
+        return False
+
+@_db_operation
+def update_artist_genre_verdicts(verdicts: List[tuple]) -> bool:
+    """Bulk update (artist_key, is_metal, confidence) verdicts in one transaction"""
+    try:
+        now = datetime.now().isoformat()
+        conn = get_connection()
+        c = conn.cursor()
+        c.executemany('''
+        UPDATE artist_genre SET is_metal = ?, confidence = ?, computed_at = ? WHERE artist_key = ?
+        ''', [(int(is_metal), confidence, now, key) for key, is_metal, confidence in verdicts])
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Error updating artist genres: {e}")
+        return False
+
+# ============ ARTIST GRAPH OPERATIONS ============
+
+@_db_operation
+def load_wall_artists() -> List[str]:
+    """Load the distinct artist names posted on the wall"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('SELECT DISTINCT artist FROM albums')
+        rows = c.fetchall()
+        conn.close()
+        
+        return [row[0] for row in rows]
+    except Exception as e:
+        print(f"Error loading wall artists: {e}")
+        return []
+
+@_db_operation
+def load_artist_graph_node(artist_key: str) -> Optional[Dict]:
+    """Load the related-artist adjacency list for one artist"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''
+        SELECT artist_name, related, source, fetched_at FROM artist_graph WHERE artist_key = ?
+        ''', (artist_key,))
+        row = c.fetchone()
+        conn.close()
+        
+        if not row:
+            return None
+        return {
+            'artist_name': row[0],
+            'related': json.loads(row[1]),
+            'source': row[2],
+            'fetched_at': datetime.fromisoformat(row[3])
+        }
+    except Exception as e:
+        print(f"Error loading artist graph node: {e}")
+        return None
+
+@_db_operation
+def load_artist_graph_freshness() -> Dict[str, Tuple[datetime, bool]]:
+    """Load (fetch time, is empty) for every node in the artist graph"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute("SELECT artist_key, fetched_at, related = '[]' FROM artist_graph")
+        rows = c.fetchall()
+        conn.close()
+        
+        return {row[0]: (datetime.fromisoformat(row[1]), bool(row[2])) for row in rows}
+    except Exception as e:
+        print(f"Error loading artist graph: {e}")
+        return {}
+
+@_db_operation
+def save_artist_graph_node(artist_key: str, artist_name: str, related: List[str],
+                           source: Optional[str]) -> bool:
+    """Insert or replace the related-artist adjacency list for one artist"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''
+        INSERT OR REPLACE INTO artist_graph (artist_key, artist_name, related, source, fetched_at)
+        VALUES (?, ?, ?, ?, ?)
+        ''', (artist_key, artist_name, json.dumps(related), source, datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Error saving artist graph node: {e}")
+        return False
+
+# ============ SPOTIFY ARTIST OPERATIONS ============
+
+@_db_operation
+def load_spotify_artists(artist_keys: List[str]) -> Dict[str, Dict]:
+    """Load resolved Spotify artists by normalized name"""
+    try:
+        if not artist_keys:
+            return {}
+        conn = get_connection()
+        c = conn.cursor()
+        placeholders = ','.join('?' * len(artist_keys))
+        c.execute(f'''
+        SELECT artist_key, artist_name, spotify_id, genres, resolved_at, genres_fetched_at
+        FROM spotify_artists WHERE artist_key IN ({placeholders})
+        ''', list(artist_keys))
+        rows = c.fetchall()
+        conn.close()
+        
+        return {
+            row[0]: {
+                'artist_name': row[1],
+                'spotify_id': row[2],
+                'genres': json.loads(row[3]) if row[3] is not None else None,
+                'resolved_at': datetime.fromisoformat(row[4]),
+                'genres_fetched_at': datetime.fromisoformat(row[5]) if row[5] else None
+            }
+            for row in rows
+        }
+    except Exception as e:
+        print(f"Error loading Spotify artists: {e}")
+        return {}
+
+@_db_operation
+def save_spotify_artists(artists: List[Dict]) -> bool:
+    """Insert or update resolved artists ({'artist_key', 'artist_name', 'spotify_id', 'genres'})"""
+    try:
+        now = datetime.now().isoformat()
+        conn = get_connection()
+        c = conn.cursor()
+        c.executemany('''
+        INSERT INTO spotify_artists (artist_key, artist_name, spotify_id, genres, resolved_at, genres_fetched_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(artist_key) DO UPDATE SET
+            artist_name = excluded.artist_name,
+            spotify_id = excluded.spotify_id,
+            resolved_at = excluded.resolved_at,
+            genres = COALESCE(excluded.genres, spotify_artists.genres),
+            genres_fetched_at = COALESCE(excluded.genres_fetched_at, spotify_artists.genres_fetched_at)
+        ''', [
+            (a['artist_key'], a['artist_name'], a['spotify_id'],
+             json.dumps(a['genres']) if a.get('genres') is not None else None, now,
+             now if a.get('genres') is not None else None)
+            for a in artists
+        ])
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Error saving Spotify artists: {e}")
+        return False
+
+@_db_operation
+def load_spotify_genres(spotify_ids: List[str]) -> Dict[str, Dict]:
+    """Load cached genres by Spotify artist ID"""
+    try:
+        if not spotify_ids:
+            return {}
+        conn = get_connection()
+        c = conn.cursor()
+        placeholders = ','.join('?' * len(spotify_ids))
+        c.execute(f'''
+        SELECT spotify_id, genres, genres_fetched_at FROM spotify_artists
+        WHERE spotify_id IN ({placeholders}) AND genres IS NOT NULL
+        ''', list(spotify_ids))
+        rows = c.fetchall()
+        conn.close()
+        
+        return {
+            row[0]: {'genres': json.loads(row[1]), 'genres_fetched_at': datetime.fromisoformat(row[2])}
+            for row in rows
+        }
+    except Exception as e:
+        print(f"Error loading Spotify genres: {e}")
+        return {}
+
+@_db_operation
+def save_spotify_genres(genres_by_id: Dict[str, List[str]]) -> bool:
+    """Store freshly fetched genres for already resolved Spotify artist IDs"""
+    try:
+        now = datetime.now().isoformat()
+        conn = get_connection()
+        c = conn.cursor()
+        c.executemany('''
+        UPDATE spotify_artists SET genres = ?, genres_fetched_at = ? WHERE spotify_id = ?
+        ''', [(json.dumps(genres), now, spotify_id) for spotify_id, genres in genres_by_id.items()])
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Error saving Spotify genres: {e}")
+        return False
+
+# ============ BANDCAMP LINK OPERATIONS ============
+
+@_db_operation
+def load_bandcamp_link(lookup_key: str) -> Optional[Dict]:
+    """Load a cached Bandcamp lookup ({'found', 'url', 'artist', 'album', 'checked_at'})"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''
+        SELECT url, bandcamp_artist, bandcamp_album, found, checked_at
+        FROM bandcamp_links WHERE lookup_key = ?
+        ''', (lookup_key,))
+        row = c.fetchone()
+        conn.close()
+        
+        if not row:
+            return None
+        return {
+            'url': row[0],
+            'artist': row[1],
+            'album': row[2],
+            'found': bool(row[3]),
+            'checked_at': datetime.fromisoformat(row[4])
+        }
+    except Exception as e:
+        print(f"Error loading Bandcamp link: {e}")
+        return None
+
+@_db_operation
+def save_bandcamp_link(lookup_key: str, result: Optional[Dict]) -> bool:
+    """Store a Bandcamp lookup result; None records that nothing was found"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''
+        INSERT OR REPLACE INTO bandcamp_links
+        (lookup_key, url, bandcamp_artist, bandcamp_album, found, checked_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', (lookup_key,
+              result['url'] if result else None,
+              result['artist'] if result else None,
+              result['album'] if result else None,
+              1 if result else 0,
+              datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Error saving Bandcamp link: {e}")
+        return False
+
+# ============ URL METADATA OPERATIONS ============
+
+@_db_operation
+def load_url_metadata(canonical_url: str) -> Optional[Dict]:
+    """Load cached metadata for a canonical URL"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''
+        SELECT artist, album_name, cover_url, platform, found, fetched_at
+        FROM url_metadata WHERE canonical_url = ?
+        ''', (canonical_url,))
+        row = c.fetchone()
+        conn.close()
+        
+        if not row:
+            return None
+        return {
+            'artist': row[0],
+            'album_name': row[1],
+            'cover_url': row[2],
+            'platform': row[3],
+            'found': bool(row[4]),
+            'fetched_at': datetime.fromisoformat(row[5])
+        }
+    except Exception as e:
+        print(f"Error loading URL metadata: {e}")
+        return None
+
+@_db_operation
+def save_url_metadata(canonical_url: str, metadata: Optional[Dict]) -> bool:
+    """Store metadata for a canonical URL; None records a failed extraction"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''
+        INSERT OR REPLACE INTO url_metadata
+        (canonical_url, artist, album_name, cover_url, platform, found, fetched_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (canonical_url,
+              metadata['artist'] if metadata else None,
+              metadata['album_name'] if metadata else None,
+              metadata.get('cover_url', '') if metadata else None,
+              metadata.get('platform') if metadata else None,
+              1 if metadata else 0,
+              datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Error saving URL metadata: {e}")
+        return False
+
+# ============ LINK HEALTH OPERATIONS ============
+
+@_db_operation
+def load_link_health_candidates(checked_before: datetime, limit: int) -> List[Dict]:
+    """Albums never checked or last checked before `checked_before`, with their stored validators"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''
+        SELECT a.id, a.url, a.cover_url, h.url_etag, h.url_last_modified,
+               h.cover_etag, h.cover_last_modified, h.checked_at,
+               h.url_status, h.url_ok, h.cover_status, h.cover_ok
+        FROM albums a LEFT JOIN link_health h ON h.album_id = a.id
+        WHERE h.album_id IS NULL OR h.checked_at < ?
+        ORDER BY h.checked_at IS NOT NULL, h.checked_at
+        LIMIT ?
+        ''', (checked_before.isoformat(), limit))
+        rows = c.fetchall()
+        conn.close()
+        
+        return [
+            {
+                'album_id': row[0],
+                'url': row[1],
+                'cover_url': row[2],
+                'url_etag': row[3],
+                'url_last_modified': row[4],
+                'cover_etag': row[5],
+                'cover_last_modified': row[6],
+                'checked': row[7] is not None,
+                # Previous verdict, kept when a check is inconclusive
+                'url_status': row[8],
+                'url_ok': None if row[9] is None else bool(row[9]),
+                'cover_status': row[10],
+                'cover_ok': None if row[11] is None else bool(row[11])
+            }
+            for row in rows
+        ]
+    except Exception as e:
+        print(f"Error loading link health candidates: {e}")
+        return []
+
+@_db_operation
+def save_link_health(results: List[Dict]) -> bool:
+    """Insert or replace link health rows"""
+    try:
+        now = datetime.now().isoformat()
+        conn = get_connection()
+        c = conn.cursor()
+        c.executemany('''
+        INSERT OR REPLACE INTO link_health
+        (album_id, url_status, url_ok, url_etag, url_last_modified,
+         cover_status, cover_ok, cover_etag, cover_last_modified, refreshed, error, checked_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (r['album_id'], r['url_status'], None if r.get('url_ok') is None else int(r['url_ok']),
+             r.get('url_etag'), r.get('url_last_modified'),
+             r.get('cover_status'), None if r.get('cover_ok') is None else int(r['cover_ok']),
+             r.get('cover_etag'), r.get('cover_last_modified'), int(r.get('refreshed', False)),
+             r.get('error'), now)
+            for r in results
+        ])
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Error saving link health: {e}")
+        return False
+
+@_db_operation
+def update_album_cover(album_id: int, cover_url: str) -> bool:
+    """Replace an album's cover URL (e.g. after re-extracting its metadata)"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('UPDATE albums SET cover_url = ? WHERE id = ?', (cover_url, album_id))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Error updating album cover: {e}")
+        return False
+
+@_db_operation
+def load_broken_links() -> List[Dict]:
+    """Albums whose page or cover failed the last link health check"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''
+        SELECT a.id, a.artist, a.album_name, a.username, a.url, a.cover_url,
+               h.url_status, h.url_ok, h.cover_status, h.cover_ok, h.error, h.checked_at
+        FROM link_health h JOIN albums a ON a.id = h.album_id
+        WHERE h.url_ok = 0 OR h.cover_ok = 0
+        ORDER BY h.checked_at DESC
+        ''')
+        rows = c.fetchall()
+        conn.close()
+        
+        return [
+            {
+                'album_id': row[0],
+                'artist': row[1],
+                'album_name': row[2],
+                'username': row[3],
+                'url': row[4],
+                'cover_url': row[5],
+                'url_status': row[6],
+                'url_ok': bool(row[7]),
+                'cover_status': row[8],
+                'cover_ok': None if row[9] is None else bool(row[9]),
+                'error': row[10],
+                'checked_at': datetime.fromisoformat(row[11])
+            }
+            for row in rows
+        ]
+    except Exception as e:
+        print(f"Error loading broken links: {e}")
+        return []
+
+@_db_operation
+def get_link_health_summary() -> Dict:
+    """Counts of checked albums and broken pages/covers"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''
+        SELECT COUNT(*), COALESCE(SUM(url_ok = 0), 0), COALESCE(SUM(cover_ok = 0), 0),
+               COALESCE(SUM(refreshed), 0), MAX(checked_at)
+        FROM link_health
+        ''')
+        row = c.fetchone()
+        conn.close()
+        return {
+            'checked': row[0],
+            'broken_urls': row[1],
+            'broken_covers': row[2],
+            'refreshed': row[3],
+            'last_checked': datetime.fromisoformat(row[4]) if row[4] else None
+        }
+    except Exception as e:
+        print(f"Error loading link health summary: {e}")
+        return {'checked': 0, 'broken_urls': 0, 'broken_covers': 0, 'refreshed': 0, 'last_checked': None}
+
 # ============ DATABASE STATISTICS ============
 
 # In database/operations.py, update the get_database_stats function:
+@_db_operation
 def get_database_stats():
     """Get database statistics"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection()
         c = conn.cursor()
         
         # Count albums
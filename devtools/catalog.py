@@ -0,0 +1,167 @@
+# File: metalwall_app/devtools/catalog.py
+# ===========================
+# SYNTHETIC MUSIC CATALOG (OFFLINE STAND-INS)
+# ===========================
+"""
+Deterministic fake catalog served by the stand-in providers: artists with
+Spotify-style IDs and genres, Last.fm-style tags and similar artists, albums,
+and which albums are "on Bandcamp". The same seed always gives the same catalog.
+"""
+
+import hashlib
+import random
+import string
+from typing import Dict, List, Optional
+
+_PREFIXES = ['Iron', 'Black', 'Grave', 'Night', 'Cursed', 'Frozen', 'Burning', 'Hollow', 'Rotting',
+             'Eternal', 'Silent', 'Blood', 'Ashen', 'Crimson', 'Withered', 'Savage', 'Obsidian', 'Feral']
+_NOUNS = ['Throne', 'Serpent', 'Tomb', 'Wolves', 'Cathedral', 'Horde', 'Abyss', 'Oath', 'Ritual',
+          'Monolith', 'Crypt', 'Altar', 'Dominion', 'Pyre', 'Requiem', 'Legion', 'Chasm', 'Mire']
+_ALBUM_WORDS = ['Descent', 'Into', 'The', 'Void', 'Of', 'Flesh', 'Ruin', 'Winter', 'Sorrow', 'Fire',
+                'Eclipse', 'Ages', 'Bones', 'Kingdom', 'Storm', 'Dust', 'Chains', 'Light', 'Hunger']
+
+# (Spotify genres, Last.fm tags) per scene; the last ones are not metal
+_SCENES = [
+    (['death metal', 'brutal death metal'], ['death metal', 'brutal death metal', 'metal', 'technical death metal']),
+    (['black metal', 'atmospheric black metal'], ['black metal', 'atmospheric black metal', 'metal', 'raw black metal']),
+    (['doom metal', 'funeral doom'], ['doom metal', 'funeral doom', 'metal', 'sludge']),
+    (['thrash metal', 'speed metal'], ['thrash metal', 'speed metal', 'metal', 'heavy metal']),
+    (['grindcore', 'goregrind'], ['grindcore', 'goregrind', 'deathgrind', 'metal']),
+    (['stoner metal', 'sludge metal'], ['stoner', 'sludge', 'stoner metal', 'doom']),
+    (['dance pop', 'pop'], ['pop', 'dance', 'female vocalists', 'electronic']),
+    (['indie rock', 'indie folk'], ['indie', 'indie rock', 'folk', 'alternative']),
+    (['hip hop', 'rap'], ['hip-hop', 'rap', 'hip hop', 'underground hip-hop']),
+]
+_METAL_SCENES = 6
+
+_BASE62 = string.digits + string.ascii_letters
+
+def spotify_id(seed: str) -> str:
+    """22-character base62 ID derived from a seed"""
+    number = int(hashlib.sha1(seed.encode('utf-8')).hexdigest(), 16)
+    chars = []
+    for _ in range(22):
+        number, digit = divmod(number, 62)
+        chars.append(_BASE62[digit])
+    return ''.join(chars)
+
+def slugify(text: str) -> str:
+    return '-'.join(''.join(c if c.isalnum() else ' ' for c in text.lower()).split())
+
+class Catalog:
+    """Artists, albums and relations generated from a seed"""
+
+    def __init__(self, artists: int = 500, seed: int = 666, non_metal_share: float = 0.2):
+        rng = random.Random(seed)
+        self.artists: List[Dict] = []
+        self.by_id: Dict[str, Dict] = {}
+        self.by_key: Dict[str, Dict] = {}
+        self.albums: Dict[str, Dict] = {}
+
+        names = set()
+        while len(self.artists) < artists:
+            name = f"{rng.choice(_PREFIXES)} {rng.choice(_NOUNS)}"
+            if name in names:
+                name = f"{name} {rng.choice(['II', 'III', 'Cult', 'Order', 'Collective'])}"
+            if name in names:
+                name = f"{name} {len(names)}"
+            names.add(name)
+            metal = rng.random() >= non_metal_share
+            scene = rng.randrange(_METAL_SCENES) if metal else rng.randrange(_METAL_SCENES, len(_SCENES))
+            genres, tags = _SCENES[scene]
+            artist = {
+                'id': spotify_id(f"artist:{name}"),
+                'name': name,
+                'scene': scene,
+                'genres': list(genres),
+                'tags': tags[:] + rng.sample(['seen live', 'underground', 'female vocalists', 'finnish', 'swedish'], 2),
+                'popularity': rng.randint(5, 80),
+                'albums': []
+            }
+            for n in range(rng.randint(2, 12)):
+                title = ' '.join(rng.sample(_ALBUM_WORDS, rng.randint(1, 3)))
+                album_id = spotify_id(f"album:{name}:{n}:{title}")
+                album = {
+                    'id': album_id,
+                    'name': title,
+                    'artist_id': artist['id'],
+                    'album_type': rng.choice(['album', 'album', 'album', 'single', 'compilation']),
+                    'release_date': f"{rng.randint(1985, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                    'total_tracks': rng.randint(1, 14),
+                    'on_bandcamp': rng.random() < 0.6
+                }
+                artist['albums'].append(album_id)
+                self.albums[album_id] = album
+            self.artists.append(artist)
+            self.by_id[artist['id']] = artist
+            self.by_key[' '.join(name.casefold().split())] = artist
+
+        # Similar artists: mostly the same scene, a few from anywhere
+        by_scene: Dict[int, List[Dict]] = {}
+        for artist in self.artists:
+            by_scene.setdefault(artist['scene'], []).append(artist)
+        for artist in self.artists:
+            peers = [a for a in by_scene[artist['scene']] if a is not artist]
+            similar = rng.sample(peers, min(len(peers), 12)) + rng.sample(self.artists, 3)
+            artist['similar'] = list(dict.fromkeys(a['id'] for a in similar if a is not artist))[:15]
+
+    def find_artist(self, name: str) -> Optional[Dict]:
+        return self.by_key.get(' '.join(name.casefold().split()))
+
+    def search_artists(self, query: str, limit: int = 5) -> List[Dict]:
+        """Exact match first, then names containing the query"""
+        key = ' '.join(query.casefold().split())
+        exact = self.by_key.get(key)
+        partial = [a for k, a in self.by_key.items() if key and key in k and a is not exact]
+        return ([exact] if exact else []) + partial[:max(0, limit - (1 if exact else 0))]
+
+    def find_album(self, artist_name: str, album_name: str) -> Optional[Dict]:
+        artist = self.find_artist(artist_name)
+        if not artist:
+            return None
+        wanted = album_name.casefold().strip()
+        return next((self.albums[a] for a in artist['albums'] if self.albums[a]['name'].casefold() == wanted), None)
+
+    # ---- provider-shaped objects ----
+
+    def image_url(self, album_id: str, size: int = 640) -> str:
+        return f"https://i.scdn.co/image/{album_id}_{size}"
+
+    def spotify_artist(self, artist: Dict) -> Dict:
+        return {
+            'id': artist['id'],
+            'name': artist['name'],
+            'type': 'artist',
+            'uri': f"spotify:artist:{artist['id']}",
+            'genres': artist['genres'],
+            'popularity': artist['popularity'],
+            'followers': {'href': None, 'total': artist['popularity'] * 137},
+            'images': [],
+            'external_urls': {'spotify': f"https://open.spotify.com/artist/{artist['id']}"}
+        }
+
+    def spotify_album(self, album: Dict, full: bool = False) -> Dict:
+        artist = self.by_id[album['artist_id']]
+        data = {
+            'id': album['id'],
+            'name': album['name'],
+            'type': 'album',
+            'album_type': album['album_type'],
+            'uri': f"spotify:album:{album['id']}",
+            'release_date': album['release_date'],
+            'release_date_precision': 'day',
+            'total_tracks': album['total_tracks'],
+            'artists': [{'id': artist['id'], 'name': artist['name'], 'type': 'artist'}],
+            'images': [{'url': self.image_url(album['id'], size), 'height': size, 'width': size}
+                       for size in (640, 300, 64)],
+            'external_urls': {'spotify': f"https://open.spotify.com/album/{album['id']}"}
+        }
+        if full:
+            data['genres'] = []
+            data['label'] = 'Offline Records'
+            data['tracks'] = {'items': [], 'total': album['total_tracks']}
+        return data
+
+    def bandcamp_url(self, album: Dict) -> str:
+        artist = self.by_id[album['artist_id']]
+        return f"https://{slugify(artist['name']).replace('-', '')}.bandcamp.com/album/{slugify(album['name'])}"
@@ -0,0 +1,509 @@
+# File: metalwall_app/devtools/standin_server.py
+# ===========================
+# OFFLINE PROVIDER STAND-IN SERVER
+# ===========================
+"""
+One local HTTP server that answers the provider endpoints MetalWall uses:
+
+    POST /api/token                      Spotify client-credentials token
+    GET  /v1/search, /v1/artists/...,    Spotify Web API (what spotipy calls)
+         /v1/albums/{id}
+    GET  /2.0/?method=artist.getTopTags  Last.fm REST (artist.getTopTags / artist.getSimilar)
+    GET  /search?q=...&item_type=a       Bandcamp search results page
+    GET  /web/<host>/<path>              Platform pages (og/JSON-LD), oEmbed and cover images
+
+Point the app at it with METALWALL_PROVIDER_BASE=http://127.0.0.1:8765 (see config.py).
+
+Modes:
+    synthetic (default)   answers from a deterministic generated catalog
+    --record FILE         proxies to the real providers once and stores the responses
+    --replay FILE         serves stored responses (--fallback synthetic for misses)
+
+Latency and failures can be injected globally or per provider:
+    python devtools/standin_server.py --latency-ms 80 --jitter-ms 40 --error-rate 0.02 \\
+        --provider lastfm:latency_ms=250 --provider spotify:throttle_rate=0.05
+
+GET /__stats returns request counts per provider; POST /__reset clears them.
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from devtools.catalog import Catalog
+
+SPOTIFY, LASTFM, BANDCAMP, WEB = 'spotify', 'lastfm', 'bandcamp', 'web'
+
+# Where each local path prefix lives in the real world (record mode)
+_UPSTREAMS = [
+    ('/api/token', 'https://accounts.spotify.com'),
+    ('/v1/', 'https://api.spotify.com'),
+    ('/2.0', 'https://ws.audioscrobbler.com'),
+    ('/search', 'https://bandcamp.com'),
+]
+
+# Query parameters that never take part in a fixture key
+_UNKEYED_PARAMS = {'api_key'}
+
+@dataclass
+class Faults:
+    """Injected behaviour for one provider"""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+
+def provider_for(path: str) -> Optional[str]:
+    if path.startswith(('/v1/', '/api/token')):
+        return SPOTIFY
+    if path.startswith('/2.0'):
+        return LASTFM
+    if path.startswith('/search'):
+        return BANDCAMP
+    if path.startswith('/web/'):
+        return WEB
+    return None
+
+def make_png(size: int, seed: str) -> bytes:
+    """Solid-colour PNG (a stand-in cover) without needing Pillow"""
+    color = bytes(zlib.crc32(seed.encode()).to_bytes(4, 'big')[:3])
+    raw = b''.join(b'\x00' + color * size for _ in range(size))
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b''))
+
+def fixture_key(method: str, path: str, query: str) -> str:
+    params = sorted((k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k not in _UNKEYED_PARAMS)
+    return f"{method} {path}?{urlencode(params)}" if params else f"{method} {path}"
+
+class FixtureStore:
+    """Recorded responses keyed by method, path and query (thread-safe, saved on every write)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            return self.entries.get(key)
+
+    def put(self, key: str, status: int, content_type: str, body: bytes):
+        with self._lock:
+            self.entries[key] = {'status': status, 'content_type': content_type,
+                                 'body': base64.b64encode(body).decode('ascii')}
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=1, sort_keys=True)
+
+class StandinServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer holding the catalog, faults, fixtures and request counters"""
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], catalog: Catalog, faults: Dict[str, Faults] = None,
+                 mode: str = 'synthetic', fixtures: Optional[FixtureStore] = None,
+                 fallback: bool = False, page_padding_kb: int = 300, seed: int = 0):
+        super().__init__(address, StandinHandler)
+        self.catalog = catalog
+        self.faults = faults or {}
+        self.mode = mode
+        self.fixtures = fixtures
+        self.fallback = fallback
+        self.page_padding = ('<!-- ' + 'x' * 1019 + ' -->\n') * page_padding_kb
+        self.random = random.Random(seed)
+        self.stats_lock = threading.Lock()
+        self.reset_stats()
+        self.bandcamp_index = {
+            f"{catalog.by_id[a['artist_id']]['name']} {a['name']}".casefold(): a
+            for a in catalog.albums.values() if a['on_bandcamp']
+        }
+        self.bandcamp_pages = {catalog.bandcamp_url(a): a for a in self.bandcamp_index.values()}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.stats = {'requests': {}, 'endpoints': {}, 'injected_errors': 0,
+                          'injected_throttles': 0, 'replay_misses': 0}
+
+    def count(self, provider: str, endpoint: str):
+        with self.stats_lock:
+            self.stats['requests'][provider] = self.stats['requests'].get(provider, 0) + 1
+            self.stats['endpoints'][endpoint] = self.stats['endpoints'].get(endpoint, 0) + 1
+
+    def start(self) -> threading.Thread:
+        """Serve from a daemon thread (for benchmarks that embed the server)"""
+        thread = threading.Thread(target=self.serve_forever, name="standin-server", daemon=True)
+        thread.start()
+        return thread
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: StandinServer
+
+    def log_message(self, format, *args):
+        pass
+
+    # ---- plumbing ----
+
+    def _send(self, status: int, body: bytes = b'', content_type: str = 'application/json',
+              headers: Optional[Dict] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _json(self, data, status: int = 200):
+        self._send(status, json.dumps(data).encode('utf-8'))
+
+    def _html(self, html: str, status: int = 200, headers: Optional[Dict] = None):
+        self._send(status, html.encode('utf-8'), 'text/html; charset=utf-8', headers)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _rewrite(self, body: bytes) -> bytes:
+        """Keep clients on the stand-in when upstream bodies contain absolute API URLs"""
+        return body.replace(b'https://api.spotify.com/', f"http://{self.headers.get('Host')}/".encode())
+
+    def _inject(self, provider: str) -> bool:
+        """Apply latency and maybe an injected failure; True when a response was already sent"""
+        faults = self.server.faults.get(provider) or self.server.faults.get('default') or Faults()
+        delay = faults.latency_ms + (self.server.random.uniform(0, faults.jitter_ms) if faults.jitter_ms else 0)
+        if delay:
+            time.sleep(delay / 1000)
+        roll = self.server.random.random()
+        if roll < faults.throttle_rate:
+            with self.server.stats_lock:
+                self.server.stats['injected_throttles'] += 1
+            self._json({'error': 29, 'message': 'Rate limit exceeded'} if provider == LASTFM
+                       else {'error': {'status': 429, 'message': 'API rate limit exceeded'}},
+                       429)
+            return True
+        if roll < faults.throttle_rate + faults.error_rate:
+            with self.server.stats_lock:
+                self.server.stats['injected_errors'] += 1
+            self._json({'error': {'status': 503, 'message': 'Injected failure'}}, 503)
+            return True
+        return False
+
+    def _handle(self):
+        parts = urlsplit(self.path)
+        path, query = parts.path, parts.query
+        body = self._read_body() if self.command == 'POST' else b''
+
+        if path == '/__stats':
+            with self.server.stats_lock:
+                return self._json(self.server.stats)
+        if path == '/__reset':
+            self.server.reset_stats()
+            return self._json({'ok': True})
+
+        provider = provider_for(path)
+        if provider is None:
+            return self._json({'error': 'unknown endpoint'}, 404)
+        self.server.count(provider, f"{self.command} {self._endpoint_label(path)}")
+        if self._inject(provider):
+            return
+
+        if self.server.mode == 'record' and path != '/api/token':
+            return self._record(path, query, body)
+        if self.server.mode == 'replay' and path != '/api/token':
+            entry = self.server.fixtures.get(fixture_key(self.command, path, query))
+            if entry:
+                return self._send(entry['status'], self._rewrite(base64.b64decode(entry['body'])),
+                                  entry['content_type'])
+            with self.server.stats_lock:
+                self.server.stats['replay_misses'] += 1
+            if not self.server.fallback:
+                return self._json({'error': {'status': 404, 'message': 'Not recorded'}}, 404)
+        if self.server.mode == 'record' and path == '/api/token':
+            return self._proxy_token(body)
+
+        return self._synthetic(provider, path, dict(parse_qsl(query, keep_blank_values=True)))
+
+    def _endpoint_label(self, path: str) -> str:
+        """Group request paths (IDs removed) for the per-endpoint counters"""
+        if path.startswith('/web/'):
+            host = path[5:].split('/', 1)[0]
+            return f"/web/{host}" + ('/oembed' if path.endswith('/oembed') else '')
+        segments = ['{id}' if len(s) == 22 else s for s in path.split('/')]
+        return '/'.join(segments)
+
+    def do_GET(self):
+        self._handle()
+
+    def do_HEAD(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    # ---- record mode ----
+
+    def _upstream_url(self, path: str, query: str) -> str:
+        if path.startswith('/web/'):
+            url = f"https://{path[5:]}"
+        else:
+            url = next(base + path for prefix, base in _UPSTREAMS if path.startswith(prefix))
+        return f"{url}?{query}" if query else url
+
+    def _record(self, path: str, query: str, body: bytes):
+        import requests
+        headers = {k: v for k, v in self.headers.items() if k.lower() in ('authorization', 'content-type', 'user-agent')}
+        response = requests.request(self.command, self._upstream_url(path, query), headers=headers,
+                                    data=body or None, timeout=20)
+        content_type = response.headers.get('Content-Type', 'application/octet-stream')
+        if self.command != 'HEAD' and response.status_code < 500:
+            self.server.fixtures.put(fixture_key(self.command, path, query), response.status_code,
+                                     content_type, response.content)
+        self._send(response.status_code, self._rewrite(response.content), content_type)
+
+    def _proxy_token(self, body: bytes):
+        """Tokens are passed through but never written to the fixture file"""
+        import requests
+        response = requests.post('https://accounts.spotify.com/api/token', data=body, timeout=20,
+                                 headers={k: v for k, v in self.headers.items()
+                                          if k.lower() in ('authorization', 'content-type')})
+        self._send(response.status_code, response.content, response.headers.get('Content-Type', 'application/json'))
+
+    # ---- synthetic providers ----
+
+    def _synthetic(self, provider: str, path: str, params: Dict[str, str]):
+        if provider == SPOTIFY:
+            return self._spotify(path, params)
+        if provider == LASTFM:
+            return self._lastfm(params)
+        if provider == BANDCAMP:
+            return self._bandcamp(params)
+        return self._web(path, params)
+
+    def _spotify(self, path: str, params: Dict[str, str]):
+        catalog = self.server.catalog
+        if path == '/api/token':
+            return self._json({'access_token': 'offline-token', 'token_type': 'Bearer', 'expires_in': 3600})
+
+        segments = [s for s in path.split('/') if s][1:]  # drop "v1"
+        if segments == ['search']:
+            query = params.get('q', '')
+            name = query.split(':', 1)[1] if query.lower().startswith('artist:') else query
+            limit, offset = int(params.get('limit', 10)), int(params.get('offset', 0))
+            found = catalog.search_artists(name.strip().strip('"'), limit + offset)[offset:] \
+                if 'artist' in params.get('type', 'artist') else []
+            return self._json({'artists': {
+                'href': None, 'items': [catalog.spotify_artist(a) for a in found],
+                'limit': limit, 'offset': offset, 'next': None, 'previous': None, 'total': len(found)
+            }})
+
+        if segments == ['artists']:
+            ids = [i for i in params.get('ids', '').split(',') if i]
+            return self._json({'artists': [catalog.spotify_artist(catalog.by_id[i]) if i in catalog.by_id else None
+                                           for i in ids]})
+
+        if len(segments) >= 2 and segments[0] == 'artists':
+            artist = catalog.by_id.get(segments[1])
+            if not artist:
+                return self._json({'error': {'status': 404, 'message': 'Resource not found'}}, 404)
+            if len(segments) == 2:
+                return self._json(catalog.spotify_artist(artist))
+            if segments[2] == 'related-artists':
+                return self._json({'artists': [catalog.spotify_artist(catalog.by_id[i]) for i in artist['similar']]})
+            if segments[2] == 'albums':
+                groups = (params.get('include_groups') or params.get('album_type') or 'album,single,compilation').split(',')
+                albums = [catalog.albums[a] for a in artist['albums'] if catalog.albums[a]['album_type'] in groups]
+                limit, offset = int(params.get('limit', 20)), int(params.get('offset', 0))
+                page = albums[offset:offset + limit]
+                next_url = None
+                if offset + limit < len(albums):
+                    next_params = {**params, 'offset': offset + limit, 'limit': limit}
+                    next_url = f"http://{self.headers.get('Host')}{path}?{urlencode(next_params)}"
+                return self._json({'href': None, 'items': [catalog.spotify_album(a) for a in page],
+                                   'limit': limit, 'offset': offset, 'next': next_url,
+                                   'previous': None, 'total': len(albums)})
+
+        if len(segments) == 2 and segments[0] == 'albums':
+            album = catalog.albums.get(segments[1])
+            if not album:
+                return self._json({'error': {'status': 404, 'message': 'Resource not found'}}, 404)
+            return self._json(catalog.spotify_album(album, full=True))
+
+        return self._json({'error': {'status': 404, 'message': 'Service not found'}}, 404)
+
+    def _lastfm(self, params: Dict[str, str]):
+        catalog = self.server.catalog
+        method = params.get('method', '').lower()
+        artist = catalog.find_artist(params.get('artist', ''))
+        if not artist:
+            return self._json({'error': 6, 'message': 'The artist you supplied could not be found'})
+        if method == 'artist.gettoptags':
+            tags = [{'name': t, 'count': 100 - 10 * i} for i, t in enumerate(artist['tags'])]
+            return self._json({'toptags': {'tag': tags, '@attr': {'artist': artist['name']}}})
+        if method == 'artist.getsimilar':
+            limit = int(params.get('limit', 100))
+            similar = [{'name': catalog.by_id[i]['name'], 'match': f"{1 - n / 20:.6f}"}
+                       for n, i in enumerate(artist['similar'][:limit])]
+            return self._json({'similarartists': {'artist': similar, '@attr': {'artist': artist['name']}}})
+        return self._json({'error': 3, 'message': 'Invalid Method - No method with that name in this package'})
+
+    def _bandcamp(self, params: Dict[str, str]):
+        album = self.server.bandcamp_index.get(' '.join(params.get('q', '').casefold().split()))
+        if not album:
+            return self._html("<html><body><ul class='result-items'></ul></body></html>")
+        catalog = self.server.catalog
+        artist = catalog.by_id[album['artist_id']]
+        url = catalog.bandcamp_url(album)
+        return self._html(f"""<html><body><ul class="result-items">
+<li class="searchresult data-search">
+  <a class="artcont" href="{url}?from=search"><div class="art"></div></a>
+  <div class="result-info">
+    <div class="itemtype">ALBUM</div>
+    <div class="heading"><a href="{url}?from=search">{album['name']}</a></div>
+    <div class="subhead">by {artist['name']}</div>
+  </div>
+</li></ul></body></html>""")
+
+    def _album_page(self, album: Dict, title: str, description: str):
+        catalog = self.server.catalog
+        artist = catalog.by_id[album['artist_id']]
+        jsonld = json.dumps({'@context': 'https://schema.org', '@type': 'MusicAlbum', 'name': album['name'],
+                             'byArtist': {'@type': 'MusicGroup', 'name': artist['name']},
+                             'image': catalog.image_url(album['id'])})
+        headers = {'ETag': f'"{album["id"]}"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+        if self.headers.get('If-None-Match') == headers['ETag']:
+            return self._send(304, headers=headers)
+        self._html(f"""<!DOCTYPE html><html><head>
+<meta charset="utf-8"><title>{title}</title>
+<meta property="og:title" content="{title}">
+<meta property="og:description" content="{description}">
+<meta property="og:image" content="{catalog.image_url(album['id'])}">
+<script type="application/ld+json">{jsonld}</script>
+</head><body>
+{self.server.page_padding}
+</body></html>""", headers=headers)
+
+    def _web(self, path: str, params: Dict[str, str]):
+        catalog = self.server.catalog
+        host, _, rest = path[5:].partition('/')
+        rest = '/' + rest
+
+        if rest.startswith('/image/'):
+            image_id = rest[7:]
+            size = int(image_id.rsplit('_', 1)[1]) if '_' in image_id else 640
+            return self._send(200, make_png(min(size, 640), image_id), 'image/png',
+                              {'ETag': f'"{image_id}"', 'Cache-Control': 'max-age=31536000'})
+
+        if rest == '/oembed':
+            target = self._find_page(params.get('url', ''))
+            if not target:
+                return self._json({'error': 'not found'}, 404)
+            album, artist = target
+            return self._json({'type': 'rich', 'version': '1.0', 'title': album['name'],
+                               'author_name': artist['name'], 'thumbnail_url': catalog.image_url(album['id'])})
+
+        target = self._find_page(f"https://{host}{rest}")
+        if not target:
+            return self._html("<html><head><title>Not found</title></head><body></body></html>", 404)
+        album, artist = target
+        if host == 'open.spotify.com':
+            year = album['release_date'][:4]
+            return self._album_page(album, album['name'],
+                                    f"{artist['name']} · Album · {year} · {album['total_tracks']} songs.")
+        return self._album_page(album, f"{album['name']}, by {artist['name']}",
+                                f"{album['name']} by {artist['name']}, released {album['release_date']}")
+
+    def _find_page(self, url: str):
+        """(album, artist) for a Spotify or Bandcamp album URL of the catalog"""
+        catalog = self.server.catalog
+        url = url.split('?')[0].rstrip('/')
+        album = None
+        if '/album/' in url and 'open.spotify.com' in url:
+            album = catalog.albums.get(url.rsplit('/', 1)[1])
+        elif 'bandcamp.com' in url:
+            album = self.server.bandcamp_pages.get(url)
+        if not album:
+            return None
+        return album, catalog.by_id[album['artist_id']]
+
+def _parse_provider_fault(spec: str) -> Tuple[str, str, float]:
+    provider, _, setting = spec.partition(':')
+    key, _, value = setting.partition('=')
+    if not provider or key not in Faults.__dataclass_fields__:
+        raise argparse.ArgumentTypeError(f"expected PROVIDER:{'|'.join(Faults.__dataclass_fields__)}=VALUE, got {spec}")
+    return provider, key, float(value)
+
+def build_server(args) -> StandinServer:
+    default = Faults(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate)
+    faults = {'default': default}
+    for provider, key, value in args.provider or []:
+        faults[provider] = replace(faults.get(provider, default), **{key: value})
+
+    mode, fixtures = 'synthetic', None
+    if args.record or args.replay:
+        mode = 'record' if args.record else 'replay'
+        fixtures = FixtureStore(args.record or args.replay)
+    return StandinServer((args.host, args.port), Catalog(args.artists, args.seed), faults, mode, fixtures,
+                         fallback=args.fallback == 'synthetic', page_padding_kb=args.page_padding_kb,
+                         seed=args.seed)
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--artists', type=int, default=500, help='size of the synthetic catalog')
+    parser.add_argument('--seed', type=int, default=666)
+    parser.add_argument('--page-padding-kb', type=int, default=300, help='body size of platform pages')
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered with 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of requests answered with 429')
+    parser.add_argument('--provider', action='append', type=_parse_provider_fault, metavar='NAME:FIELD=VALUE',
+                        help='per-provider override, e.g. lastfm:latency_ms=250')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--record', metavar='FILE', help='proxy to the real providers and store responses')
+    group.add_argument('--replay', metavar='FILE', help='serve stored responses')
+    parser.add_argument('--fallback', choices=['none', 'synthetic'], default='none',
+                        help='what to serve for requests missing from the replay file')
+    return parser
+
+def main():
+    args = make_parser().parse_args()
+    server = build_server(args)
+    print(f"Stand-in providers ({server.mode}) on {server.base_url}")
+    print(f"  export METALWALL_PROVIDER_BASE={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+# File: metalwall_app/services/artist_graph.py
+# ===========================
+# RELATED-ARTIST GRAPH
+# ===========================
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from config import ARTIST_GRAPH_TTL, ARTIST_GRAPH_EMPTY_TTL, SPOTIFY, LASTFM
+from database.operations import (
+    load_wall_artists, load_artist_graph_node, load_artist_graph_freshness, save_artist_graph_node
+)
+from services.spotify_service import fetch_related_artists_spotify, clean_artist_name
+from services.lastfm_service import fetch_related_artists_lastfm
+from utils.background import run_in_background
+from utils.helpers import normalize_artist_key
+from utils.tracing import traced
+
+GRAPH_BUILD_JOB = "artist_graph_build"
+
+def _is_stale(fetched_at: datetime, max_age: float = ARTIST_GRAPH_TTL, empty: bool = False) -> bool:
+    """Check whether a graph node is older than `max_age` seconds (empty nodes expire sooner)"""
+    if empty:
+        max_age = min(max_age, ARTIST_GRAPH_EMPTY_TTL)
+    return datetime.now() - fetched_at >= timedelta(seconds=max_age)
+
+@traced()
+def fetch_related_artists(spotify_client, lastfm_client,
+                          artist_name: str) -> Tuple[Optional[List[str]], Optional[str]]:
+    """
+    Live lookup (Spotify first, Last.fm as fallback); returns (names, source).
+    Names are None when no provider answered, so errors aren't mistaken for "no related artists".
+    """
+    failed = True
+    if spotify_client:
+        related = fetch_related_artists_spotify(spotify_client, artist_name)
+        if related:
+            return related, SPOTIFY
+        failed = related is None
+
+    if lastfm_client:
+        related = fetch_related_artists_lastfm(lastfm_client, artist_name)
+        if related:
+            return related, LASTFM
+        failed = failed and related is None
+
+    return (None if failed else []), None
+
+def refresh_artist_node(spotify_client, lastfm_client, artist_name: str) -> List[str]:
+    """Fetch an artist's related artists live and store them in the graph"""
+    artist_name = clean_artist_name(artist_name)
+    related, source = fetch_related_artists(spotify_client, lastfm_client, artist_name)
+    if related is None:
+        # Lookup failed: store nothing so the next request or graph build retries
+        return []
+    # Keep an existing adjacency list rather than overwrite it with an empty lookup
+    if related or not load_artist_graph_node(normalize_artist_key(artist_name)):
+        save_artist_graph_node(normalize_artist_key(artist_name), artist_name, related, source)
+    return related
+
+def schedule_artist_refresh(spotify_client, lastfm_client, artist_name: str) -> bool:
+    """Refresh one node in the background (no-op if already in progress)"""
+    key = normalize_artist_key(clean_artist_name(artist_name))
+    if not key:
+        return False
+    return run_in_background(f"artist_graph:{key}", refresh_artist_node,
+                             spotify_client, lastfm_client, artist_name)
+
+@traced()
+def get_related_artists(spotify_client, lastfm_client, artist_name: str) -> List[str]:
+    """
+    Related artists for a base artist, read from the stored graph.
+    Stale nodes are served immediately and refreshed in the background;
+    unknown artists fall back to a live lookup that is then stored.
+    """
+    artist_name = clean_artist_name(artist_name)
+    node = load_artist_graph_node(normalize_artist_key(artist_name))
+    if node is not None:
+        stale = _is_stale(node['fetched_at'], empty=not node['related'])
+        if node['related']:
+            if stale:
+                schedule_artist_refresh(spotify_client, lastfm_client, artist_name)
+            return node['related']
+        if not stale:
+            return []
+
+    return refresh_artist_node(spotify_client, lastfm_client, artist_name)
+
+def build_artist_graph(spotify_client, lastfm_client, max_age: float = ARTIST_GRAPH_TTL,
+                       limit: Optional[int] = None) -> Dict:
+    """Add or refresh the graph node of every wall artist that is missing or stale"""
+    freshness = load_artist_graph_freshness()
+    artists = {}
+    for artist in load_wall_artists():
+        name = clean_artist_name(artist)
+        key = normalize_artist_key(name)
+        if key and key not in artists:
+            artists[key] = name
+
+    todo = []
+    for key, name in artists.items():
+        fetched_at, empty = freshness.get(key, (None, True))
+        if fetched_at is None or _is_stale(fetched_at, max_age, empty):
+            todo.append(name)
+    if limit is not None:
+        todo = todo[:limit]
+
+    refreshed = 0
+    for name in todo:
+        if refresh_artist_node(spotify_client, lastfm_client, name):
+            refreshed += 1
+
+    return {'artists': len(artists), 'checked': len(todo), 'refreshed': refreshed}
+
+def schedule_graph_build(spotify_client, lastfm_client) -> bool:
+    """Run build_artist_graph in the background (no-op if already running)"""
+    return run_in_background(GRAPH_BUILD_JOB, build_artist_graph, spotify_client, lastfm_client)
+
+def on_album_posted(artist_name: str) -> bool:
+    """Incremental refresh: make sure a newly posted artist gets a graph node"""
+    from services.spotify_service import get_spotify_client
+    from services.lastfm_service import get_lastfm_client
+
+    node = load_artist_graph_node(normalize_artist_key(clean_artist_name(artist_name)))
+    if node is not None and not _is_stale(node['fetched_at'], empty=not node['related']):
+        return False
+    return schedule_artist_refresh(get_spotify_client(), get_lastfm_client(), artist_name)
+
+def get_graph_stats() -> Dict:
+    """Count graph nodes and how many of them are stale"""
+    freshness = load_artist_graph_freshness()
+    return {
+        'nodes': len(freshness),
+        'stale': sum(1 for fetched_at, empty in freshness.values() if _is_stale(fetched_at, empty=empty))
+    }
@@ -3,32 +3,91 @@
 # BANDCAMP SERVICE
 # ===========================
 
-import requests
 from bs4 import BeautifulSoup
-from typing import Optional, Dict
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Tuple
+from config import BANDCAMP, BANDCAMP_SEARCH_URL, BANDCAMP_LINK_TTL, BANDCAMP_NEGATIVE_TTL
+from database.operations import load_bandcamp_link, save_bandcamp_link
+from services.http_client import http_get
+from utils.background import run_in_background, is_job_running
+from utils.helpers import normalize_artist_key
+from utils.tracing import start_trace
+
+def _search(artist: str, record: str) -> Optional[Dict]:
+    """Scrape Bandcamp search results; raises on network errors, None when nothing matches"""
+    params = {"q": f"{artist} {record}", "item_type": "a"}
+    res = http_get(BANDCAMP, BANDCAMP_SEARCH_URL, params=params, timeout=15)
+    res.raise_for_status()
+    soup = BeautifulSoup(res.content, "html.parser")
+    li = soup.find("li", class_="searchresult")
+    if not li:
+        return None
+    a_tag = li.find("a", href=True)
+    heading = li.find("div", class_="heading")
+    subhead = li.find("div", class_="subhead")
+    if a_tag and heading and subhead:
+        clean = a_tag["href"].split("?")[0]
+        return {
+            "artist": subhead.text.replace("by ", "").strip(),
+            "album": heading.text.strip(),
+            "url": clean,
+        }
+    return None
 
 def bandcamp_search(artist: str, record: str) -> Optional[Dict]:
     """Scrape Bandcamp search results and return first match"""
     try:
-        q = f"{artist} {record}".replace(" ", "+")
-        url = f"https://bandcamp.com/search?q={q}&item_type=a"
-        res = requests.get(url, timeout=15)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.content, "html.parser")
-        li = soup.find("li", class_="searchresult")
-        if not li:
-            return None
-        a_tag = li.find("a", href=True)
-        heading = li.find("div", class_="heading")
-        subhead = li.find("div", class_="subhead")
-        if a_tag and heading and subhead:
-            clean = a_tag["href"].split("?")[0]
-            return {
-                "artist": subhead.text.replace("by ", "").strip(),
-                "album": heading.text.strip(),
-                "url": clean,
-            }
+        return _search(artist, record)
     except Exception as e:
         print(f"Error searching Bandcamp: {e}")
-        pass
-    return None
\ No newline at end of file
+    return None
+
+# ============ CACHED / DEFERRED LOOKUPS ============
+
+def bandcamp_lookup_key(artist: str, album: str) -> str:
+    """Cache key for an (artist, album) pair"""
+    return f"{normalize_artist_key(artist)}|{normalize_artist_key(album)}"
+
+def get_cached_bandcamp(artist: str, album: str) -> Tuple[bool, Optional[Dict]]:
+    """
+    Cached Bandcamp link for an album: (known, result).
+    known is False when the album was never looked up or the entry expired;
+    a known miss is (True, None).
+    """
+    cached = load_bandcamp_link(bandcamp_lookup_key(artist, album))
+    if not cached:
+        return False, None
+    ttl = BANDCAMP_LINK_TTL if cached['found'] else BANDCAMP_NEGATIVE_TTL
+    if datetime.now() - cached['checked_at'] >= timedelta(seconds=ttl):
+        return False, None
+    if not cached['found']:
+        return True, None
+    return True, {"url": cached['url'], "artist": cached['artist'], "album": cached['album']}
+
+def resolve_bandcamp(artist: str, album: str) -> Optional[Dict]:
+    """Look an album up on Bandcamp and cache the answer (misses included, errors not)"""
+    # Its own trace when run as a background job, a span inside a discovery
+    with start_trace("bandcamp_lookup", artist=artist, album=album) as attributes:
+        known, result = get_cached_bandcamp(artist, album)
+        attributes['cached'] = known
+        if known:
+            return result
+        try:
+            result = _search(artist, album)
+        except Exception as e:
+            print(f"Error searching Bandcamp: {e}")
+            return None
+        attributes['found'] = result is not None
+        save_bandcamp_link(bandcamp_lookup_key(artist, album), result)
+        return result
+
+def _job_name(artist: str, album: str) -> str:
+    return f"bandcamp:{bandcamp_lookup_key(artist, album)}"
+
+def schedule_bandcamp_lookup(artist: str, album: str) -> bool:
+    """Resolve an album's Bandcamp link in the background"""
+    return run_in_background(_job_name(artist, album), resolve_bandcamp, artist, album)
+
+def is_bandcamp_lookup_running(artist: str, album: str) -> bool:
+    """Whether a background lookup for this album is still in flight"""
+    return is_job_running(_job_name(artist, album))
@@ -0,0 +1,117 @@
+# File: metalwall_app/services/bulk_import.py
+# ===========================
+# BULK ALBUM IMPORT
+# ===========================
+
+import csv
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+from config import BULK_IMPORT_CONCURRENCY, BULK_IMPORT_PER_HOST, BULK_IMPORT_BATCH_SIZE
+from database.operations import save_albums_batch, load_album_urls
+from services.http_client import HostLimiter
+from services.metadata_extractor import extract_metadata
+from utils.helpers import canonicalize_url, process_tags
+
+# First cell of a CSV header row
+_CSV_HEADERS = {'url', 'link', 'album_url'}
+
+def _has_csv_header(text: str) -> bool:
+    first = next((line for line in text.splitlines() if line.strip()), '')
+    cells = next(csv.reader([first]), [])
+    return len(cells) > 1 and cells[0].strip().lower() in _CSV_HEADERS
+
+def parse_import_list(text: str, csv_format: Optional[bool] = None) -> List[Tuple[str, str]]:
+    """
+    Parse a pasted list or CSV into (url, tags) pairs.
+    A list has one "url #tag #tag" per line (commas are part of the URL or tags);
+    CSV rows are "url,tags". csv_format=None treats the text as CSV only if it starts with a header row.
+    """
+    if csv_format is None:
+        csv_format = _has_csv_header(text)
+    if csv_format:
+        rows = ((row[0].strip(), ' '.join(cell.strip() for cell in row[1:]))
+                for row in csv.reader(io.StringIO(text)) if row)
+    else:
+        rows = ((parts[0], ' '.join(parts[1:])) for parts in map(str.split, text.splitlines()) if parts)
+
+    # Header rows and anything else that isn't a link are dropped here; "#a, #b" tags become "#a #b"
+    return [(url, ' '.join(tags.replace(',', ' ').split())) for url, tags in rows
+            if url.lower().startswith(('http://', 'https://'))]
+
+def prepare_import(entries: List[Tuple[str, str]], default_tags: str = "") -> Tuple[List[Dict], List[Dict]]:
+    """
+    Canonicalize and dedupe entries against each other and the wall.
+    Returns (items to import, skipped items with a reason).
+    """
+    on_wall = {canonicalize_url(url) for url in load_album_urls()}
+    seen = set()
+    items, skipped = [], []
+    for url, tags in entries:
+        canonical = canonicalize_url(url)
+        if canonical in on_wall:
+            skipped.append({'url': url, 'reason': 'already on the wall'})
+        elif canonical in seen:
+            skipped.append({'url': url, 'reason': 'duplicate in list'})
+        else:
+            seen.add(canonical)
+            items.append({'url': canonical, 'tags': process_tags(f"{tags} {default_tags}")})
+    return items, skipped
+
+def _fetch(item: Dict, limiter: HostLimiter) -> Optional[Dict]:
+    with limiter.limit(item['url']):
+        return extract_metadata(item['url'])
+
+def run_bulk_import(username: str, items: List[Dict], concurrency: int = BULK_IMPORT_CONCURRENCY,
+                    per_host: int = BULK_IMPORT_PER_HOST, batch_size: int = BULK_IMPORT_BATCH_SIZE,
+                    dry_run: bool = False) -> Iterator[Dict]:
+    """
+    Fetch metadata for `items` concurrently and insert them in batches.
+    Yields progress events: {'event': 'fetched' | 'failed' | 'saved', 'done', 'total', ...}.
+    """
+    limiter = HostLimiter(per_host)
+    total = len(items)
+    done = 0
+    pending: List[Dict] = []
+
+    def flush():
+        saved = len(pending) if dry_run else save_albums_batch(pending)
+        event = {'event': 'saved', 'done': done, 'total': total, 'count': saved,
+                 'artists': [a['artist'] for a in pending]}
+        if saved != len(pending):
+            event['error'] = f"Batch insert failed ({len(pending)} albums)"
+        pending.clear()
+        return event
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {executor.submit(_fetch, item, limiter): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            done += 1
+            try:
+                metadata = future.result()
+            except Exception as e:
+                metadata, error = None, str(e)
+            else:
+                error = None if metadata else "Could not extract metadata"
+
+            if not metadata:
+                yield {'event': 'failed', 'done': done, 'total': total, 'url': item['url'], 'error': error}
+                continue
+
+            pending.append({
+                'username': username,
+                'url': item['url'],
+                'artist': metadata['artist'],
+                'album_name': metadata['album_name'],
+                'cover_url': metadata['cover_url'],
+                'platform': metadata['platform'],
+                'tags': item['tags']
+            })
+            yield {'event': 'fetched', 'done': done, 'total': total, 'url': item['url'],
+                   'artist': metadata['artist'], 'album_name': metadata['album_name']}
+            if len(pending) >= batch_size:
+                yield flush()
+
+    if pending:
+        yield flush()
@@ -0,0 +1,163 @@
+# File: metalwall_app/services/circuit_breaker.py
+# ===========================
+# CIRCUIT BREAKERS AND DEADLINES
+# ===========================
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from config import CIRCUIT_BREAKER_SETTINGS, CIRCUIT_BREAKER_PER_HOST
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open"""
+
+    def __init__(self, provider: str):
+        super().__init__(f"{provider} is temporarily unavailable (circuit open)")
+        self.provider = provider
+
+class DeadlineExceeded(Exception):
+    """Raised when a pipeline has used up its total time budget"""
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker over a rolling window of call outcomes.
+    Calls slower than `slow_call_seconds` count as failures, so a provider that
+    is merely slow trips the breaker just like one that is erroring.
+    """
+
+    def __init__(self, provider: str, window: int = 20, min_calls: int = 5,
+                 failure_threshold: float = 0.5, slow_call_seconds: float = 5.0,
+                 cooldown: float = 30.0):
+        self.provider = provider
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.times_opened = 0
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window)  # (failed, latency)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (half-open lets a single probe through)"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def release(self):
+        """Give back a half-open probe slot when the call never went out"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def record(self, success: bool, latency: float):
+        """Record one call outcome and update the breaker state"""
+        failed = not success or latency > self.slow_call_seconds
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._open()
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                return
+
+            self._outcomes.append((failed, latency))
+            if self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for f, _ in self._outcomes if f)
+                if failures / len(self._outcomes) >= self.failure_threshold:
+                    self._open()
+
+    def stats(self) -> Dict:
+        """State, rolling failure rate and latency percentiles"""
+        with self._lock:
+            outcomes = list(self._outcomes)
+            state = self.state
+        latencies = sorted(latency for _, latency in outcomes)
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return {
+            'state': state,
+            'calls': len(outcomes),
+            'failure_rate': sum(1 for f, _ in outcomes if f) / len(outcomes) if outcomes else 0.0,
+            'p50_latency': percentile(0.50),
+            'p95_latency': percentile(0.95),
+            'times_opened': self.times_opened,
+            'rejected': self.rejected
+        }
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def breaker_key(provider: str, host: Optional[str] = None) -> str:
+    """Registry key: the provider, or "provider:host" for providers with per-host breakers"""
+    if host and provider in CIRCUIT_BREAKER_PER_HOST:
+        return f"{provider}:{host.lower()}"
+    return provider
+
+def get_breaker(provider: str, host: Optional[str] = None) -> CircuitBreaker:
+    """Process-wide breaker for a provider (or for one of its hosts)"""
+    key = breaker_key(provider, host)
+    with _breakers_lock:
+        if key not in _breakers:
+            settings = CIRCUIT_BREAKER_SETTINGS.get(provider, CIRCUIT_BREAKER_SETTINGS['default'])
+            _breakers[key] = CircuitBreaker(key, **settings)
+        return _breakers[key]
+
+def is_available(provider: str, host: Optional[str] = None) -> bool:
+    """Cheap check (no probe consumed) that a provider's breaker is not open"""
+    breaker = get_breaker(provider, host)
+    return breaker.state != OPEN or time.monotonic() - breaker._opened_at >= breaker.cooldown
+
+def get_breaker_stats() -> Dict[str, Dict]:
+    """Stats of every breaker created so far"""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {provider: breaker.stats() for provider, breaker in breakers.items()}
+
+# ============ PIPELINE DEADLINES ============
+
+_deadline: ContextVar[Optional[float]] = ContextVar('pipeline_deadline', default=None)
+
+@contextmanager
+def deadline_scope(seconds: float):
+    """Give the enclosed pipeline a total time budget; nested scopes can only shorten it"""
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+def remaining_time() -> Optional[float]:
+    """Seconds left in the current pipeline's budget (None when unbounded)"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
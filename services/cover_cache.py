@@ -0,0 +1,148 @@
+# File: metalwall_app/services/cover_cache.py
+# ===========================
+# COVER THUMBNAIL CACHE
+# ===========================
+
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from config import (
+    WEB, COVER_CACHE_DIR, COVER_CACHE_URL, COVER_SIZES, COVER_PIXEL_DENSITY,
+    COVER_CACHE_MAX_BYTES, COVER_FETCH_WORKERS
+)
+from services.http_client import http_get
+from utils.cache import TTLCache
+
+# Pillow is optional: without it cards keep hotlinking the original covers
+try:
+    from PIL import Image, features
+    PIL_AVAILABLE = True
+    THUMB_FORMAT, THUMB_EXT = ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+except ImportError:
+    PIL_AVAILABLE = False
+    THUMB_FORMAT, THUMB_EXT = None, None
+
+# Covers that failed to download are not retried for an hour
+_failed = TTLCache(maxsize=4096, ttl=3600)
+_pending = set()
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_cache_bytes: Optional[int] = None
+_stats = {'fetched': 0, 'failed': 0, 'evicted': 0}
+
+def _filename(cover_url: str, size: int) -> str:
+    return f"{hashlib.sha1(cover_url.encode('utf-8')).hexdigest()}_{size}.{THUMB_EXT}"
+
+def get_cover_file(cover_url: str, size: int = COVER_SIZES[0]) -> Optional[str]:
+    """Path of the cached thumbnail for a cover, or None if it isn't cached yet"""
+    if not PIL_AVAILABLE or not cover_url:
+        return None
+    path = os.path.join(COVER_CACHE_DIR, _filename(cover_url, size))
+    return path if os.path.exists(path) else None
+
+def get_cover_src(cover_url: str, size: int = COVER_SIZES[0]) -> str:
+    """
+    URL to put in an <img> for a cover: the local thumbnail when cached,
+    otherwise the original URL while the thumbnail is fetched in the background.
+    """
+    if not cover_url or not PIL_AVAILABLE:
+        return cover_url
+    if get_cover_file(cover_url, size):
+        return f"{COVER_CACHE_URL}/{_filename(cover_url, size)}"
+    schedule_cover_fetch(cover_url)
+    return cover_url
+
+def schedule_cover_fetch(cover_url: str) -> bool:
+    """Queue a cover download (no-op if already queued or recently failed)"""
+    global _executor
+    if not PIL_AVAILABLE or not cover_url.startswith(('http://', 'https://')) or _failed.get(cover_url):
+        return False
+    with _lock:
+        if cover_url in _pending:
+            return False
+        _pending.add(cover_url)
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=COVER_FETCH_WORKERS, thread_name_prefix="cover")
+    _executor.submit(_fetch_cover, cover_url)
+    return True
+
+def _fetch_cover(cover_url: str):
+    """Download a cover once and write every thumbnail size"""
+    try:
+        response = http_get(WEB, cover_url, timeout=10)
+        response.raise_for_status()
+        image = Image.open(io.BytesIO(response.content)).convert('RGB')
+
+        os.makedirs(COVER_CACHE_DIR, exist_ok=True)
+        written = 0
+        for size in COVER_SIZES:
+            thumb = image.copy()
+            pixels = size * COVER_PIXEL_DENSITY
+            thumb.thumbnail((pixels, pixels), Image.LANCZOS)
+            path = os.path.join(COVER_CACHE_DIR, _filename(cover_url, size))
+            tmp_path = f"{path}.tmp"
+            thumb.save(tmp_path, THUMB_FORMAT, quality=82)
+            os.replace(tmp_path, path)
+            written += os.path.getsize(path)
+
+        with _lock:
+            _stats['fetched'] += 1
+        _account(written)
+    except Exception as e:
+        print(f"Error caching cover {cover_url}: {e}")
+        _failed.set(cover_url, True)
+        with _lock:
+            _stats['failed'] += 1
+    finally:
+        with _lock:
+            _pending.discard(cover_url)
+
+def _scan() -> list:
+    """(mtime, size, path) of every cached thumbnail"""
+    entries = []
+    if os.path.isdir(COVER_CACHE_DIR):
+        for entry in os.scandir(COVER_CACHE_DIR):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    return entries
+
+def _account(added: int):
+    """Track the cache size and evict the oldest thumbnails once it exceeds the limit"""
+    global _cache_bytes
+    with _lock:
+        if _cache_bytes is None:
+            _cache_bytes = sum(size for _, size, _ in _scan())
+        else:
+            _cache_bytes += added
+        if _cache_bytes <= COVER_CACHE_MAX_BYTES:
+            return
+
+        # Evict down to 90% of the limit, oldest first
+        entries = sorted(_scan())
+        _cache_bytes = sum(size for _, size, _ in entries)
+        target = COVER_CACHE_MAX_BYTES * 0.9
+        for _, size, path in entries:
+            if _cache_bytes <= target:
+                break
+            try:
+                os.remove(path)
+                _cache_bytes -= size
+                _stats['evicted'] += 1
+            except OSError:
+                pass
+
+def get_cover_cache_stats() -> Dict:
+    """Thumbnail count, size on disk and fetch counters"""
+    entries = _scan()
+    with _lock:
+        return {
+            **_stats,
+            'enabled': PIL_AVAILABLE,
+            'files': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'pending': len(_pending)
+        }
@@ -0,0 +1,130 @@
+# File: metalwall_app/services/discovery_pool.py
+# ===========================
+# PRE-WARMED DISCOVERY POOL
+# ===========================
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Optional
+from config import (
+    DISCOVERY_POOL_DEPTH, DISCOVERY_POOL_GLOBAL_DEPTH, DISCOVERY_POOL_TTL,
+    DISCOVERY_POOL_MAX_ARTISTS, DISCOVERY_POOL_REFILL_INTERVAL
+)
+from utils.background import run_in_background
+from utils.cache import record_cache_lookup
+from utils.helpers import normalize_artist_key
+
+GLOBAL_POOL_KEY = "__global__"
+
+# key -> deque of (created_at, discovery_data); per-artist pools are kept in LRU order
+_pools: "OrderedDict[str, deque]" = OrderedDict()
+_lock = threading.Lock()
+_next_production_at = 0.0
+_produced_at = deque(maxlen=500)
+_stats = {'hits': 0, 'misses': 0, 'produced': 0, 'expired': 0, 'failed': 0}
+
+def pool_key(base_artist: Optional[str]) -> str:
+    """Pool key for a base artist ("Discover Another") or the global pool"""
+    return normalize_artist_key(base_artist) if base_artist else GLOBAL_POOL_KEY
+
+def _max_depth(key: str) -> int:
+    return DISCOVERY_POOL_GLOBAL_DEPTH if key == GLOBAL_POOL_KEY else DISCOVERY_POOL_DEPTH
+
+def _drop_expired(pool: deque):
+    """Remove entries older than the pool TTL (caller holds the lock)"""
+    now = time.monotonic()
+    while pool and now - pool[0][0] > DISCOVERY_POOL_TTL:
+        pool.popleft()
+        _stats['expired'] += 1
+
+def pool_depth(key: str) -> int:
+    """Number of ready discoveries for a key"""
+    with _lock:
+        pool = _pools.get(key)
+        if not pool:
+            return 0
+        _drop_expired(pool)
+        return len(pool)
+
+def take_discovery(key: str) -> Optional[Dict]:
+    """Pop a ready discovery for a key (None on a miss)"""
+    with _lock:
+        pool = _pools.get(key)
+        if pool:
+            _drop_expired(pool)
+        if not pool:
+            _stats['misses'] += 1
+            record_cache_lookup('discovery_pool', False)
+            return None
+        _stats['hits'] += 1
+        record_cache_lookup('discovery_pool', True)
+        return pool.popleft()[1]
+
+def put_discovery(key: str, discovery_data: Dict) -> bool:
+    """Add a validated discovery to a pool unless it is full or a duplicate"""
+    with _lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = deque()
+            # Bound the number of per-artist pools (least recently created first)
+            while len(_pools) > DISCOVERY_POOL_MAX_ARTISTS + 1:
+                oldest = next(k for k in _pools if k != GLOBAL_POOL_KEY)
+                del _pools[oldest]
+        _pools.move_to_end(key)
+        _drop_expired(pool)
+
+        url = discovery_data['discovery'].get('url')
+        if len(pool) >= _max_depth(key) or any(d['discovery'].get('url') == url for _, d in pool):
+            return False
+
+        pool.append((time.monotonic(), discovery_data))
+        _stats['produced'] += 1
+        _produced_at.append(time.monotonic())
+        return True
+
+def _wait_for_refill_slot():
+    """Space productions at least DISCOVERY_POOL_REFILL_INTERVAL apart (all producers)"""
+    global _next_production_at
+    with _lock:
+        now = time.monotonic()
+        start = max(now, _next_production_at)
+        _next_production_at = start + DISCOVERY_POOL_REFILL_INTERVAL
+    if start > now:
+        time.sleep(start - now)
+
+def _refill(key: str, producer: Callable[[], Optional[Dict]]) -> int:
+    """Produce discoveries until the pool for `key` is full; stops at the first failure"""
+    added = 0
+    while pool_depth(key) < _max_depth(key):
+        _wait_for_refill_slot()
+        discovery_data = producer()
+        if not discovery_data:
+            with _lock:
+                _stats['failed'] += 1
+            break
+        if put_discovery(key, discovery_data):
+            added += 1
+    return added
+
+def schedule_refill(key: str, producer: Callable[[], Optional[Dict]]) -> bool:
+    """Refill a pool in the background (no-op if full or a refill is already running)"""
+    if pool_depth(key) >= _max_depth(key):
+        return False
+    return run_in_background(f"discovery_pool:{key}", _refill, key, producer)
+
+def get_pool_stats() -> Dict:
+    """Pool depth, hit rate and refill rate (discoveries produced per minute)"""
+    with _lock:
+        for pool in _pools.values():
+            _drop_expired(pool)
+        now = time.monotonic()
+        lookups = _stats['hits'] + _stats['misses']
+        return {
+            **_stats,
+            'hit_rate': _stats['hits'] / lookups if lookups else 0.0,
+            'global_depth': len(_pools.get(GLOBAL_POOL_KEY, ())),
+            'artist_pools': sum(1 for k in _pools if k != GLOBAL_POOL_KEY),
+            'total_depth': sum(len(pool) for pool in _pools.values()),
+            'refill_rate_per_min': sum(1 for t in _produced_at if now - t <= 600) / 10.0
+        }
@@ -0,0 +1,133 @@
+# File: metalwall_app/services/genre_classifier.py
+# ===========================
+# ARTIST GENRE CLASSIFICATION
+# ===========================
+
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from config import ARTIST_GENRE_TTL, ARTIST_GENRE_REJECT_CONFIDENCE
+from database.operations import load_artist_genres, save_artist_genre, update_artist_genre_verdicts
+from utils.helpers import normalize_artist_key
+from utils.tracing import traced
+
+# Last.fm tags: substring keywords that mark an artist as metal
+METAL_KEYWORDS = [
+    'metal', 'grindcore', 'goregrind', 'deathcore', 'sludge',
+    'thrash', 'death metal', 'black metal', 'doom metal', 'stoner'
+]
+
+# Bloqueo total de géneros que causan falsos positivos (coincidencia exacta)
+EXCLUDED_GENRES = ['pop', 'jazz', 'rnb', 'house', 'techno', 'musical', 'soundtrack', 'broadway', 'easy listening']
+
+# Spotify genres
+SPOTIFY_METAL_KEYWORDS = ['metal', 'grindcore', 'death', 'doom']
+SPOTIFY_NON_METAL_KEYWORDS = ['pop', 'hip hop', 'house', 'musical']
+
+# Album names that point to musicals / soundtracks
+SUSPICIOUS_ALBUM_KEYWORDS = ['musical', 'soundtrack', 'cast recording', 'broadway']
+
+# Tags worth keeping on a discovery
+DISCOVERY_TAG_KEYWORDS = ['metal', 'death', 'thrash', 'doom', 'grind', 'sludge']
+
+def compile_keywords(keywords: Iterable[str]) -> re.Pattern:
+    """Compile a keyword list into a single substring matcher"""
+    ordered = sorted(set(keywords), key=len, reverse=True)
+    return re.compile('|'.join(re.escape(k) for k in ordered))
+
+_METAL_MATCHER = compile_keywords(METAL_KEYWORDS)
+_EXCLUDED_SET = frozenset(EXCLUDED_GENRES)
+_SPOTIFY_METAL_MATCHER = compile_keywords(SPOTIFY_METAL_KEYWORDS)
+_SPOTIFY_NON_METAL_MATCHER = compile_keywords(SPOTIFY_NON_METAL_KEYWORDS)
+_SUSPICIOUS_ALBUM_MATCHER = compile_keywords(SUSPICIOUS_ALBUM_KEYWORDS)
+_DISCOVERY_TAG_MATCHER = compile_keywords(DISCOVERY_TAG_KEYWORDS)
+
+def classify_tags(tags: List[str]) -> Tuple[bool, float]:
+    """
+    Classify an artist from its (lower-cased, weight-ordered) Last.fm tags.
+    Returns (is_metal, confidence); confidence is the rank-weighted share of
+    tags that agree with the verdict, 0.0 when there are no tags at all.
+    """
+    if not tags:
+        return False, 0.0
+
+    metal_hits = [bool(_METAL_MATCHER.search(tag)) for tag in tags]
+    has_metal_tag = any(metal_hits)
+    has_pop_tag = any(tag in _EXCLUDED_SET for tag in tags)
+
+    # Un artista es válido si tiene tags de metal y no está "contaminado" por géneros excluidos
+    # (a menos que el tag excluido forme parte de una etiqueta de metal)
+    is_metal = has_metal_tag and not (has_pop_tag and 'metal' not in "".join(tags))
+
+    weights = [1.0 / rank for rank in range(1, len(tags) + 1)]
+    metal_share = sum(w for w, hit in zip(weights, metal_hits) if hit) / sum(weights)
+    confidence = metal_share if is_metal else 1.0 - metal_share
+    return is_metal, round(confidence, 3)
+
+def is_metal_on_spotify(genres: List[str]) -> bool:
+    """Check Spotify artist genres: metal keywords present and no unwanted genre"""
+    genres = [g.lower() for g in genres]
+    is_metal = any(_SPOTIFY_METAL_MATCHER.search(g) for g in genres)
+    is_non_metal = any(_SPOTIFY_NON_METAL_MATCHER.search(g) for g in genres)
+    return is_metal and not is_non_metal
+
+def is_suspicious_album(album_name: str) -> bool:
+    """Detect musicals, soundtracks and cast recordings by album name"""
+    return bool(_SUSPICIOUS_ALBUM_MATCHER.search((album_name or '').lower()))
+
+def is_discovery_tag(tag: str) -> bool:
+    """Check whether a tag is metal-related enough to keep on a discovery"""
+    return bool(_DISCOVERY_TAG_MATCHER.search(tag))
+
+# ============ STORED VERDICTS ============
+
+def _is_current(verdict: Dict) -> bool:
+    """Check whether a stored verdict is still within its TTL"""
+    return datetime.now() - verdict['computed_at'] < timedelta(seconds=ARTIST_GENRE_TTL)
+
+def get_known_verdict(artist_name: str) -> Optional[Dict]:
+    """
+    Return the stored (and still current) genre verdict for an artist, if any.
+    Non-metal verdicts only count when confident enough, as in filter_known_non_metal.
+    """
+    key = normalize_artist_key(artist_name)
+    if not key:
+        return None
+    rows = load_artist_genres([key])
+    if not rows or not _is_current(rows[0]):
+        return None
+    verdict = rows[0]
+    if not verdict['is_metal'] and verdict['confidence'] < ARTIST_GENRE_REJECT_CONFIDENCE:
+        return None
+    return verdict
+
+@traced()
+def record_verdict(artist_name: str, tags: List[str]) -> bool:
+    """Classify an artist from its tags, store the verdict and return it"""
+    is_metal, confidence = classify_tags(tags)
+    key = normalize_artist_key(artist_name)
+    # Sin tags no hay veredicto que guardar: el artista se vuelve a consultar
+    if key and tags:
+        save_artist_genre(key, artist_name, tags, is_metal, confidence)
+    return is_metal
+
+@traced()
+def filter_known_non_metal(artist_names: List[str]) -> List[str]:
+    """Drop artists already confidently classified as non-metal (single query)"""
+    keys = {name: normalize_artist_key(name) for name in artist_names}
+    rejected = {
+        v['artist_key'] for v in load_artist_genres(list(set(keys.values())))
+        if not v['is_metal'] and v['confidence'] >= ARTIST_GENRE_REJECT_CONFIDENCE and _is_current(v)
+    }
+    return [name for name in artist_names if keys[name] not in rejected]
+
+def reclassify_all_artists() -> int:
+    """Recompute every stored verdict from its source tags (after keyword list changes)"""
+    verdicts = []
+    for stored in load_artist_genres():
+        is_metal, confidence = classify_tags(stored['source_tags'])
+        verdicts.append((stored['artist_key'], is_metal, confidence))
+
+    if verdicts and not update_artist_genre_verdicts(verdicts):
+        return 0
+    return len(verdicts)
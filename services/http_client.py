@@ -0,0 +1,393 @@
+# File: metalwall_app/services/http_client.py
+# ===========================
+# SHARED RATE-LIMITED HTTP CLIENT
+# ===========================
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from services.circuit_breaker import get_breaker, remaining_time, CircuitOpenError, DeadlineExceeded
+from config import (
+    PROVIDER_RATE_LIMITS, HTTP_MAX_RETRIES, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX,
+    HTTP_RETRY_AFTER_MAX, HTTP_POOL_HOSTS, HTTP_POOL_MAXSIZE, CIRCUIT_BREAKER_PER_HOST,
+    HEAD_FETCH_MAX_BYTES, HEAD_FETCH_CHUNK_SIZE, LASTFM, WEB, LINK_HEALTH, PROVIDER_BASE
+)
+from utils.metrics import counter, histogram
+from utils.tracing import set_attribute, span
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Statuses that mean the resource is really gone (safe to remember as a miss)
+GONE_STATUSES = {404, 410}
+
+HTTP_REQUEST_SECONDS = histogram("metalwall_http_request_seconds",
+                                 "Provider request latency (queueing and retries included)", ["provider"])
+HTTP_REQUESTS = counter("metalwall_http_requests_total", "Provider requests by outcome", ["provider", "outcome"])
+
+# Last.fm reports throttling / temporary failures as API error codes
+LASTFM_RETRY_ERRORS = {11, 16, 29}
+
+# urllib3 only decodes brotli when the brotli package is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+class TokenBucket:
+    """
+    Thread-safe token bucket; callers reserve a token and sleep until it is theirs.
+    Pauses (Retry-After) can be scoped to one host, so a throttling site only holds
+    back requests to itself while the token budget stays shared.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until: Dict[Optional[str], float] = {}
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, host: Optional[str] = None, budget: Optional[float] = None) -> Optional[float]:
+        """
+        Take one token, blocking until available; returns the time spent waiting.
+        When the wait would exceed `budget` seconds, returns None at once and takes nothing.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            paused_until = max(self._paused_until.get(None, 0.0), self._paused_until.get(host, 0.0))
+            wait = max((1 - self._tokens) / self.rate if self._tokens < 1 else 0.0, paused_until - now)
+            if budget is not None and wait > budget:
+                return None
+            self._tokens -= 1
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float, host: Optional[str] = None):
+        """Hold callers back for `seconds` (all of them, or only those going to `host`)"""
+        with self._lock:
+            self._paused_until[host] = max(self._paused_until.get(host, 0.0), time.monotonic() + seconds)
+
+    def available(self) -> float:
+        """Tokens currently available (negative when callers are queued)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+def _new_stats() -> Dict:
+    return {'requests': 0, 'throttled': 0, 'retries': 0, 'errors': 0,
+            'queued': 0, 'total_wait': 0.0, 'max_wait': 0.0,
+            'head_fetches': 0, 'head_truncated': 0, 'bytes_read': 0}
+
+_buckets: Dict[str, TokenBucket] = {}
+_stats: Dict[str, Dict] = {}
+_sessions: Dict[str, "ProviderSession"] = {}
+_registry_lock = threading.Lock()
+
+def get_bucket(provider: str) -> TokenBucket:
+    """Process-wide token bucket for a provider (shared by every session)"""
+    with _registry_lock:
+        if provider not in _buckets:
+            rate, capacity = PROVIDER_RATE_LIMITS.get(provider, PROVIDER_RATE_LIMITS['default'])
+            _buckets[provider] = TokenBucket(rate, capacity)
+            _stats[provider] = _new_stats()
+        return _buckets[provider]
+
+def _record(provider: str, **deltas):
+    """Add to a provider's counters"""
+    with _registry_lock:
+        stats = _stats.setdefault(provider, _new_stats())
+        for name, value in deltas.items():
+            if name == 'max_wait':
+                stats[name] = max(stats[name], value)
+            else:
+                stats[name] += value
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+def _lastfm_should_retry(response: requests.Response) -> bool:
+    """Last.fm may throttle with an error payload instead of a 429"""
+    if response.status_code == 200:
+        return False
+    try:
+        return response.json().get('error') in LASTFM_RETRY_ERRORS
+    except ValueError:
+        return False
+
+_RETRY_PREDICATES: Dict[str, Callable[[requests.Response], bool]] = {LASTFM: _lastfm_should_retry}
+
+class ProviderSession(requests.Session):
+    """
+    requests.Session bound to one provider: every request waits for a token from
+    the provider's shared bucket, honours Retry-After and retries with jittered backoff.
+    Calls are refused while the provider's circuit breaker is open, and timeouts
+    are clamped to whatever is left of the current pipeline deadline.
+    """
+
+    def __init__(self, provider: str):
+        super().__init__()
+        self.provider = provider
+        self.headers['User-Agent'] = USER_AGENT
+        self.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        # One keep-alive pool per host, so repeat requests skip the TCP/TLS handshake
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_MAXSIZE)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def _should_retry(self, response: requests.Response) -> bool:
+        if response.status_code in RETRY_STATUSES:
+            return True
+        predicate = _RETRY_PREDICATES.get(self.provider)
+        return bool(predicate and predicate(response))
+
+    def request(self, method, url, *args, **kwargs):
+        # Query strings are left out of the span: they carry API keys
+        parts = urlsplit(url)
+        started = time.perf_counter()
+        outcome = 'network_error'
+        try:
+            with span(f"http.{self.provider}", method=method, url=f"{parts.netloc}{parts.path}") as attributes:
+                response = self._send(method, url, *args, **kwargs)
+                attributes['status'] = response.status_code
+                outcome = _outcome(response.status_code)
+                return response
+        except (CircuitOpenError, DeadlineExceeded):
+            outcome = 'rejected'
+            raise
+        finally:
+            HTTP_REQUESTS.inc(provider=self.provider, outcome=outcome)
+            if outcome != 'rejected':
+                HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, provider=self.provider)
+
+    def _send(self, method, url, *args, **kwargs):
+        """Budgeted, breaker-guarded request with retries"""
+        host = urlsplit(url).netloc.lower()
+        breaker = get_breaker(self.provider, host)
+        # Retry-After pauses follow the breakers: per host for providers that reach arbitrary sites
+        pause_host = host if self.provider in CIRCUIT_BREAKER_PER_HOST else None
+        if PROVIDER_BASE and self.provider in (WEB, LINK_HEALTH):
+            url = standin_url(url)
+        bucket = get_bucket(self.provider)
+        attempt = 0
+        while True:
+            # Fail fast: exhausted pipeline budget or tripped provider
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceeded(f"No time left for {self.provider} request")
+            if not breaker.allow():
+                raise CircuitOpenError(breaker.provider)
+
+            # Never queue past the deadline: give up at once instead, without spending a token
+            wait = bucket.acquire(pause_host, remaining)
+            if wait is None:
+                breaker.release()
+                raise DeadlineExceeded(f"{self.provider} queue is longer than the remaining budget")
+            _record(self.provider, requests=1, total_wait=wait, max_wait=wait, queued=1 if wait > 0 else 0)
+
+            remaining = remaining_time()
+            if remaining is not None:
+                if remaining <= 0:
+                    breaker.release()
+                    raise DeadlineExceeded(f"Budget spent queueing for {self.provider}")
+                timeout = kwargs.get('timeout')
+                kwargs['timeout'] = remaining if timeout is None else min(timeout, remaining)
+
+            started = time.monotonic()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                breaker.record(False, time.monotonic() - started)
+                _record(self.provider, errors=1)
+                delay = backoff_delay(attempt + 1)
+                if attempt >= HTTP_MAX_RETRIES or not _fits_budget(delay):
+                    raise
+                attempt += 1
+                _record(self.provider, retries=1)
+                set_attribute('retries', attempt)
+                time.sleep(delay)
+                continue
+            except Exception:
+                breaker.record(False, time.monotonic() - started)
+                raise
+
+            retry = self._should_retry(response)
+            breaker.record(not retry, time.monotonic() - started)
+            if not retry:
+                return response
+
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if response.status_code == 429 or retry_after is not None:
+                _record(self.provider, throttled=1)
+                if retry_after is not None:
+                    bucket.pause(min(retry_after, HTTP_RETRY_AFTER_MAX), pause_host)
+            else:
+                _record(self.provider, errors=1)
+
+            delay = retry_after if retry_after is not None else backoff_delay(attempt + 1)
+            if attempt >= HTTP_MAX_RETRIES or delay > HTTP_RETRY_AFTER_MAX or not _fits_budget(delay):
+                return response
+            attempt += 1
+            _record(self.provider, retries=1)
+            set_attribute('retries', attempt)
+            if retry_after is None:
+                time.sleep(delay)
+            response.close()
+
+def _outcome(status: int) -> str:
+    """Metric label for a final response status"""
+    if status == 429:
+        return 'throttled'
+    if status >= 500:
+        return 'server_error'
+    if status >= 400:
+        return 'client_error'
+    return 'ok'
+
+def standin_url(url: str) -> str:
+    """Route an arbitrary page URL to the stand-in server (<base>/web/<host>/<path>)"""
+    if url.startswith(PROVIDER_BASE):
+        return url
+    parts = urlsplit(url)
+    routed = f"{PROVIDER_BASE}/web/{parts.netloc}{parts.path or '/'}"
+    return f"{routed}?{parts.query}" if parts.query else routed
+
+def _fits_budget(delay: float) -> bool:
+    """Whether waiting `delay` seconds still leaves room in the pipeline budget"""
+    remaining = remaining_time()
+    return remaining is None or delay < remaining
+
+def get_session(provider: str) -> ProviderSession:
+    """Shared rate-limited session for a provider"""
+    with _registry_lock:
+        session = _sessions.get(provider)
+        if session is None:
+            session = _sessions[provider] = ProviderSession(provider)
+    return session
+
+def http_get(provider: str, url: str, **kwargs) -> requests.Response:
+    """GET through the provider's shared rate-limited session"""
+    return get_session(provider).get(url, **kwargs)
+
+class HostLimiter:
+    """Per-host politeness: at most `per_host` requests in flight and `min_interval` seconds between starts"""
+
+    def __init__(self, per_host: int, min_interval: float = 0.0):
+        self.per_host = per_host
+        self.min_interval = min_interval
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def limit(self, url: str):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.BoundedSemaphore(self.per_host))
+        with semaphore:
+            if self.min_interval:
+                with self._lock:
+                    now = time.monotonic()
+                    start = max(now, self._next_start.get(host, 0.0))
+                    self._next_start[host] = start + self.min_interval
+                if start > now:
+                    time.sleep(start - now)
+            yield
+
+def check_status(response: requests.Response) -> bool:
+    """
+    True for a 200, False when the resource is gone (404/410).
+    Anything else (429, 5xx, unexpected codes) raises HTTPError: it says nothing about the resource.
+    """
+    if response.status_code == 200:
+        return True
+    if response.status_code in GONE_STATUSES:
+        return False
+    raise requests.HTTPError(f"{response.status_code} from {urlsplit(response.url or '').netloc}",
+                             response=response)
+
+def fetch_head_html(url: str, max_bytes: int = HEAD_FETCH_MAX_BYTES, timeout: float = 8,
+                    provider: str = WEB) -> Optional[str]:
+    """
+    Stream a page and stop reading at </head> (or after `max_bytes` decoded bytes).
+    Returns the HTML read so far, or None when the page is gone (404/410);
+    other failures raise, so callers can tell them apart from a real miss.
+    """
+    response = http_get(provider, url, timeout=timeout, stream=True)
+    try:
+        if not check_status(response):
+            return None
+
+        body = bytearray()
+        truncated = False
+        for chunk in response.iter_content(chunk_size=HEAD_FETCH_CHUNK_SIZE):
+            # Look for </head> in the new chunk plus a small overlap with the previous one
+            search_from = max(0, len(body) - 7)
+            body.extend(chunk)
+            end = body.lower().find(b'</head>', search_from)
+            if end != -1:
+                del body[end + 7:]
+                truncated = True
+                break
+            if len(body) >= max_bytes:
+                del body[max_bytes:]
+                truncated = True
+                break
+
+        try:
+            wire_bytes = response.raw.tell()
+        except Exception:
+            wire_bytes = len(body)
+        _record(provider, head_fetches=1, head_truncated=1 if truncated else 0, bytes_read=wire_bytes)
+        return body.decode('utf-8', errors='replace')
+    finally:
+        response.close()
+
+def get_provider_status() -> Dict[str, Dict]:
+    """Remaining budget, queueing delay and retry counters per provider"""
+    for provider in PROVIDER_RATE_LIMITS:
+        if provider != 'default':
+            get_bucket(provider)
+
+    status = {}
+    with _registry_lock:
+        snapshot = {provider: (bucket, dict(_stats[provider])) for provider, bucket in _buckets.items()}
+    for provider, (bucket, stats) in snapshot.items():
+        status[provider] = {
+            **stats,
+            'rate': bucket.rate,
+            'capacity': bucket.capacity,
+            'tokens': max(0.0, bucket.available()),
+            'avg_wait': stats['total_wait'] / stats['requests'] if stats['requests'] else 0.0
+        }
+    return status
@@ -5,7 +5,21 @@
 
 import streamlit as st
 import pylast
-from typing import Optional, List
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict
+from config import LASTFM, LASTFM_API_URL, LASTFM_CACHE_TTL, LASTFM_MEMORY_CACHE_SIZE, LASTFM_MEMORY_CACHE_TTL
+from database.operations import load_lastfm_artist, save_lastfm_artist
+from services.http_client import http_get
+from services.circuit_breaker import is_available
+from utils.cache import TTLCache
+from utils.helpers import normalize_artist_key
+from utils.tracing import traced
+
+# Last.fm "invalid parameters" error, returned for unknown artists
+LASTFM_ERROR_INVALID_PARAMS = 6
+
+# Process-wide memory layer in front of the lastfm_artist_cache table
+_artist_cache = TTLCache(maxsize=LASTFM_MEMORY_CACHE_SIZE, ttl=LASTFM_MEMORY_CACHE_TTL, name="lastfm_artists")
 
 @st.cache_resource
 def get_lastfm_client():
@@ -13,28 +27,150 @@ def get_lastfm_client():
     try:
         api_key = st.secrets.get("LASTFM_API_KEY", "")
         api_secret = st.secrets.get("LASTFM_API_SECRET", "")
-        
+
         if not api_key or not api_secret:
             st.warning("⚠️ Last.fm API credentials not found. Some features may be limited.")
             return None
-        
-        return pylast.LastFMNetwork(api_key=api_key, api_secret=api_secret)
+
+        return create_lastfm_client(api_key, api_secret)
     except Exception as e:
         st.error(f"❌ Error initializing Last.fm client: {e}")
         return None
 
-def get_related_artists_lastfm(lastfm_client, artist_name: str) -> List[str]:
-    """Find related artists using Last.fm API"""
+def create_lastfm_client(api_key: str, api_secret: str) -> pylast.LastFMNetwork:
+    """Build a Last.fm client (also used outside Streamlit, e.g. benchmarks)"""
+    # The network object holds the credentials; lookups go through
+    # lastfm_api_call so they share the rate-limited HTTP client
+    return pylast.LastFMNetwork(api_key=api_key, api_secret=api_secret)
+
+def _is_fresh(fetched_at: Optional[datetime]) -> bool:
+    """Check whether a cached field is still within the Last.fm cache TTL"""
+    return fetched_at is not None and datetime.now() - fetched_at < timedelta(seconds=LASTFM_CACHE_TTL)
+
+class LastfmApiError(Exception):
+    """Error payload returned by the Last.fm web service"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"Last.fm error {code}: {message}")
+        self.code = code
+
+def lastfm_api_call(lastfm_client, method: str, **params) -> Dict:
+    """Call a Last.fm REST method through the shared rate-limited client"""
+    query = {'method': method, 'api_key': lastfm_client.api_key, 'format': 'json', 'autocorrect': 0, **params}
+    response = http_get(LASTFM, LASTFM_API_URL, params=query, timeout=10)
+    data = response.json()
+    if 'error' in data:
+        raise LastfmApiError(data['error'], data.get('message', ''))
+    response.raise_for_status()
+    return data
+
+def _fetch_artist(lastfm_client, artist_name: str, want_tags: bool, want_similar: bool) -> Optional[Dict]:
+    """Fetch the requested fields from the Last.fm API (None on transient errors)"""
+    fetched = {}
+    try:
+        if want_tags:
+            data = lastfm_api_call(lastfm_client, 'artist.getTopTags', artist=artist_name)['toptags']
+            fetched['name'] = data.get('@attr', {}).get('artist', artist_name)
+            fetched['tags'] = [t['name'].lower() for t in data.get('tag', [])[:20]]
+        if want_similar:
+            data = lastfm_api_call(lastfm_client, 'artist.getSimilar', artist=artist_name, limit=15)['similarartists']
+            fetched['similar'] = [a['name'] for a in data.get('artist', [])]
+    except LastfmApiError as e:
+        # Unknown artist: cache an empty answer so it isn't requested again
+        if e.code != LASTFM_ERROR_INVALID_PARAMS:
+            print(f"Last.fm error for {artist_name}: {e}")
+            return None
+        if want_tags:
+            fetched['tags'] = []
+        if want_similar:
+            fetched['similar'] = []
+    except Exception as e:
+        print(f"Error fetching Last.fm data for {artist_name}: {e}")
+        return None
+    return fetched
+
+@traced()
+def get_artist_profile(lastfm_client, artist_name: str, include_similar: bool = False) -> Optional[Dict]:
+    """
+    Cached Last.fm lookup returning {'name', 'tags', 'similar'} for an artist.
+    Memory is checked first, then SQLite; only missing or stale fields hit the API.
+    `tags` are lower-cased top tags ordered by weight, `similar` is None unless requested.
+    """
+    key = normalize_artist_key(artist_name)
+    if not key:
+        return None
+
+    stored = None
+    profile = _artist_cache.get(key)
+    # Solo re-cachear en memoria si el perfil viene de SQLite o de la API (un hit no renueva el TTL)
+    changed = profile is None
+    if profile is None:
+        profile = {'name': artist_name, 'tags': None, 'similar': None}
+        stored = load_lastfm_artist(key)
+        if stored:
+            profile['name'] = stored['name']
+            if _is_fresh(stored['tags_fetched_at']):
+                profile['tags'] = stored['tags']
+            if _is_fresh(stored['similar_fetched_at']):
+                profile['similar'] = stored['similar']
+
+    want_tags = profile['tags'] is None
+    want_similar = include_similar and profile['similar'] is None
+    if want_tags or want_similar:
+        fetched = None
+        if lastfm_client and is_available(LASTFM):
+            fetched = _fetch_artist(lastfm_client, artist_name, want_tags, want_similar)
+        if fetched is None:
+            # Provider down or failing: fall back to stale cached data if we have it
+            return _stale_profile(profile, stored, want_tags, want_similar)
+        profile = {**profile, **fetched}
+        save_lastfm_artist(key, profile['name'], tags=fetched.get('tags'), similar=fetched.get('similar'))
+        changed = True
+
+    if changed:
+        _artist_cache.set(key, profile)
+    return profile
+
+def _stale_profile(profile: Dict, stored: Optional[Dict], want_tags: bool, want_similar: bool) -> Optional[Dict]:
+    """Fill missing fields from expired cache entries (not re-cached in memory)"""
+    if not stored:
+        return None
+    stale = dict(profile)
+    if want_tags:
+        stale['tags'] = stored['tags']
+    if want_similar:
+        stale['similar'] = stored['similar']
+    if stale['tags'] is None or (want_similar and stale['similar'] is None):
+        return None
+    return stale
+
+def get_artist_top_tags(lastfm_client, artist_name: str, limit: int = 20) -> List[str]:
+    """Return an artist's top Last.fm tags (lower-cased) from the cache"""
+    profile = get_artist_profile(lastfm_client, artist_name)
+    if not profile:
+        return []
+    return profile['tags'][:limit]
+
+def get_lastfm_cache_stats() -> Dict:
+    """Return hit/miss counters of the in-memory Last.fm cache"""
+    return _artist_cache.stats()
+
+@traced()
+def fetch_related_artists_lastfm(lastfm_client, artist_name: str) -> Optional[List[str]]:
+    """Find related artists using Last.fm API; None when the lookup failed (not just empty)"""
     from services.spotify_service import clean_artist_name
     artist_name = clean_artist_name(artist_name)
-    
+
     try:
         if not lastfm_client:
-            return []
-        
-        artist = lastfm_client.get_artist(artist_name)
-        similar = artist.get_similar(limit=15)
-        return [a.item.get_name() for a in similar]
+            return None
+
+        profile = get_artist_profile(lastfm_client, artist_name, include_similar=True)
+        return list(profile['similar']) if profile else None
     except Exception as e:
         print(f"Error getting related artists from Last.fm: {e}")
-        return []
\ No newline at end of file
+        return None
+
+def get_related_artists_lastfm(lastfm_client, artist_name: str) -> List[str]:
+    """Find related artists using Last.fm API"""
+    return fetch_related_artists_lastfm(lastfm_client, artist_name) or []
@@ -0,0 +1,169 @@
+# File: metalwall_app/services/link_health.py
+# ===========================
+# LINK HEALTH CHECKER
+# ===========================
+
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from config import (
+    LINK_HEALTH, LINK_HEALTH_MAX_AGE, LINK_HEALTH_BATCH, LINK_HEALTH_CONCURRENCY,
+    LINK_HEALTH_PER_HOST, LINK_HEALTH_HOST_INTERVAL
+)
+from database.operations import load_link_health_candidates, save_link_health, update_album_cover
+from services.circuit_breaker import CircuitOpenError
+from services.http_client import GONE_STATUSES, HostLimiter, get_session
+from services.metadata_extractor import extract_metadata
+from utils.background import run_in_background
+
+LINK_HEALTH_JOB = "link_health_check"
+
+# Servers that don't implement HEAD
+_NO_HEAD_STATUSES = {405, 501}
+
+def _host_unresolvable(error: Exception) -> bool:
+    """Whether a request failed because the host name no longer resolves (a dead domain)"""
+    # requests wraps urllib3 errors, which wrap the socket error: walk the whole chain
+    pending, seen = [error], set()
+    while pending:
+        current = pending.pop()
+        if not isinstance(current, BaseException) or id(current) in seen:
+            continue
+        seen.add(id(current))
+        if isinstance(current, socket.gaierror) or type(current).__name__ == 'NameResolutionError':
+            return True
+        pending.extend([current.__cause__, current.__context__, getattr(current, 'reason', None), *current.args])
+    return False
+
+def check_link(url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> Dict:
+    """
+    Conditional HEAD (falling back to a streamed GET that is closed unread).
+    Returns {'status', 'ok', 'changed', 'etag', 'last_modified'}; status 0 means a network error.
+    ok is False only when the link is gone (404/410 or a host that no longer resolves);
+    bot walls, throttling, server errors and timeouts say nothing about it and give None.
+    """
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    # Own bucket and per-host breakers: a big batch must not eat the budget of interactive posting
+    session = get_session(LINK_HEALTH)
+    try:
+        response = session.head(url, headers=headers, timeout=10, allow_redirects=True)
+        if response.status_code in _NO_HEAD_STATUSES:
+            response = session.get(url, headers=headers, timeout=10, allow_redirects=True, stream=True)
+            response.close()
+    except CircuitOpenError:
+        # Says nothing about this link; the caller skips the album until the next run
+        raise
+    except Exception as e:
+        return {'status': 0, 'ok': False if _host_unresolvable(e) else None, 'changed': False, 'etag': etag,
+                'last_modified': last_modified, 'error': str(e)}
+
+    if response.status_code == 304:
+        return {'status': 304, 'ok': True, 'changed': False, 'etag': etag, 'last_modified': last_modified}
+    if response.status_code >= 400:
+        gone = response.status_code in GONE_STATUSES
+        # An error page's validators are not the page's: keep the stored ones
+        return {'status': response.status_code, 'ok': False if gone else None, 'changed': False,
+                'etag': etag, 'last_modified': last_modified,
+                'error': None if gone else f"HTTP {response.status_code}"}
+    new_etag = response.headers.get('ETag')
+    new_last_modified = response.headers.get('Last-Modified')
+    return {
+        'status': response.status_code,
+        'ok': True,
+        # Without validators we can't tell, so only report a change we can prove
+        'changed': bool((etag and new_etag and new_etag != etag) or
+                        (last_modified and new_last_modified and new_last_modified != last_modified)),
+        'etag': new_etag,
+        'last_modified': new_last_modified
+    }
+
+def _check_album(album: Dict, limiter: HostLimiter) -> Dict:
+    """Check an album's page and cover; re-extract metadata when the cover is missing or broken"""
+    with limiter.limit(album['url']):
+        page = check_link(album['url'], album['url_etag'], album['url_last_modified'])
+
+    cover: Optional[Dict] = None
+    if album['cover_url']:
+        with limiter.limit(album['cover_url']):
+            cover = check_link(album['cover_url'], album['cover_etag'], album['cover_last_modified'])
+
+    url_status, url_ok = _verdict(page, album['url_status'], album['url_ok'])
+    cover_status, cover_ok = _verdict(cover, album['cover_status'], album['cover_ok'])
+    result = {
+        'album_id': album['album_id'],
+        'url_status': url_status,
+        'url_ok': url_ok,
+        'url_etag': page['etag'],
+        'url_last_modified': page['last_modified'],
+        'cover_status': cover_status,
+        'cover_ok': cover_ok,
+        'cover_etag': cover['etag'] if cover else None,
+        'cover_last_modified': cover['last_modified'] if cover else None,
+        'unknown': page['ok'] is None or (cover is not None and cover['ok'] is None),
+        'error': page.get('error') or (cover or {}).get('error')
+    }
+
+    # A live page whose cover is gone (or changed) may carry a new cover: re-extract it
+    cover_bad = cover is None or cover['ok'] is False
+    if page['ok'] and (cover_bad or page['changed']):
+        refreshed = _refresh_cover(album)
+        if refreshed:
+            result.update(refreshed)
+    return result
+
+def _verdict(check: Optional[Dict], previous_status: Optional[int],
+             previous_ok: Optional[bool]) -> Tuple[Optional[int], Optional[bool]]:
+    """(status, ok) to store: an inconclusive check keeps the previous verdict"""
+    if check is None:
+        return None, None
+    if check['ok'] is None:
+        return previous_status, previous_ok
+    return check['status'], check['ok']
+
+def _refresh_cover(album: Dict) -> Optional[Dict]:
+    """Re-extract an album's metadata bypassing the cache and store a new cover URL"""
+    metadata = extract_metadata(album['url'], use_cache=False)
+    new_cover = metadata and metadata.get('cover_url')
+    if not new_cover or new_cover == album['cover_url']:
+        return None
+    if not update_album_cover(album['album_id'], new_cover):
+        return None
+    # The new cover hasn't been validated yet; the next run checks it
+    return {'refreshed': True, 'cover_status': None, 'cover_ok': None,
+            'cover_etag': None, 'cover_last_modified': None}
+
+def run_link_health_check(max_age: int = LINK_HEALTH_MAX_AGE, limit: int = LINK_HEALTH_BATCH,
+                          concurrency: int = LINK_HEALTH_CONCURRENCY) -> Dict:
+    """Check the albums least recently checked (up to `limit`) and store the results"""
+    albums = load_link_health_candidates(datetime.now() - timedelta(seconds=max_age), limit)
+    limiter = HostLimiter(LINK_HEALTH_PER_HOST, LINK_HEALTH_HOST_INTERVAL)
+    def check(album: Dict) -> Optional[Dict]:
+        try:
+            return _check_album(album, limiter)
+        except CircuitOpenError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        results = [r for r in executor.map(check, albums) if r is not None]
+    save_link_health(results)
+    return _summarize(results)
+
+def _summarize(results) -> Dict:
+    """Counts for the job result shown in the admin page"""
+    return {
+        'checked': len(results),
+        'broken_urls': sum(1 for r in results if r['url_ok'] is False),
+        'broken_covers': sum(1 for r in results if r['cover_ok'] is False),
+        'inconclusive': sum(1 for r in results if r['unknown']),
+        'refreshed': sum(1 for r in results if r.get('refreshed'))
+    }
+
+def schedule_link_health_check() -> bool:
+    """Run the link health check in the background (no-op if already running)"""
+    return run_in_background(LINK_HEALTH_JOB, run_link_health_check)
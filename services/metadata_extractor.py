@@ -3,11 +3,30 @@
 # METADATA EXTRACTION SERVICE
 # ===========================
 
+import json
 import re
-import requests
-from bs4 import BeautifulSoup
-from typing import Optional, Dict
-from config import PLATFORMS
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from bs4 import BeautifulSoup, SoupStrainer
+from typing import Callable, Optional, Dict, List, Tuple
+from config import PLATFORMS, WEB, URL_METADATA_TTL, URL_METADATA_NEGATIVE_TTL
+from database.operations import load_url_metadata, save_url_metadata
+from services.http_client import check_status, fetch_head_html, http_get
+from utils.cache import record_cache_lookup
+from utils.helpers import canonicalize_url
+from utils.tracing import span, traced
+
+# lxml is much faster than the pure-Python parser; fall back when it's missing
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Only <meta> and <script> elements are ever turned into tags
+_META_STRAINER = SoupStrainer(['meta', 'script'])
 
 def detect_platform(url: str) -> str:
     """Detect platform based on domain"""
@@ -50,6 +69,93 @@ def extract_album(metadata: Dict, platform: str) -> str:
     
     return title or 'Unknown Album'
 
+def _jsonld_items(data) -> List[Dict]:
+    """Flatten a JSON-LD document (lists and @graph containers) into its nodes"""
+    if isinstance(data, list):
+        return [item for entry in data for item in _jsonld_items(entry)]
+    if not isinstance(data, dict):
+        return []
+    if '@graph' in data:
+        return _jsonld_items(data['@graph'])
+    return [data]
+
+def _jsonld_name(value) -> str:
+    """Name of a JSON-LD value that may be a string, a node or a list of nodes"""
+    if isinstance(value, list):
+        return ', '.join(name for name in (_jsonld_name(v) for v in value) if name)
+    if isinstance(value, dict):
+        return (value.get('name') or '').strip()
+    return (value or '').strip() if isinstance(value, str) else ''
+
+def _jsonld_image(value) -> str:
+    """URL of a JSON-LD image (string, ImageObject or list of either)"""
+    if isinstance(value, list):
+        return _jsonld_image(value[0]) if value else ''
+    if isinstance(value, dict):
+        return value.get('url') or value.get('contentUrl') or ''
+    return value if isinstance(value, str) else ''
+
+def parse_jsonld_album(raw: str) -> Optional[Dict]:
+    """Read {'album', 'artist', 'image'} from a JSON-LD MusicAlbum, if the document has one"""
+    try:
+        data = json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+    for item in _jsonld_items(data):
+        types = item.get('@type')
+        types = types if isinstance(types, list) else [types]
+        if 'MusicAlbum' not in types:
+            continue
+        album = _jsonld_name(item.get('name'))
+        if not album:
+            continue
+        return {
+            'album': album,
+            'artist': _jsonld_name(item.get('byArtist')),
+            'image': _jsonld_image(item.get('image'))
+        }
+    return None
+
+def parse_meta_tags(html: str) -> Dict:
+    """
+    Parse only the <meta> and JSON-LD <script> elements of a page.
+    Returns og_title / og_description / og_image (Open Graph first, then
+    name-based fallbacks) and, when present, a 'jsonld' album dict.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=_META_STRAINER)
+    metadata = {}
+    fallback = {}
+    
+    for tag in soup.find_all(['meta', 'script']):
+        if tag.name == 'script':
+            if 'jsonld' not in metadata and (tag.get('type') or '').lower() == 'application/ld+json':
+                album = parse_jsonld_album(tag.string or tag.get_text())
+                if album:
+                    metadata['jsonld'] = album
+            continue
+        
+        content = tag.get('content', '')
+        prop = tag.get('property', '')
+        if prop == 'og:title':
+            metadata['og_title'] = content
+        elif prop == 'og:description':
+            metadata['og_description'] = content
+        elif prop == 'og:image':
+            metadata['og_image'] = content
+        
+        # Fallback: look for meta name
+        name = tag.get('name', '').lower()
+        if name == 'description':
+            fallback['og_description'] = content
+        elif name == 'twitter:title':
+            fallback['og_title'] = content
+        elif name == 'twitter:image':
+            fallback['og_image'] = content
+    
+    if not metadata.get('og_title'):
+        metadata.update(fallback)
+    return metadata
+
 def extract_og_metadata(url: str) -> Optional[Dict]:
     """
     UNIVERSAL extractor using Open Graph metadata
@@ -57,51 +163,310 @@ def extract_og_metadata(url: str) -> Optional[Dict]:
     Similar to how WhatsApp/Discord/Twitter does it
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, timeout=8, headers=headers)
-        response.encoding = 'utf-8'
-        
-        if response.status_code != 200:
+        # Only <head> is needed: stream the page over the pooled web session and stop there
+        html = fetch_head_html(url, timeout=8)
+        if html is None:
             return None
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        metadata = {}
-        
-        # Look for Open Graph meta tags
-        for meta in soup.find_all('meta', property=True):
-            prop = meta.get('property', '')
-            content = meta.get('content', '')
-            if prop == 'og:title':
-                metadata['og_title'] = content
-            elif prop == 'og:description':
-                metadata['og_description'] = content
-            elif prop == 'og:image':
-                metadata['og_image'] = content
+        metadata = parse_meta_tags(html)
+        album = metadata.get('jsonld')
         
-        # Fallback: look for meta name
-        if not metadata.get('og_title'):
-            for meta in soup.find_all('meta'):
-                name = meta.get('name', '')
-                content = meta.get('content', '')
-                if name.lower() == 'description':
-                    metadata['og_description'] = content
-                elif name.lower() == 'twitter:title':
-                    metadata['og_title'] = content
-                elif name.lower() == 'twitter:image':
-                    metadata['og_image'] = content
-        
-        if not metadata.get('og_title'):
+        if not metadata.get('og_title') and not album:
             return None
         
         platform = detect_platform(url)
+        # JSON-LD has clean artist/album fields; the title heuristics are the fallback
         return {
-            'artist': extract_artist(metadata, platform),
-            'album_name': extract_album(metadata, platform),
-            'cover_url': metadata.get('og_image', ''),
+            'artist': (album and album['artist']) or extract_artist(metadata, platform),
+            'album_name': (album and album['album']) or extract_album(metadata, platform),
+            'cover_url': metadata.get('og_image') or (album and album['image']) or '',
             'platform': platform
         }
     except Exception as e:
         print(f"Error extracting metadata from {url}: {e}")
-        return None
\ No newline at end of file
+        return None
+
+# ============ PER-PLATFORM EXTRACTOR REGISTRY ============
+
+API, OEMBED, JSONLD, OG = 'api', 'oembed', 'jsonld', 'og'
+
+@dataclass
+class PlatformExtractor:
+    """How to get album metadata for one platform: sources are tried in order"""
+    platform: str
+    sources: Tuple[str, ...] = (JSONLD, OG)
+    id_pattern: Optional[str] = None
+    oembed_endpoint: Optional[str] = None
+
+    def parse_id(self, url: str) -> Optional[str]:
+        """Item ID from a URL (None when the URL isn't an album link we understand)"""
+        if not self.id_pattern:
+            return None
+        match = re.search(self.id_pattern, url)
+        return match.group(1) if match else None
+
+_EXTRACTOR_OVERRIDES = {
+    'Spotify': PlatformExtractor(
+        'Spotify', sources=(API, OG),
+        id_pattern=r'open\.spotify\.com/(?:intl-[\w-]+/)?album/([A-Za-z0-9]{22})'
+    ),
+    'Bandcamp': PlatformExtractor(
+        'Bandcamp', id_pattern=r'([\w-]+\.bandcamp\.com/album/[\w-]+)'
+    ),
+    'Tidal': PlatformExtractor(
+        'Tidal', sources=(OEMBED, OG), oembed_endpoint='https://oembed.tidal.com/',
+        id_pattern=r'tidal\.com/(?:browse/)?album/(\d+)'
+    ),
+    'Apple Music': PlatformExtractor(
+        'Apple Music', sources=(API, JSONLD, OG),
+        id_pattern=r'music\.apple\.com/(?:[a-z]{2}/)?album/(?:[^/?#]+/)?(\d+)'
+    ),
+    'Deezer': PlatformExtractor(
+        'Deezer', sources=(API, JSONLD, OG),
+        id_pattern=r'deezer\.com/(?:[a-z]{2}/)?album/(\d+)'
+    ),
+    'YouTube Music': PlatformExtractor(
+        'YouTube Music', sources=(OEMBED, OG), oembed_endpoint='https://www.youtube.com/oembed',
+        id_pattern=r'youtube\.com/(?:playlist\?(?:[^#]*&)?list=|browse/)([\w-]+)'
+    ),
+    'SoundCloud': PlatformExtractor(
+        'SoundCloud', sources=(OEMBED, OG), oembed_endpoint='https://soundcloud.com/oembed',
+        id_pattern=r'soundcloud\.com/([\w-]+/sets/[\w-]+)'
+    ),
+    'Genius': PlatformExtractor(
+        'Genius', id_pattern=r'genius\.com/albums/([\w-]+/[\w-]+)'
+    ),
+    'Last.fm': PlatformExtractor(
+        'Last.fm', id_pattern=r'last\.fm/(?:[a-z]{2}/)?music/([^/?#]+/[^/?#_][^/?#]*)'
+    ),
+    'Pandora': PlatformExtractor(
+        'Pandora', id_pattern=r'pandora\.com/artist/[^/?#]+/[^/?#]+/(AL\w+)'
+    ),
+    'Amazon Music': PlatformExtractor(
+        'Amazon Music', id_pattern=r'amazon\.[\w.]+/albums/([A-Z0-9]{10})'
+    ),
+    'JioSaavn': PlatformExtractor(
+        'JioSaavn', id_pattern=r'jiosaavn\.com/album/[^/?#]+/([\w-]+)'
+    ),
+}
+
+# One extractor per platform in config.PLATFORMS, plus the generic one for 'Other'
+EXTRACTORS: Dict[str, PlatformExtractor] = {
+    name: _EXTRACTOR_OVERRIDES.get(name, PlatformExtractor(name))
+    for name in list(PLATFORMS.values()) + ['Other']
+}
+
+_timings: Dict[Tuple[str, str], Dict] = {}
+_timings_lock = threading.Lock()
+
+def _record_timing(platform: str, source: str, elapsed: float, hit: bool):
+    with _timings_lock:
+        stats = _timings.setdefault((platform, source), {'calls': 0, 'hits': 0, 'total': 0.0, 'max': 0.0})
+        stats['calls'] += 1
+        stats['hits'] += 1 if hit else 0
+        stats['total'] += elapsed
+        stats['max'] = max(stats['max'], elapsed)
+
+def get_extractor_stats() -> List[Dict]:
+    """Calls, success rate and latency per (platform, source)"""
+    with _timings_lock:
+        snapshot = {key: dict(stats) for key, stats in _timings.items()}
+    return [
+        {
+            'platform': platform,
+            'source': source,
+            'calls': stats['calls'],
+            'hit_rate': stats['hits'] / stats['calls'],
+            'avg_ms': stats['total'] / stats['calls'] * 1000,
+            'max_ms': stats['max'] * 1000
+        }
+        for (platform, source), stats in sorted(snapshot.items())
+    ]
+
+def _spotify_album(album_id: str) -> Optional[Dict]:
+    """Album metadata straight from the Spotify API (one small call, no scraping)"""
+    from services.spotify_service import get_spotify_client
+    client = get_spotify_client()
+    if not client:
+        return None
+    album = client.album(album_id)
+    if not album or not album.get('artists'):
+        return None
+    return {
+        'artist': album['artists'][0]['name'],
+        'album_name': album['name'],
+        'cover_url': album['images'][0]['url'] if album.get('images') else ''
+    }
+
+def _deezer_album(album_id: str) -> Optional[Dict]:
+    """Album metadata from Deezer's public API (no key needed)"""
+    response = http_get(WEB, f"https://api.deezer.com/album/{album_id}", timeout=8)
+    if not check_status(response):
+        return None
+    album = response.json()
+    # Deezer answers unknown IDs with 200 and an error payload
+    if 'error' in album or not album.get('artist'):
+        return None
+    return {
+        'artist': album['artist']['name'],
+        'album_name': album['title'],
+        'cover_url': album.get('cover_xl') or album.get('cover_big') or ''
+    }
+
+def _apple_music_album(album_id: str) -> Optional[Dict]:
+    """Album metadata from the iTunes lookup API (no key needed)"""
+    response = http_get(WEB, 'https://itunes.apple.com/lookup',
+                        params={'id': album_id, 'entity': 'album'}, timeout=8)
+    if not check_status(response):
+        return None
+    album = next((r for r in response.json().get('results', []) if r.get('collectionName')), None)
+    if not album:
+        return None
+    # Artwork URLs embed their size: ask for a larger square than the 100px default
+    cover = album.get('artworkUrl100', '').replace('100x100bb', '600x600bb')
+    return {'artist': album['artistName'], 'album_name': album['collectionName'], 'cover_url': cover}
+
+# Platform -> API lookup by item ID
+_API_FETCHERS: Dict[str, Callable[[str], Optional[Dict]]] = {
+    'Spotify': _spotify_album,
+    'Deezer': _deezer_album,
+    'Apple Music': _apple_music_album
+}
+
+def _from_api(extractor: PlatformExtractor, url: str, page: Dict) -> Optional[Dict]:
+    fetcher = _API_FETCHERS.get(extractor.platform)
+    item_id = extractor.parse_id(url)
+    if not fetcher or not item_id:
+        return None
+    return fetcher(item_id)
+
+def _from_oembed(extractor: PlatformExtractor, url: str, page: Dict) -> Optional[Dict]:
+    if not extractor.oembed_endpoint:
+        return None
+    response = http_get(WEB, extractor.oembed_endpoint, params={'url': url, 'format': 'json'}, timeout=8)
+    if not check_status(response):
+        return None
+    data = response.json()
+    title = data.get('title', '')
+    if not title:
+        return None
+    author = re.sub(r'\s+-\s+Topic$', '', data.get('author_name', '')).strip()
+    if author:
+        # Drop the author from "Album by Author" / "Author - Album" titles
+        album = re.sub(rf'\s+by\s+{re.escape(author)}$', '', title, flags=re.IGNORECASE)
+        album = re.sub(rf'^{re.escape(author)}\s+-\s+', '', album, flags=re.IGNORECASE)
+        return {'artist': author, 'album_name': album.strip() or title,
+                'cover_url': data.get('thumbnail_url', '')}
+    
+    # Otherwise the title follows the same shapes as og:title
+    metadata = {'og_title': title, 'og_description': ''}
+    artist = extract_artist(metadata, extractor.platform)
+    if artist == 'Unknown Artist':
+        return None
+    return {'artist': artist, 'album_name': extract_album(metadata, extractor.platform),
+            'cover_url': data.get('thumbnail_url', '')}
+
+def _page_meta(url: str, page: Dict) -> Optional[Dict]:
+    """Fetch and parse the page once per extraction, shared by the JSON-LD and OG sources"""
+    if 'meta' not in page:
+        try:
+            html = fetch_head_html(url, timeout=8)
+        except Exception:
+            # Don't fetch again for the next source: the first one reports the error
+            page['meta'] = None
+            raise
+        page['meta'] = parse_meta_tags(html) if html is not None else None
+    return page['meta']
+
+def _from_jsonld(extractor: PlatformExtractor, url: str, page: Dict) -> Optional[Dict]:
+    metadata = _page_meta(url, page)
+    album = metadata and metadata.get('jsonld')
+    if not album or not album['artist']:
+        return None
+    return {
+        'artist': album['artist'],
+        'album_name': album['album'],
+        'cover_url': metadata.get('og_image') or album['image'] or ''
+    }
+
+def _from_og(extractor: PlatformExtractor, url: str, page: Dict) -> Optional[Dict]:
+    metadata = _page_meta(url, page)
+    if not metadata or not metadata.get('og_title'):
+        return None
+    return {
+        'artist': extract_artist(metadata, extractor.platform),
+        'album_name': extract_album(metadata, extractor.platform),
+        'cover_url': metadata.get('og_image', '')
+    }
+
+_SOURCES = {API: _from_api, OEMBED: _from_oembed, JSONLD: _from_jsonld, OG: _from_og}
+
+def _extract_uncached(url: str) -> Tuple[Optional[Dict], bool]:
+    """Run the platform's sources in order; returns (metadata, whether any source errored)"""
+    platform = detect_platform(url)
+    extractor = EXTRACTORS.get(platform, EXTRACTORS['Other'])
+    page = {}
+    errored = False
+    for source in extractor.sources:
+        started = time.monotonic()
+        with span(f"extract.{source}", platform=platform) as attributes:
+            try:
+                result = _SOURCES[source](extractor, url, page)
+            except Exception as e:
+                print(f"Error extracting metadata from {url} via {source}: {e}")
+                result, errored = None, True
+                attributes['error'] = str(e)
+            attributes['hit'] = result is not None
+        _record_timing(platform, source, time.monotonic() - started, result is not None)
+        if result:
+            return {**result, 'platform': platform}, errored
+    return None, errored
+
+# ============ URL METADATA CACHE ============
+
+def get_cached_url_metadata(url: str) -> Tuple[bool, Optional[Dict]]:
+    """
+    Cached metadata for a URL: (known, metadata).
+    known is False when the URL was never extracted or the entry expired;
+    a known failure is (True, None).
+    """
+    cached = load_url_metadata(canonicalize_url(url))
+    if not cached:
+        return False, None
+    ttl = URL_METADATA_TTL if cached['found'] else URL_METADATA_NEGATIVE_TTL
+    if datetime.now() - cached['fetched_at'] >= timedelta(seconds=ttl):
+        return False, None
+    if not cached['found']:
+        return True, None
+    return True, {key: cached[key] for key in ('artist', 'album_name', 'cover_url', 'platform')}
+
+def seed_url_metadata(url: str, artist: str, album_name: str, cover_url: Optional[str] = None,
+                      platform: Optional[str] = None) -> bool:
+    """Store metadata a caller already holds (e.g. a discovery) so posting the URL needs no fetch"""
+    if not url or not artist or not album_name:
+        return False
+    return save_url_metadata(canonicalize_url(url), {
+        'artist': artist,
+        'album_name': album_name,
+        'cover_url': cover_url or '',
+        'platform': platform or detect_platform(url)
+    })
+
+@traced()
+def extract_metadata(url: str, use_cache: bool = True) -> Optional[Dict]:
+    """
+    Extract {'artist', 'album_name', 'cover_url', 'platform'} for a URL.
+    The url_metadata cache is checked first (unless use_cache is False); on a miss
+    the platform's extractor tries its sources in priority order until one answers.
+    """
+    if use_cache:
+        known, metadata = get_cached_url_metadata(url)
+        record_cache_lookup('url_metadata', known)
+        if known:
+            return metadata
+    
+    metadata, errored = _extract_uncached(url)
+    # Network errors, throttling and 5xx are not cached: only a 404/410 or a page without metadata
+    if metadata or not errored:
+        save_url_metadata(canonicalize_url(url), metadata)
+    return metadata
@@ -4,13 +4,35 @@
 # ===========================
 
 import streamlit as st
+import contextvars
 import random
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from typing import Optional, Dict, Tuple, List
+from config import DISCOVERY_CONCURRENCY, DISCOVERY_DEADLINE, SPOTIFY
 from database.operations import load_albums, save_discovery
-from services.spotify_service import get_spotify_client, get_related_artists_spotify, get_random_album_by_artist
-from services.lastfm_service import get_lastfm_client, get_related_artists_lastfm
-from services.bandcamp_service import bandcamp_search
+from services.spotify_service import get_spotify_client, get_random_album_by_artist, prefetch_artist_genres
+from services.lastfm_service import get_lastfm_client, get_artist_profile, get_artist_top_tags
+from services.artist_graph import get_related_artists
+from services.circuit_breaker import deadline_scope, is_available
+from services.discovery_pool import pool_key, take_discovery, schedule_refill
+from services.bandcamp_service import (
+    get_cached_bandcamp, schedule_bandcamp_lookup, is_bandcamp_lookup_running
+)
+from services.genre_classifier import (
+    get_known_verdict, record_verdict, filter_known_non_metal,
+    is_metal_on_spotify, is_suspicious_album, is_discovery_tag
+)
+from utils.metrics import counter, histogram
+from utils.tracing import set_attribute, span, start_trace, traced
+
+DISCOVERIES = counter("metalwall_discoveries_total", "Discoveries by source (pipeline/pool) and result",
+                      ["source", "result"])
+DISCOVERY_SECONDS = histogram("metalwall_discovery_seconds", "Discovery pipeline duration", ["source"])
+DISCOVERY_ATTEMPTS = histogram("metalwall_discovery_attempts", "Candidates evaluated per successful discovery",
+                               buckets=(1, 2, 3, 4, 5, 7, 10, 15, 20))
 
 def clean_strictly(text: str) -> str:
     """Limpia el texto para comparaciones de identidad exactas."""
@@ -18,40 +40,34 @@ def clean_strictly(text: str) -> str:
     # Convertir a minúsculas y eliminar todo lo que no sea letras o números
     return re.sub(r'[^a-z0-9]', '', text.lower())
 
+@traced()
 def is_metal_artist(lastfm_client, artist_name: str) -> bool:
     """Verifica si un artista es metal con filtrado de etiquetas y protección de identidad."""
+    # Veredicto ya almacenado en el índice de géneros: sin llamadas a la API
+    known = get_known_verdict(artist_name)
+    if known is not None:
+        return known['is_metal']
+    
     if not lastfm_client:
         return False
     try:
         # Last.fm suele "autocorregir" nombres (ej. Taake -> Taaken). 
-        # Obtenemos el objeto sin permitir redirecciones automáticas si es posible,
-        # o verificamos el nombre final.
-        artist = lastfm_client.get_artist(artist_name)
+        # Obtenemos el perfil cacheado (una sola consulta por artista)
+        # y verificamos el nombre final.
+        profile = get_artist_profile(lastfm_client, artist_name)
+        if not profile:
+            return False
         
         # VALIDACIÓN DE IDENTIDAD EN LAST.FM
-        if clean_strictly(artist.get_name()) != clean_strictly(artist_name):
+        if clean_strictly(profile['name']) != clean_strictly(artist_name):
             return False
 
-        tags = artist.get_top_tags(limit=20)
-        tag_names = [tag.item.get_name().lower() for tag in tags]
-        
-        metal_keywords = [
-            'metal', 'grindcore', 'goregrind', 'deathcore', 'sludge', 
-            'thrash', 'death metal', 'black metal', 'doom metal', 'stoner'
-        ]
-        
-        # Bloqueo total de géneros que causan falsos positivos
-        excluded_genres = ['pop', 'jazz', 'rnb', 'house', 'techno', 'musical', 'soundtrack', 'broadway', 'easy listening']
-        
-        has_metal_tag = any(any(k in tag for k in metal_keywords) for tag in tag_names)
-        has_pop_tag = any(any(e == tag for e in excluded_genres) for tag in tag_names)
-        
-        # Un artista es válido si tiene tags de metal y no está "contaminado" por géneros excluidos
-        # (a menos que el tag excluido forme parte de una etiqueta de metal, ej. "heavy metal pop" - poco común pero posible)
-        return has_metal_tag and not (has_pop_tag and not 'metal' in "".join(tag_names))
+        # Clasificación con el matcher precompilado; el veredicto queda guardado
+        return record_verdict(artist_name, profile['tags'])
     except:
         return False
 
+@traced()
 def validate_identity_and_genre(lastfm_client, result_data: Dict, target_artist: str) -> bool:
     """
     Verifica que el resultado sea del artista buscado y pertenezca al género.
@@ -70,34 +86,129 @@ def validate_identity_and_genre(lastfm_client, result_data: Dict, target_artist:
 
     # 2. VERIFICACIÓN DE ÁLBUM SOSPECHOSO
     # Si el álbum contiene palabras clave de musicales o bandas sonoras, lo rechazamos.
-    album_name = result_data.get('album', '').lower()
-    if any(k in album_name for k in ['musical', 'soundtrack', 'cast recording', 'broadway']):
+    if is_suspicious_album(result_data.get('album', '')):
         return False
 
     # 3. VERIFICACIÓN DE GÉNERO
-    spotify_genres = [g.lower() for g in result_data.get('genres', [])]
+    # Si Spotify tiene géneros de metal y ninguno no deseado, es válido
+    if is_metal_on_spotify(result_data.get('genres', [])):
+        return True
+        
+    # En caso de duda (o falta de géneros en Spotify), recurrimos al índice / Last.fm
+    return is_metal_artist(lastfm_client, target_artist)
+
+@traced()
+def evaluate_candidate(spotify_client, lastfm_client, artist_name: str,
+                       cancelled: Optional[threading.Event] = None) -> Optional[Dict]:
+    """Busca un álbum aleatorio del candidato y lo devuelve solo si pasa la validación."""
+    set_attribute('artist', artist_name)
+    if not spotify_client or (cancelled is not None and cancelled.is_set()):
+        return None
     
-    # Si Spotify tiene géneros, buscamos keywords de metal
-    is_metal_on_spotify = any('metal' in g or 'grindcore' in g or 'death' in g or 'doom' in g for g in spotify_genres)
+    # Obtenemos un álbum aleatorio del artista seleccionado
+    album_data = get_random_album_by_artist(spotify_client, artist_name)
+    if not album_data or (cancelled is not None and cancelled.is_set()):
+        return None
     
-    # Si Spotify explícitamente dice que es un género no deseado
-    is_non_metal = any(any(x in g for x in ['pop', 'hip hop', 'house', 'musical']) for g in spotify_genres)
+    # --- VALIDACIÓN ESTRICTA ---
+    if validate_identity_and_genre(lastfm_client, album_data, artist_name):
+        set_attribute('valid', True)
+        return album_data
+    return None
 
-    if is_metal_on_spotify and not is_non_metal:
+def _evaluate_candidates_sequential(spotify_client, lastfm_client, candidates: List[str],
+                                    deadline: float) -> Tuple[Optional[str], Optional[Dict], int]:
+    """Evalúa los candidatos uno a uno hasta encontrar uno válido o agotar el plazo."""
+    attempts = 0
+    for artist_name in candidates:
+        if time.monotonic() >= deadline:
+            break
+        attempts += 1
+        album_data = evaluate_candidate(spotify_client, lastfm_client, artist_name)
+        if album_data:
+            return artist_name, album_data, attempts
+    return None, None, attempts
+
+def _evaluate_candidates_parallel(spotify_client, lastfm_client, candidates: List[str],
+                                  concurrency: int, deadline: float) -> Tuple[Optional[str], Optional[Dict], int]:
+    """
+    Evalúa hasta `concurrency` candidatos a la vez en un pool de hilos.
+    Gana el primero válido; el resto se cancela y nunca se espera más allá del plazo.
+    """
+    cancelled = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="discovery")
+    remaining_candidates = iter(candidates)
+    pending = {}
+    attempts = 0
+    
+    def submit_next() -> bool:
+        artist_name = next(remaining_candidates, None)
+        if artist_name is None:
+            return False
+        # Cada hilo hereda el contexto (plazo del pipeline) del que lo lanza
+        future = executor.submit(contextvars.copy_context().run, evaluate_candidate,
+                                 spotify_client, lastfm_client, artist_name, cancelled)
+        pending[future] = artist_name
         return True
+    
+    try:
+        for _ in range(concurrency):
+            if not submit_next():
+                break
         
-    # En caso de duda (o falta de géneros en Spotify), recurrimos a Last.fm
-    if lastfm_client:
-        return is_metal_artist(lastfm_client, target_artist)
-        
-    return False
+        while pending:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                artist_name = pending.pop(future)
+                attempts += 1
+                album_data = future.result() if future.exception() is None else None
+                if album_data:
+                    return artist_name, album_data, attempts
+                submit_next()
+        return None, None, attempts
+    finally:
+        # Los hilos en curso ven la señal y abandonan; no bloqueamos al usuario esperándolos
+        cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
 
-def discover_random_album(base_artist: Optional[str] = None, base_album_obj: Optional[Dict] = None, 
-                         max_attempts: int = 15) -> Tuple[Optional[Dict], Optional[str]]:
-    """Discovery con validación cruzada entre Spotify y Last.fm."""
+def find_discovery(spotify_client, lastfm_client, base_album_obj: Optional[Dict] = None,
+                   max_attempts: int = 15, concurrency: Optional[int] = None,
+                   deadline_seconds: Optional[float] = None) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Pipeline de discovery con validación cruzada entre Spotify y Last.fm.
+    No depende de la sesión, así que también lo usa el productor del pool en segundo plano.
+    Con concurrency > 1 los candidatos se evalúan en paralelo; deadline_seconds
+    limita la duración total del pipeline (por defecto, DISCOVERY_DEADLINE) y
+    todas las llamadas HTTP del pipeline recortan su timeout a ese plazo.
+    """
+    started = time.perf_counter()
+    with deadline_scope(deadline_seconds or DISCOVERY_DEADLINE) as deadline, \
+            start_trace("discovery", base_artist=(base_album_obj or {}).get('artist')) as attributes:
+        discovery_data, error = _find_discovery(spotify_client, lastfm_client, base_album_obj,
+                                                max_attempts, concurrency, deadline)
+        attributes['found'] = discovery_data is not None
+        if discovery_data:
+            attributes['attempts'] = discovery_data['attempts']
+            result = 'found'
+            DISCOVERY_ATTEMPTS.observe(discovery_data['attempts'])
+        else:
+            attributes['error'] = error
+            result = 'timeout' if time.monotonic() >= deadline else 'failed'
+        DISCOVERIES.inc(source='pipeline', result=result)
+        DISCOVERY_SECONDS.observe(time.perf_counter() - started, source='pipeline')
+        return discovery_data, error
+
+def _find_discovery(spotify_client, lastfm_client, base_album_obj: Optional[Dict],
+                    max_attempts: int, concurrency: Optional[int],
+                    deadline: float) -> Tuple[Optional[Dict], Optional[str]]:
+    """Cuerpo de find_discovery; `deadline` es el instante (monotonic) límite."""
     try:
-        spotify_client = get_spotify_client()
-        lastfm_client = get_lastfm_client()
+        # Sin Spotify no hay candidatos que validar: si el circuito está abierto, salimos ya
+        if spotify_client and not is_available(SPOTIFY):
+            return None, "Spotify is temporarily unavailable. Please try again in a moment."
         
         if base_album_obj is None:
             random_album = get_random_album_from_wall()
@@ -111,84 +222,153 @@ def discover_random_album(base_artist: Optional[str] = None, base_album_obj: Opt
         from services.spotify_service import clean_artist_name
         base_artist_name = clean_artist_name(base_artist_name)
         
-        related_artists = []
-        if spotify_client:
-            related_artists = get_related_artists_spotify(spotify_client, base_artist_name)
+        set_attribute('base_artist', base_artist_name)
         
-        if not related_artists and lastfm_client:
-            related_artists = get_related_artists_lastfm(lastfm_client, base_artist_name)
+        # Grafo precalculado; solo consulta la red si el artista aún no tiene nodo
+        related_artists = get_related_artists(spotify_client, lastfm_client, base_artist_name)
         
         if not related_artists:
             return None, f"No related artists found for {base_artist_name}"
         
-        attempts = 0
-        while attempts < max_attempts:
-            attempts += 1
-            random_artist = random.choice(related_artists)
+        # Descartamos sin coste los artistas ya clasificados como no-metal
+        related_artists = filter_known_non_metal(related_artists)
+        if not related_artists:
+            return None, f"No metal artists related to {base_artist_name}"
+        
+        # Candidatos barajados, sin repetir y sin el artista del que partimos
+        candidates = []
+        seen = {clean_strictly(base_artist_name)}
+        for name in random.sample(related_artists, len(related_artists)):
+            if clean_strictly(name) not in seen:
+                seen.add(clean_strictly(name))
+                candidates.append(name)
+        candidates = candidates[:max_attempts]
+        
+        # Géneros de todos los candidatos con ID conocido en una sola llamada
+        if spotify_client:
+            prefetch_artist_genres(spotify_client, candidates)
+        
+        if concurrency is None:
+            concurrency = DISCOVERY_CONCURRENCY
+        
+        with span("evaluate_candidates", candidates=len(candidates), concurrency=concurrency):
+            if concurrency > 1:
+                random_artist, random_album_data, attempts = _evaluate_candidates_parallel(
+                    spotify_client, lastfm_client, candidates, concurrency, deadline)
+            else:
+                random_artist, random_album_data, attempts = _evaluate_candidates_sequential(
+                    spotify_client, lastfm_client, candidates, deadline)
+        
+        if random_album_data:
+            # Procesamiento de Tags
+            discovery_tags = []
+            if random_album_data.get('genres'):
+                discovery_tags = [g.lower().replace(' ', '') for g in random_album_data['genres'][:3]]
+            
+            try:
+                # Reutiliza los tags ya cacheados durante la validación
+                for t in get_artist_top_tags(lastfm_client, random_album_data["artist"], limit=5):
+                    t_name = t.replace(' ', '')
+                    if is_discovery_tag(t_name):
+                        if t_name not in discovery_tags: discovery_tags.append(t_name)
+            except: pass
             
-            # Evitamos recomendar al mismo artista del que partimos
-            if clean_strictly(random_artist) == clean_strictly(base_artist_name):
-                continue
-
-            random_album_data = None
-            if spotify_client:
-                # Obtenemos un álbum aleatorio del artista seleccionado
-                random_album_data = get_random_album_by_artist(spotify_client, random_artist)
+            discovery_tags.append('randomdiscovery')
             
-            # --- VALIDACIÓN ESTRICTA ---
-            if random_album_data and validate_identity_and_genre(lastfm_client, random_album_data, random_artist):
-                
-                # Procesamiento de Tags
-                discovery_tags = []
-                if random_album_data.get('genres'):
-                    discovery_tags = [g.lower().replace(' ', '') for g in random_album_data['genres'][:3]]
-                
-                try:
-                    lfm_artist = lastfm_client.get_artist(random_album_data["artist"])
-                    tags = lfm_artist.get_top_tags(limit=5)
-                    for t in tags:
-                        t_name = t.item.get_name().lower().replace(' ', '')
-                        if any(k in t_name for k in ['metal', 'death', 'thrash', 'doom', 'grind', 'sludge']):
-                            if t_name not in discovery_tags: discovery_tags.append(t_name)
-                except: pass
-                
-                discovery_tags.append('randomdiscovery')
-                
-                # Búsqueda en Bandcamp
-                bandcamp_result = None
-                try:
-                    bc_res = bandcamp_search(random_album_data["artist"], random_album_data["album"])
-                    if bc_res:
-                        bandcamp_result = {"url": bc_res["url"], "artist": bc_res["artist"], "album": bc_res["album"]}
-                except: pass
-
-                discovery_data = {
-                    "origin": {"album": random_album, "artist": base_artist_name, "album_name": base_album_name},
-                    "discovery": random_album_data,
-                    "bandcamp": bandcamp_result,
-                    "description": f"Based on '{base_album_name}' by {base_artist_name} → Related: {random_album_data['artist']}",
-                    "validation": "✅ Identity and Genre verified",
-                    "tags": discovery_tags
-                }
-                
-                if st.session_state.get('current_user'):
-                    save_discovery(
-                        username=st.session_state.current_user,
-                        base_artist=base_artist_name,
-                        base_album=base_album_name,
-                        discovered_artist=random_album_data["artist"],
-                        discovered_album=random_album_data["album"],
-                        discovered_url=random_album_data["url"],
-                        cover_url=random_album_data.get("image")
-                    )
-                
-                return discovery_data, None
+            discovery_data = {
+                "origin": {"album": random_album, "artist": base_artist_name, "album_name": base_album_name},
+                "discovery": random_album_data,
+                "bandcamp": None,
+                "bandcamp_pending": False,
+                "description": f"Based on '{base_album_name}' by {base_artist_name} → Related: {random_album_data['artist']}",
+                "validation": "✅ Identity and Genre verified",
+                "tags": discovery_tags,
+                "attempts": attempts
+            }
+            # Bandcamp se resuelve en segundo plano, fuera del camino crítico
+            attach_bandcamp(discovery_data)
             
-        return None, f"Could not find a valid metal album after {max_attempts} attempts."
+            return discovery_data, None
+        
+        if time.monotonic() >= deadline:
+            return None, f"Discovery timed out after {attempts} attempts."
+        return None, f"Could not find a valid metal album after {attempts} attempts."
         
     except Exception as e:
         return None, f"Discovery error: {str(e)}"
 
+def attach_bandcamp(discovery_data: Dict) -> bool:
+    """
+    Añade el enlace de Bandcamp si ya está en caché; si no, lanza la búsqueda
+    en segundo plano y marca el discovery como pendiente.
+    Devuelve True si el estado del enlace ha cambiado.
+    """
+    discovery = discovery_data['discovery']
+    known, result = get_cached_bandcamp(discovery['artist'], discovery['album'])
+    if known:
+        changed = discovery_data.get('bandcamp_pending') or discovery_data.get('bandcamp') != result
+        discovery_data['bandcamp'] = result
+        discovery_data['bandcamp_pending'] = False
+        return bool(changed)
+    
+    if discovery_data.get('bandcamp_pending'):
+        # Búsqueda terminada sin respuesta cacheable (error de red): dejamos de esperar
+        if not is_bandcamp_lookup_running(discovery['artist'], discovery['album']):
+            discovery_data['bandcamp_pending'] = False
+            return True
+        return False
+    
+    schedule_bandcamp_lookup(discovery['artist'], discovery['album'])
+    discovery_data['bandcamp_pending'] = True
+    return True
+
+def discover_random_album(base_artist: Optional[str] = None, base_album_obj: Optional[Dict] = None, 
+                         max_attempts: int = 15, concurrency: Optional[int] = None,
+                         deadline_seconds: Optional[float] = None) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Discovery para el usuario actual: sirve del pool precalentado si hay una
+    lista y, si no, ejecuta el pipeline completo. En ambos casos programa el
+    rellenado del pool en segundo plano y guarda el discovery en el historial.
+    """
+    spotify_client = get_spotify_client()
+    lastfm_client = get_lastfm_client()
+    
+    def producer_for(album_obj: Optional[Dict]):
+        return lambda: find_discovery(spotify_client, lastfm_client, album_obj, max_attempts)[0]
+    
+    key = pool_key(base_artist if base_album_obj is not None else None)
+    discovery_data = take_discovery(key)
+    error = None
+    if discovery_data is not None:
+        DISCOVERIES.inc(source='pool', result='found')
+    else:
+        discovery_data, error = find_discovery(spotify_client, lastfm_client, base_album_obj,
+                                               max_attempts, concurrency, deadline_seconds)
+    schedule_refill(key, producer_for(base_album_obj))
+    
+    if not discovery_data:
+        return None, error
+    
+    # Los discoveries del pool pueden tener ya su enlace de Bandcamp resuelto
+    attach_bandcamp(discovery_data)
+    
+    # Precalentamos también "Discover Another" para el artista base mostrado
+    origin = discovery_data['origin']
+    schedule_refill(pool_key(origin['artist']), producer_for(origin['album']))
+    
+    if st.session_state.get('current_user'):
+        save_discovery(
+            username=st.session_state.current_user,
+            base_artist=origin['artist'],
+            base_album=origin['album_name'],
+            discovered_artist=discovery_data['discovery']["artist"],
+            discovered_album=discovery_data['discovery']["album"],
+            discovered_url=discovery_data['discovery']["url"],
+            cover_url=discovery_data['discovery'].get("image")
+        )
+    
+    return discovery_data, None
+
 def get_random_album_from_wall() -> Optional[Dict]:
     """Carga un álbum aleatorio de la base de datos."""
     try:
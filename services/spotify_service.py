@@ -6,8 +6,19 @@
 import streamlit as st
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
+from datetime import datetime, timedelta
 from typing import Optional, Dict, List
 import random
+from config import SPOTIFY, SPOTIFY_API_PREFIX, SPOTIFY_TOKEN_URL, SPOTIFY_ARTIST_TTL, SPOTIFY_NEGATIVE_TTL, SPOTIFY_GENRES_TTL, SPOTIFY_ALBUM_PAGES
+from services.http_client import get_session
+from database.operations import load_spotify_artists, save_spotify_artists, load_spotify_genres, save_spotify_genres
+from utils.cache import TTLCache
+from utils.helpers import normalize_artist_key
+from utils.tracing import traced
+
+# Memory layer in front of the spotify_artists table
+_artist_id_cache = TTLCache(maxsize=4096, ttl=3600, name="spotify_artist_ids")
+_genre_cache = TTLCache(maxsize=4096, ttl=3600, name="spotify_genres")
 
 @st.cache_resource
 def get_spotify_client():
@@ -20,68 +31,204 @@ def get_spotify_client():
             st.warning("⚠️ Spotify API credentials not found.")
             return None
         
-        auth_manager = SpotifyClientCredentials(
-            client_id=client_id,
-            client_secret=client_secret
-        )
-        return spotipy.Spotify(auth_manager=auth_manager)
+        return create_spotify_client(client_id, client_secret)
     except Exception as e:
         st.error(f"❌ Error initializing Spotify client: {e}")
         return None
 
-def get_related_artists_spotify(spotify_client, artist_name: str) -> List[str]:
-    """Find related artists using Spotify API"""
-    artist_name = clean_artist_name(artist_name)
+def create_spotify_client(client_id: str, client_secret: str) -> spotipy.Spotify:
+    """Build a Spotify client on the shared session (also used outside Streamlit, e.g. benchmarks)"""
+    # Token and API calls share the rate-limited session; it also handles
+    # Retry-After and backoff, so spotipy's own retries are turned off
+    session = get_session(SPOTIFY)
+    auth_manager = SpotifyClientCredentials(
+        client_id=client_id,
+        client_secret=client_secret,
+        requests_session=session
+    )
+    # Endpoints can point at the offline stand-in server (METALWALL_PROVIDER_BASE)
+    auth_manager.OAUTH_TOKEN_URL = SPOTIFY_TOKEN_URL
+    client = spotipy.Spotify(auth_manager=auth_manager, requests_session=session,
+                             retries=0, status_retries=0)
+    client.prefix = SPOTIFY_API_PREFIX
+    return client
+
+def _is_fresh(timestamp: Optional[datetime], ttl: float) -> bool:
+    """Check whether a cached value is still within its TTL (seconds)"""
+    return timestamp is not None and datetime.now() - timestamp < timedelta(seconds=ttl)
+
+def remember_artists(artists: List[Dict]):
+    """Seed the resolver with full Spotify artist objects (IDs and genres come for free)"""
+    rows = []
+    for artist in artists:
+        key = normalize_artist_key(artist.get('name', ''))
+        if not key or not artist.get('id'):
+            continue
+        rows.append({'artist_key': key, 'artist_name': artist['name'],
+                     'spotify_id': artist['id'], 'genres': artist.get('genres')})
+        _artist_id_cache.set(key, {'spotify_id': artist['id'], 'artist_name': artist['name']})
+        if artist.get('genres') is not None:
+            _genre_cache.set(artist['id'], artist['genres'])
+    if rows:
+        save_spotify_artists(rows)
+
+def _lookup_known_artists(keys: List[str]) -> Dict[str, Dict]:
+    """Resolver entries from memory or SQLite only (no API calls)"""
+    known, missing = {}, []
+    for key in keys:
+        cached = _artist_id_cache.get(key)
+        if cached is not None:
+            known[key] = cached
+        else:
+            missing.append(key)
+
+    for key, stored in load_spotify_artists(missing).items():
+        ttl = SPOTIFY_ARTIST_TTL if stored['spotify_id'] else SPOTIFY_NEGATIVE_TTL
+        if not _is_fresh(stored['resolved_at'], ttl):
+            continue
+        entry = {'spotify_id': stored['spotify_id'], 'artist_name': stored['artist_name']}
+        _artist_id_cache.set(key, entry)
+        if stored['spotify_id'] and _is_fresh(stored['genres_fetched_at'], SPOTIFY_GENRES_TTL):
+            _genre_cache.set(stored['spotify_id'], stored['genres'])
+        known[key] = entry
+    return known
+
+@traced()
+def resolve_artist_id(spotify_client, artist_name: str) -> Optional[str]:
+    """Map an artist name to its Spotify ID once; later lookups come from the cache"""
+    name = clean_artist_name(artist_name)
+    key = normalize_artist_key(name)
+    if not key:
+        return None
+
+    known = _lookup_known_artists([key])
+    if key in known:
+        return known[key]['spotify_id']
+
+    if not spotify_client:
+        return None
     try:
-        if not spotify_client: return []
         # Use quotes for more precise matching
-        results = spotify_client.search(q=f'artist:"{artist_name}"', type="artist", limit=1)
+        results = spotify_client.search(q=f'artist:"{name}"', type="artist", limit=5)
         artists = results.get("artists", {}).get("items", [])
-        
-        if not artists: return []
-        
-        artist_id = artists[0]["id"]
-        related_artists = spotify_client.artist_related_artists(artist_id)
-        return [artist["name"] for artist in related_artists.get("artists", [])[:15]]
-    except:
-        return []
+    except Exception as e:
+        print(f"Error resolving Spotify artist {name}: {e}")
+        return None
+
+    # Only an exact name match counts (avoids "The Silver" resolving to "The Beatles")
+    match = next((a for a in artists if normalize_artist_key(a["name"]) == key), None)
+    if match:
+        remember_artists([match])
+        return match["id"]
 
+    # Negative cache: don't search for this name again for a while
+    save_spotify_artists([{'artist_key': key, 'artist_name': name, 'spotify_id': None}])
+    _artist_id_cache.set(key, {'spotify_id': None, 'artist_name': name}, ttl=SPOTIFY_NEGATIVE_TTL)
+    return None
+
+@traced()
+def get_artist_genres(spotify_client, artist_ids: List[str]) -> Dict[str, List[str]]:
+    """Genres by artist ID; uncached IDs are fetched in batches of 50 via artists()"""
+    genres, missing = {}, []
+    for artist_id in dict.fromkeys(artist_ids):
+        cached = _genre_cache.get(artist_id)
+        if cached is not None:
+            genres[artist_id] = cached
+        else:
+            missing.append(artist_id)
+
+    for artist_id, stored in load_spotify_genres(missing).items():
+        if _is_fresh(stored['genres_fetched_at'], SPOTIFY_GENRES_TTL):
+            genres[artist_id] = stored['genres']
+            _genre_cache.set(artist_id, stored['genres'])
+    missing = [artist_id for artist_id in missing if artist_id not in genres]
+
+    if spotify_client:
+        for i in range(0, len(missing), 50):
+            try:
+                response = spotify_client.artists(missing[i:i + 50])
+            except Exception as e:
+                print(f"Error fetching Spotify genres: {e}")
+                continue
+            fetched = {a["id"]: a.get("genres", []) for a in response.get("artists", []) if a}
+            for artist_id, artist_genres in fetched.items():
+                _genre_cache.set(artist_id, artist_genres)
+            genres.update(fetched)
+            save_spotify_genres(fetched)
+    return genres
+
+def prefetch_artist_genres(spotify_client, artist_names: List[str]) -> int:
+    """Batch-fetch genres for candidates whose Spotify ID is already known"""
+    keys = [normalize_artist_key(clean_artist_name(name)) for name in artist_names]
+    known = _lookup_known_artists([key for key in dict.fromkeys(keys) if key])
+    artist_ids = [entry['spotify_id'] for entry in known.values() if entry['spotify_id']]
+    return len(get_artist_genres(spotify_client, artist_ids))
+
+def get_spotify_cache_stats() -> Dict:
+    """Return hit/miss counters of the in-memory resolver and genre caches"""
+    return {'artist_ids': _artist_id_cache.stats(), 'genres': _genre_cache.stats()}
+
+@traced()
+def fetch_related_artists_spotify(spotify_client, artist_name: str) -> Optional[List[str]]:
+    """Find related artists using Spotify API; None when the lookup failed (not just empty)"""
+    if not spotify_client: return None
+    artist_id = resolve_artist_id(spotify_client, artist_name)
+    if not artist_id: return []
+
+    try:
+        related_artists = spotify_client.artist_related_artists(artist_id).get("artists", [])[:15]
+        # Related artists are full artist objects: seed their IDs and genres
+        remember_artists(related_artists)
+        return [artist["name"] for artist in related_artists]
+    except Exception as e:
+        print(f"Error getting related artists from Spotify: {e}")
+        return None
+
+def get_related_artists_spotify(spotify_client, artist_name: str) -> List[str]:
+    """Find related artists using Spotify API"""
+    return fetch_related_artists_spotify(spotify_client, artist_name) or []
+
+def _list_artist_albums(spotify_client, artist_id: str) -> List[Dict]:
+    """List an artist's own releases by ID, following pagination"""
+    albums = []
+    page = spotify_client.artist_albums(artist_id, album_type="album,single,compilation", limit=50)
+    for _ in range(SPOTIFY_ALBUM_PAGES):
+        if not page:
+            break
+        albums.extend(page.get("items", []))
+        page = spotify_client.next(page) if page.get("next") else None
+    return albums
+
+@traced()
 def get_random_album_by_artist(spotify_client, artist_name: str) -> Optional[Dict]:
     """Get a random album by an artist with strict name verification"""
-    clean_name = clean_artist_name(artist_name)
     try:
         if not spotify_client: return None
         
-        # 1. Search for albums by the exact artist name
-        results = spotify_client.search(q=f'artist:"{clean_name}"', type="album", limit=30)
-        albums = results.get("albums", {}).get("items", [])
-        if not albums: return None
+        # 1. Resolve the artist ID (cached after the first lookup)
+        artist_id = resolve_artist_id(spotify_client, artist_name)
+        if not artist_id: return None
         
-        # 2. Filter albums to ensure they actually belong to the target artist 
-        # (Avoids "The Silver" matching "The Beatles")
+        # 2. List albums by ID and keep the ones that really belong to the artist
         valid_albums = [
-            a for a in albums 
-            if any(clean_name.lower() == art["name"].lower() for art in a["artists"])
+            a for a in _list_artist_albums(spotify_client, artist_id)
+            if any(art["id"] == artist_id for art in a.get("artists", []))
         ]
-        
         if not valid_albums: return None
         random_album = random.choice(valid_albums)
+        artist = next(art for art in random_album["artists"] if art["id"] == artist_id)
         
-        # 3. Get full details including genres (which are on the Artist object, not Album)
-        album_id = random_album["id"]
-        album_details = spotify_client.album(album_id)
-        
-        # Fetch artist genres since album.genres is usually empty
-        artist_id = album_details["artists"][0]["id"]
-        artist_info = spotify_client.artist(artist_id)
+        # 3. Genres live on the Artist object (cached / batched)
+        genres = get_artist_genres(spotify_client, [artist_id]).get(artist_id, [])
         
         return {
-            "artist": album_details["artists"][0]["name"], # THE FIX: Get real name from Spotify
-            "album": album_details["name"],
-            "image": album_details["images"][0]["url"] if album_details.get("images") else None,
-            "url": album_details["external_urls"]["spotify"],
-            "release_date": album_details.get("release_date", "Unknown"),
-            "genres": artist_info.get("genres", [])
+            "artist": artist["name"],
+            "album": random_album["name"],
+            "image": random_album["images"][0]["url"] if random_album.get("images") else None,
+            "url": random_album["external_urls"]["spotify"],
+            "release_date": random_album.get("release_date", "Unknown"),
+            "total_tracks": random_album.get("total_tracks", 0),
+            "genres": genres
         }
     except Exception as e:
         print(f"Error: {e}")
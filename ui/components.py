@@ -6,7 +6,10 @@
 import streamlit as st
 from typing import List, Optional
 from datetime import datetime
+from services.cover_cache import get_cover_src
+from utils.render_profiler import profiled
 
+@profiled()
 def render_header():
     """Render the app header with login/logout button"""
     col1, col2 = st.columns([0.8, 0.2])
@@ -27,6 +30,7 @@ def render_header():
                 st.query_params['show_login'] = "true"
                 st.rerun()
 
+@profiled()
 def render_sidebar():
     """Render the sidebar with login form and navigation"""
     with st.sidebar:
@@ -99,6 +103,7 @@ def render_navigation():
     
     return page
 
+@profiled()
 def render_album_post(album, show_rank: bool = False, rank: Optional[int] = None):
     """Display an album post like Twitter/Mastodon with edit functionality"""
     # Check if current user can edit this post
@@ -118,7 +123,9 @@ def render_album_post(album, show_rank: bool = False, rank: Optional[int] = None
     
     with col1:
         if album.cover_url:
-            st.markdown(f'<a href="{album.url}" target="_blank" style="text-decoration: none;"><img src="{album.cover_url}" style="width:100%; border-radius:8px; object-fit:cover; height:180px;" class="clickable-image"></a>', 
+            # Local thumbnail when cached, original URL while it is being fetched
+            cover_src = get_cover_src(album.cover_url, 180)
+            st.markdown(f'<a href="{album.url}" target="_blank" style="text-decoration: none;"><img src="{cover_src}" style="width:100%; border-radius:8px; object-fit:cover; height:180px;" class="clickable-image"></a>', 
                        unsafe_allow_html=True)
         else:
             st.markdown('<div style="width:100%; height:180px; background:#333; border-radius:8px; display:flex; align-items:center; justify-content:center; color:#666;">No cover</div>', unsafe_allow_html=True)
@@ -251,6 +258,7 @@ def render_tag_buttons(tags: List[str], key_prefix: str):
                     st.session_state.active_filter_feed = tag
                     st.rerun()
 
+@profiled()
 def render_concert_post(concert):
     """Display a concert post with edit functionality"""
     # Check if current user can edit this concert
@@ -6,12 +6,17 @@
 import streamlit as st
 import webbrowser
 from typing import List
-from config import ADMIN_NAV_OPTIONS, USER_NAV_OPTIONS, SORT_OPTIONS
+from config import ADMIN_NAV_OPTIONS, USER_NAV_OPTIONS, SORT_OPTIONS, POST_PIPELINE_DEADLINE
 from ui.components import render_header, render_sidebar, render_album_post, render_concert_post
 from database.operations import load_albums, load_concerts, delete_past_concerts, save_album, save_concert, check_duplicate_url
-from services.metadata_extractor import extract_og_metadata
-from services.random_album import discover_random_album
+from services.metadata_extractor import extract_metadata, seed_url_metadata
+from services.random_album import discover_random_album, attach_bandcamp
+from services.artist_graph import on_album_posted
+from services.circuit_breaker import deadline_scope
+from services.cover_cache import get_cover_file
 from utils.helpers import process_tags, show_success_message
+from utils.tracing import start_trace
+from utils.render_profiler import profiled, set_rerun_page
 from admin.backup_tools import admin_backup_page
 from datetime import datetime
 
@@ -22,6 +27,7 @@ def main_page():
     
     # Render sidebar and get selected page
     page = render_sidebar()
+    set_rerun_page(page)
     
     # Route to appropriate page
     if page == "💿 Records":
@@ -42,6 +48,7 @@ def main_page():
 
 # ============ RECORDS PAGE ============
 
+@profiled()
 def records_page():
     """Records wall page"""
     st.subheader("💿 Records Wall")
@@ -165,6 +172,7 @@ def handle_album_submission(url: str, tags_input: str, is_manual: bool = False,
                 "Other",
                 tags
             ):
+                on_album_posted(artist)
                 show_success_message("✅ Album shared successfully!")
                 st.session_state.show_album_form = False
                 st.rerun()
@@ -177,19 +185,22 @@ def handle_album_submission(url: str, tags_input: str, is_manual: bool = False,
             return False
     else:
         if url:
-            with st.spinner("⏳ Extracting metadata..."):
-                metadata = extract_og_metadata(url)
-                if metadata:
-                    tags = process_tags(tags_input)
-                    if save_album(
+            with st.spinner("⏳ Extracting metadata..."), deadline_scope(POST_PIPELINE_DEADLINE):
+                with start_trace("post_album", url=url):
+                    metadata = extract_metadata(url)
+                    saved = bool(metadata) and save_album(
                         st.session_state.current_user,
                         url,
                         metadata['artist'],
                         metadata['album_name'],
                         metadata['cover_url'],
                         metadata['platform'],
-                        tags
-                    ):
+                        process_tags(tags_input)
+                    )
+                    if saved:
+                        on_album_posted(metadata['artist'])
+                if metadata:
+                    if saved:
                         show_success_message("✅ Album shared successfully!")
                         st.session_state.show_album_form = False
                         st.rerun()
@@ -204,6 +215,7 @@ def handle_album_submission(url: str, tags_input: str, is_manual: bool = False,
             st.warning("⚠️ Please paste a valid URL")
             return False
 
+@profiled()
 def render_albums_list():
     """Load and display albums with sorting and filtering"""
     albums = load_albums()
@@ -240,6 +252,7 @@ def render_albums_list():
 
 # ============ GIGS PAGE ============
 
+@profiled()
 def gigs_page():
     """Gigs page"""
     st.subheader("🎸 Gigs")
@@ -310,6 +323,7 @@ def render_concert_form():
             else:
                 st.warning("⚠️ Please complete all required fields (Bands, Date, Venue, City)")
 
+@profiled()
 def render_concerts_list():
     """Load and display concerts"""
     concerts = load_concerts()
@@ -325,6 +339,23 @@ def render_concerts_list():
 # File: metalwall_app/ui/pages.py
 # Update the random_album_page function
 
+# st.fragment (or its experimental predecessor) lets the Bandcamp check poll
+# without rerunning the whole page; older Streamlit just picks it up on the next rerun
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+def _bandcamp_link_status():
+    """Show the pending Bandcamp lookup and rerun the page once it resolves"""
+    discovery_data = st.session_state.get('random_discovery_data')
+    if not discovery_data or not discovery_data.get('bandcamp_pending'):
+        return
+    if attach_bandcamp(discovery_data):
+        st.rerun()
+    st.caption("🔎 Looking for this album on Bandcamp...")
+
+if _fragment:
+    _bandcamp_link_status = _fragment(run_every=2)(_bandcamp_link_status)
+
+@profiled()
 def random_album_page():
     """Random Album discovery page"""
     st.subheader("🎲 Random Album Discovery")
@@ -356,6 +387,7 @@ def random_album_page():
     # Display discovery if available
     if st.session_state.random_discovery_data:
         discovery_data = st.session_state.random_discovery_data
+        attach_bandcamp(discovery_data)
         
         # Discovery path
         st.markdown("<div class='discovery-path'>", unsafe_allow_html=True)
@@ -444,6 +476,9 @@ def random_album_page():
                     if st.session_state.current_user:
                         # Use the automatic post option with Spotify URL
                         url = discovery['url']
+                        # The discovery already holds the metadata: no need to fetch the page again
+                        seed_url_metadata(url, discovery['artist'], discovery['album'],
+                                          discovery.get('image'), 'Spotify')
                         
                         # NEW: Use the tags from the discovery data
                         if discovery_data.get('tags'):
@@ -461,6 +496,9 @@ def random_album_page():
                             st.error("❌ Failed to post to wall")
                     else:
                         st.warning("Please login to post to wall")
+            
+            if discovery_data.get('bandcamp_pending'):
+                _bandcamp_link_status()
         
         st.markdown("</div>", unsafe_allow_html=True)
         
@@ -475,7 +513,7 @@ def random_album_page():
             
             with col_base1:
                 if base_album.get('cover_url'):
-                    st.image(base_album['cover_url'], width=80)
+                    st.image(get_cover_file(base_album['cover_url'], 80) or base_album['cover_url'], width=80)
             
             with col_base2:
                 st.markdown(f"**{base_album.get('artist', 'Unknown')}**")
@@ -484,6 +522,7 @@ def random_album_page():
 
 # ============ PROFILE PAGE ============
 
+@profiled()
 def profile_page():
     """User profile page"""
     st.subheader("👤 Profile")
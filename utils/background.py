@@ -0,0 +1,92 @@
+# File: metalwall_app/utils/background.py
+# ===========================
+# BACKGROUND JOBS
+# ===========================
+
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from config import BACKGROUND_JOB_RETENTION
+from utils.metrics import register_collector
+
+# Process-wide job registry: name -> status dict
+_jobs: Dict[str, Dict] = {}
+_jobs_lock = threading.Lock()
+# Runs of evicted jobs by kind, so the runs counter never goes backwards
+_evicted_runs: Dict[str, int] = {}
+
+def _evict_finished_jobs():
+    """Drop per-key jobs that finished more than BACKGROUND_JOB_RETENTION ago (caller holds the lock)"""
+    cutoff = datetime.now() - timedelta(seconds=BACKGROUND_JOB_RETENTION)
+    expired = [name for name, job in _jobs.items()
+               if ':' in name and job['finished_at'] is not None and job['finished_at'] < cutoff]
+    for name in expired:
+        kind = name.split(':', 1)[0]
+        _evicted_runs[kind] = _evicted_runs.get(kind, 0) + _jobs.pop(name)['runs']
+
+def run_in_background(name: str, target: Callable, *args, **kwargs) -> bool:
+    """
+    Run `target(*args, **kwargs)` in a daemon thread.
+    Returns False (and starts nothing) if a job with the same name is still running.
+    """
+    with _jobs_lock:
+        _evict_finished_jobs()
+        previous = _jobs.get(name)
+        if previous and previous['state'] == 'running':
+            return False
+        _jobs[name] = {
+            'name': name,
+            'state': 'running',
+            'runs': (previous['runs'] if previous else 0) + 1,
+            'started_at': datetime.now(),
+            'finished_at': None,
+            'result': None,
+            'last_error': None
+        }
+
+    thread = threading.Thread(target=_run_job, args=(name, target, args, kwargs),
+                              name=f"job-{name}", daemon=True)
+    thread.start()
+    return True
+
+def _run_job(name: str, target: Callable, args: tuple, kwargs: dict):
+    """Execute a job and record its outcome in the registry"""
+    state, result, error = 'done', None, None
+    try:
+        result = target(*args, **kwargs)
+    except Exception as e:
+        print(f"Background job {name} failed: {e}")
+        state, error = 'failed', str(e)
+
+    with _jobs_lock:
+        _jobs[name].update(state=state, result=result, last_error=error, finished_at=datetime.now())
+
+def is_job_running(name: str) -> bool:
+    """Check whether a named job is currently running"""
+    with _jobs_lock:
+        job = _jobs.get(name)
+        return bool(job and job['state'] == 'running')
+
+def get_job_status(name: Optional[str] = None) -> List[Dict]:
+    """Return a snapshot of job statuses (all jobs, or those whose name starts with `name`)"""
+    with _jobs_lock:
+        return [dict(job) for job_name, job in _jobs.items() if name is None or job_name.startswith(name)]
+
+def _job_metrics() -> List[Dict]:
+    """Jobs by kind (the name up to the first ':') and state, and total runs"""
+    states: Dict[tuple, int] = {}
+    with _jobs_lock:
+        _evict_finished_jobs()
+        runs = dict(_evicted_runs)
+        for name, job in _jobs.items():
+            kind = name.split(':', 1)[0]
+            states[(kind, job['state'])] = states.get((kind, job['state']), 0) + 1
+            runs[kind] = runs.get(kind, 0) + job['runs']
+    return [
+        {'name': 'metalwall_background_jobs', 'type': 'gauge', 'help': 'Background jobs by kind and state',
+         'samples': [({'job': kind, 'state': state}, count) for (kind, state), count in states.items()]},
+        {'name': 'metalwall_background_job_runs_total', 'type': 'counter', 'help': 'Background job runs by kind',
+         'samples': [({'job': kind}, count) for kind, count in runs.items()]}
+    ]
+
+register_collector(_job_metrics)
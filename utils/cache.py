@@ -0,0 +1,108 @@
+# File: metalwall_app/utils/cache.py
+# ===========================
+# IN-MEMORY CACHING
+# ===========================
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+from utils.metrics import register_collector
+
+# Named caches, reported by the metrics collector below
+_named_caches: Dict[str, "TTLCache"] = {}
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a TTL (in seconds)"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600, name: Optional[str] = None):
+        if name:
+            _named_caches[name] = self
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry (marking it as recently used) or `default`"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store an entry, evicting the least recently used one when full"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        """Drop a single entry if present"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict:
+        """Return size and hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+# ============ CACHE METRICS ============
+
+# Hit/miss counts of caches that live in the database (url_metadata, bandcamp_links, ...)
+_lookups: Dict[tuple, int] = {}
+_lookups_lock = threading.Lock()
+
+def record_cache_lookup(cache: str, hit: bool):
+    """Count a lookup in a cache that isn't a TTLCache"""
+    key = (cache, 'hit' if hit else 'miss')
+    with _lookups_lock:
+        _lookups[key] = _lookups.get(key, 0) + 1
+
+def _cache_metrics() -> List[Dict]:
+    requests, sizes = [], []
+    for name, cache in list(_named_caches.items()):
+        requests.append(({'cache': name, 'result': 'hit'}, cache.hits))
+        requests.append(({'cache': name, 'result': 'miss'}, cache.misses))
+        sizes.append(({'cache': name}, len(cache)))
+    with _lookups_lock:
+        requests.extend(({'cache': cache, 'result': result}, count) for (cache, result), count in _lookups.items())
+    return [
+        {'name': 'metalwall_cache_requests_total', 'type': 'counter',
+         'help': 'Cache lookups by cache and result', 'samples': requests},
+        {'name': 'metalwall_cache_entries', 'type': 'gauge',
+         'help': 'Entries held by in-memory caches', 'samples': sizes}
+    ]
+
+register_collector(_cache_metrics)
@@ -7,6 +7,7 @@ import streamlit as st
 import re
 from datetime import datetime
 from typing import List
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 
 def verify_credentials(username: str, password: str) -> tuple[bool, str]:
     """Verify user credentials"""
@@ -75,6 +76,37 @@ def process_tags(tags_str: str) -> List[str]:
                 tags.append(tag)
     return tags[:5]
 
+def normalize_artist_key(artist_name: str) -> str:
+    """Normalize an artist name for use as a cache/lookup key"""
+    if not artist_name:
+        return ""
+    return " ".join(artist_name.casefold().split())
+
+# Query parameters that only track where a link was shared from
+TRACKING_PARAMS = {'si', 'fbclid', 'gclid', 'igshid', 'feature'}
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of a link for use as a cache key: lower-cased scheme and host,
+    no fragment, tracking parameters and trailing slash removed, query sorted.
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'https').lower()
+    host = parts.netloc.lower()
+    if host.endswith(':443') and scheme == 'https':
+        host = host[:-4]
+    path = parts.path.rstrip('/') or '/'
+    # Spotify regional prefixes (/intl-es/album/...) point at the same album
+    if host == 'open.spotify.com':
+        path = re.sub(r'^/intl-[\w-]+/', '/', path)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith('utm_')
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
 def show_success_message(message: str):
     """Show a success message and update session state"""
     st.session_state.success_message = message
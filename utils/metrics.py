@@ -0,0 +1,282 @@
+# File: metalwall_app/utils/metrics.py
+# ===========================
+# IN-PROCESS METRICS REGISTRY
+# ===========================
+"""
+Counters, gauges and histograms with labels, shared by the whole process.
+
+Modules declare their metrics once at import time and record into them:
+
+    HTTP_SECONDS = histogram("metalwall_http_request_seconds", "Provider request latency", ["provider"])
+    HTTP_SECONDS.observe(0.12, provider="spotify")
+
+Values that already live elsewhere (cache counters, job registry, pool depth)
+are exposed through collectors: callables run when the registry is read.
+The Admin Performance tab reads everything from here.
+"""
+
+import functools
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets (seconds): sub-millisecond SQLite reads up to full discovery pipelines
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 25.0, 60.0)
+
+COUNTER, GAUGE, HISTOGRAM = 'counter', 'gauge', 'histogram'
+
+class Metric:
+    """A named metric family; one value (or histogram) per label combination"""
+
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple:
+        # Called on every update: a length check and lookups, no set building
+        try:
+            if len(labels) == len(self.labelnames):
+                return tuple(str(labels[name]) for name in self.labelnames)
+        except KeyError:
+            pass
+        raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+
+    def samples(self) -> List[Tuple[Dict, object]]:
+        """(labels, value) pairs; histogram values are snapshots of their buckets"""
+        with self._lock:
+            items = list(self._values.items())
+        return [(dict(zip(self.labelnames, key)), self._snapshot(value)) for key, value in items]
+
+    def _snapshot(self, value):
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+class Counter(Metric):
+    kind = COUNTER
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+class Gauge(Metric):
+    kind = GAUGE
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    kind = HISTOGRAM
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts; the last slot is +Inf
+                state = self._values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            index = bisect_left(self.buckets, value)
+            state['counts'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def _snapshot(self, state):
+        return {'buckets': self.buckets, 'counts': list(state['counts']),
+                'sum': state['sum'], 'count': state['count']}
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the enclosed block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+# ============ REGISTRY ============
+
+_metrics: Dict[str, Metric] = {}
+_collectors: List[Callable[[], Iterable[Dict]]] = []
+_registry_lock = threading.Lock()
+
+def _get_or_create(cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> Metric:
+    with _registry_lock:
+        metric = _metrics.get(name)
+        if metric is None:
+            metric = _metrics[name] = cls(name, documentation, labelnames, **kwargs)
+        elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {name} already registered with a different type or labels")
+        return metric
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return _get_or_create(Counter, name, documentation, labelnames)
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return _get_or_create(Gauge, name, documentation, labelnames)
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return _get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+def register_collector(collector: Callable[[], Iterable[Dict]]):
+    """
+    Add a callable returning metric families computed on read:
+    {'name', 'type' (counter/gauge), 'help', 'samples': [(labels, value), ...]}
+    """
+    with _registry_lock:
+        if collector not in _collectors:
+            _collectors.append(collector)
+
+def collect() -> List[Dict]:
+    """Every metric family, registered and collected, sorted by name"""
+    with _registry_lock:
+        metrics = list(_metrics.values())
+        collectors = list(_collectors)
+    families = [{'name': m.name, 'type': m.kind, 'help': m.documentation, 'samples': m.samples()}
+                for m in metrics]
+    for collector in collectors:
+        try:
+            families.extend(collector())
+        except Exception as e:
+            print(f"Error collecting metrics from {getattr(collector, '__name__', collector)}: {e}")
+    return sorted(families, key=lambda family: family['name'])
+
+def get_family(name: str) -> Optional[Dict]:
+    return next((family for family in collect() if family['name'] == name), None)
+
+def timed(metric: Histogram, **labels) -> Callable:
+    """Decorator: observe every call's duration in `metric`"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with metric.time(**labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# ============ READING HISTOGRAMS ============
+
+def histogram_quantile(q: float, snapshot: Dict) -> Optional[float]:
+    """Estimate a quantile from bucket counts (linear within a bucket, like Prometheus)"""
+    total = snapshot['count']
+    if not total:
+        return None
+    rank = q * total
+    cumulative = 0
+    lower = 0.0
+    for bound, count in zip(snapshot['buckets'], snapshot['counts']):
+        if cumulative + count >= rank and count:
+            return lower + (bound - lower) * (rank - cumulative) / count
+        cumulative += count
+        lower = bound
+    # Falls in +Inf: the best we can say is "above the last bound"
+    return snapshot['buckets'][-1] if snapshot['buckets'] else math.nan
+
+def merge_histograms(snapshots: List[Dict]) -> Optional[Dict]:
+    """Add up histogram snapshots that share buckets (e.g. to drop a label)"""
+    if not snapshots:
+        return None
+    merged = {'buckets': snapshots[0]['buckets'], 'counts': [0] * len(snapshots[0]['counts']),
+              'sum': 0.0, 'count': 0}
+    for snapshot in snapshots:
+        merged['counts'] = [a + b for a, b in zip(merged['counts'], snapshot['counts'])]
+        merged['sum'] += snapshot['sum']
+        merged['count'] += snapshot['count']
+    return merged
+
+# ============ BASELINES ============
+#
+# Counters are never zeroed: Prometheus would see a counter reset. A view that wants
+# "since I pressed reset" keeps a baseline snapshot and reads differences from it.
+
+def _label_key(labels: Dict) -> Tuple:
+    return tuple(sorted(labels.items()))
+
+def snapshot_metrics() -> Dict[str, Dict[Tuple, object]]:
+    """Current counter and histogram values (collectors included), to use as a baseline"""
+    return {family['name']: {_label_key(labels): value for labels, value in family['samples']}
+            for family in collect() if family['type'] != GAUGE}
+
+def _subtract(value, before):
+    if isinstance(value, dict):
+        counts = [max(0, a - b) for a, b in zip(value['counts'], before['counts'])]
+        return {'buckets': value['buckets'], 'counts': counts,
+                'sum': max(0.0, value['sum'] - before['sum']), 'count': sum(counts)}
+    # A value below its baseline means the source itself started over
+    return value - before if value >= before else value
+
+def _family_samples(name: str, baseline: Optional[Dict] = None) -> List[Tuple[Dict, object]]:
+    """A family's samples, minus the baseline's values when one is given (gauges are left as they are)"""
+    family = get_family(name)
+    if not family:
+        return []
+    before = (baseline or {}).get(name)
+    if not before or family['type'] == GAUGE:
+        return family['samples']
+    samples = []
+    for labels, value in family['samples']:
+        key = _label_key(labels)
+        if key in before:
+            value = _subtract(value, before[key])
+        # Label sets with no activity since the baseline are left out, as if never seen
+        if (value['count'] if isinstance(value, dict) else value):
+            samples.append((labels, value))
+    return samples
+
+def summarize_histogram(name: str, by: Optional[str] = None, baseline: Optional[Dict] = None) -> Dict[str, Dict]:
+    """count/mean/p50/p95/p99 (in the metric's unit) of a histogram, grouped by one label"""
+    samples = _family_samples(name, baseline)
+    if not samples:
+        return {}
+    groups: Dict[str, List[Dict]] = {}
+    for labels, snapshot in samples:
+        groups.setdefault(labels.get(by, 'all') if by else 'all', []).append(snapshot)
+    return {group: summarize_snapshots(snapshots) for group, snapshots in groups.items()}
+
+def summarize_snapshots(snapshots: List[Dict]) -> Dict:
+    """count/mean/p50/p95/p99 of histogram snapshots added up (e.g. from several processes)"""
+    merged = merge_histograms(snapshots)
+    if not merged:
+        return {'count': 0, 'mean': None, 'p50': None, 'p95': None, 'p99': None}
+    return {
+        'count': merged['count'],
+        'mean': merged['sum'] / merged['count'] if merged['count'] else None,
+        'p50': histogram_quantile(0.50, merged),
+        'p95': histogram_quantile(0.95, merged),
+        'p99': histogram_quantile(0.99, merged)
+    }
+
+def sum_counter(name: str, by: Sequence[str] = (), baseline: Optional[Dict] = None) -> Dict[Tuple, float]:
+    """Counter (or gauge) values added up over every label not in `by`"""
+    totals: Dict[Tuple, float] = {}
+    for labels, value in _family_samples(name, baseline):
+        key = tuple(labels.get(label, '') for label in by)
+        totals[key] = totals.get(key, 0.0) + value
+    return totals
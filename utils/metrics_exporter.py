@@ -0,0 +1,122 @@
+# File: metalwall_app/utils/metrics_exporter.py
+# ===========================
+# PROMETHEUS METRICS EXPORT
+# ===========================
+"""
+Serves the metrics registry (utils/metrics.py) in the Prometheus text format
+from a side-car HTTP listener:
+
+    curl http://127.0.0.1:9464/metrics
+
+app.py calls start_metrics_server() on every rerun; only the first call in a
+process binds the port. Rendering happens only when the endpoint is scraped,
+so the hot paths pay nothing beyond the counter updates themselves.
+"""
+
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from config import METRICS_ENABLED, METRICS_HOST, METRICS_PORT
+from utils.metrics import HISTOGRAM, collect
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_server: Optional[ThreadingHTTPServer] = None
+_started = False
+_lock = threading.Lock()
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+def _labels(labels: Dict, extra: Optional[Dict] = None) -> str:
+    merged = {**labels, **(extra or {})}
+    if not merged:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in merged.items()) + '}'
+
+def _number(value: float) -> str:
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NaN'
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        if value.is_integer():
+            return str(int(value))
+    return repr(value)
+
+def render_prometheus(families: Optional[List[Dict]] = None) -> str:
+    """The registry (or the given families) in Prometheus text exposition format"""
+    lines = []
+    for family in families if families is not None else collect():
+        name = family['name']
+        lines.append(f"# HELP {name} {_escape_help(family['help'])}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for labels, value in family['samples']:
+            if family['type'] != HISTOGRAM:
+                lines.append(f"{name}{_labels(labels)} {_number(float(value))}")
+                continue
+            cumulative = 0
+            for bound, count in zip(value['buckets'], value['counts']):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, {'le': _number(float(bound))})} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels, {'le': '+Inf'})} {value['count']}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(float(value['sum']))}")
+            lines.append(f"{name}_count{_labels(labels)} {value['count']}")
+    return '\n'.join(lines) + '\n'
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics (anything else is a 404)"""
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/metrics', '/metrics/'):
+            self.send_error(404)
+            return
+        try:
+            body = render_prometheus().encode('utf-8')
+        except Exception as e:
+            print(f"Error rendering metrics: {e}")
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the Streamlit log
+        pass
+
+def start_metrics_server(host: str = METRICS_HOST, port: int = METRICS_PORT) -> bool:
+    """
+    Start the /metrics listener in a daemon thread, once per process.
+    Returns True if it is running. A port already in use (e.g. a second app
+    process on the same host) is reported once and not retried.
+    """
+    global _server, _started
+    if not METRICS_ENABLED:
+        return False
+    with _lock:
+        if _started:
+            return _server is not None
+        _started = True
+        try:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError as e:
+            print(f"Metrics endpoint not started on {host}:{port}: {e}")
+            return False
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="metrics-exporter", daemon=True).start()
+        print(f"Metrics endpoint on http://{host}:{port}/metrics")
+        return True
+
+def get_metrics_server_address() -> Optional[str]:
+    """host:port of the running listener, if any"""
+    if _server is None:
+        return None
+    host, port = _server.server_address[:2]
+    return f"{host}:{port}"
@@ -0,0 +1,245 @@
+# File: metalwall_app/utils/render_profiler.py
+# ===========================
+# RERUN RENDER PROFILER
+# ===========================
+"""
+Per-rerun timing for the Streamlit script.
+
+app.py wraps each run in `rerun_profile()`; page functions and the per-card
+renderers are decorated with `@profiled()` (or wrapped in `section(name)`).
+Timings are inclusive (a page includes its cards) and go into process-wide
+sample buffers, aggregated into percentiles for Admin Tools together with
+widget counts per page and the rerun rate of each session.
+
+An admin can ask for a cProfile capture of their own next rerun; the result
+is kept in their session for download. Each session also keeps running
+totals of its reruns (count, wall and script-thread CPU seconds).
+"""
+
+import cProfile
+import functools
+import io
+import math
+import os
+import pstats
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+import streamlit as st
+from config import RENDER_PROFILING_ENABLED, RENDER_PROFILE_SAMPLES, RENDER_RATE_WINDOW
+from utils.metrics import counter, histogram, register_collector
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:
+    get_script_run_ctx = None
+
+PROFILE_REQUEST_KEY = 'profile_next_rerun'
+PROFILE_RESULT_KEY = 'render_profile'
+SESSION_TOTALS_KEY = 'rerun_totals'
+
+# Per-rerun accumulator: {'page', 'sections': {name: [durations]}}
+_rerun: ContextVar = ContextVar('render_rerun', default=None)
+
+_lock = threading.Lock()
+_reruns: Dict[str, deque] = {}       # page -> total rerun durations (s)
+_sections: Dict[str, deque] = {}     # section -> durations of single calls (s)
+_section_calls: Dict[str, deque] = {}  # section -> calls per rerun
+_widgets: Dict[str, deque] = {}      # page -> widgets registered per rerun
+_sessions: Dict[str, deque] = {}     # session id -> rerun timestamps (monotonic)
+
+RERUN_SECONDS = histogram("metalwall_rerun_seconds", "Streamlit script run duration", ["page"])
+RERUNS = counter("metalwall_reruns_total", "Streamlit script runs", ["page"])
+RERUN_CPU_SECONDS = histogram("metalwall_rerun_cpu_seconds", "CPU time of the script thread per run", ["page"])
+
+def _samples(store: Dict[str, deque], key: str) -> deque:
+    if key not in store:
+        store[key] = deque(maxlen=RENDER_PROFILE_SAMPLES)
+    return store[key]
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0.0 for an empty sample)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+@contextmanager
+def section(name: str):
+    """Time a block of the current rerun (no-op outside a profiled rerun)"""
+    rerun = _rerun.get()
+    if rerun is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        rerun['sections'].setdefault(name, []).append(time.perf_counter() - started)
+
+def profiled(name: Optional[str] = None) -> Callable:
+    """Decorator: time every call of a render function as a section"""
+    def decorator(func: Callable) -> Callable:
+        section_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _rerun.get() is None:
+                return func(*args, **kwargs)
+            with section(section_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def set_rerun_page(page: str):
+    """Label the current rerun with the page it rendered"""
+    rerun = _rerun.get()
+    if rerun is not None:
+        rerun['page'] = page
+
+def _script_context():
+    try:
+        return get_script_run_ctx() if get_script_run_ctx else None
+    except Exception:
+        return None
+
+@contextmanager
+def rerun_profile():
+    """Profile one script run: total time, sections, widget count and rerun rate"""
+    capture = bool(st.session_state.get(PROFILE_REQUEST_KEY))
+    if capture:
+        st.session_state[PROFILE_REQUEST_KEY] = False
+    if not RENDER_PROFILING_ENABLED and not capture:
+        yield
+        return
+
+    rerun = {'page': 'unknown', 'sections': {}}
+    token = _rerun.set(rerun)
+    profiler = cProfile.Profile() if capture else None
+    started = time.perf_counter()
+    # CPU of this script thread only: not background jobs or discovery worker threads
+    cpu_started = time.thread_time()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+        elapsed = time.perf_counter() - started
+        cpu = time.thread_time() - cpu_started
+        _rerun.reset(token)
+        # st.rerun()/st.stop() end the run early; those partial runs are still worth counting
+        _record_rerun(rerun, elapsed, cpu)
+        _add_session_totals(elapsed, cpu)
+        if profiler:
+            st.session_state[PROFILE_RESULT_KEY] = _profile_result(profiler, rerun['page'], elapsed)
+
+def _record_rerun(rerun: Dict, elapsed: float, cpu: float):
+    ctx = _script_context()
+    widgets = getattr(ctx, 'widget_ids_this_run', None) if ctx else None
+    session_id = getattr(ctx, 'session_id', None) if ctx else None
+    now = time.monotonic()
+    RERUN_SECONDS.observe(elapsed, page=rerun['page'])
+    RERUN_CPU_SECONDS.observe(cpu, page=rerun['page'])
+    RERUNS.inc(page=rerun['page'])
+    with _lock:
+        page = rerun['page']
+        _samples(_reruns, page).append(elapsed)
+        if widgets is not None:
+            _samples(_widgets, page).append(len(widgets))
+        for name, durations in rerun['sections'].items():
+            _samples(_sections, name).extend(durations)
+            _samples(_section_calls, name).append(len(durations))
+        if session_id:
+            _samples(_sessions, session_id).append(now)
+        # Forget sessions that have been idle for a while
+        for key in [k for k, stamps in _sessions.items() if now - stamps[-1] > RENDER_RATE_WINDOW * 10]:
+            del _sessions[key]
+
+def _add_session_totals(elapsed: float, cpu: float):
+    totals = st.session_state.get(SESSION_TOTALS_KEY) or {'reruns': 0, 'seconds': 0.0, 'cpu_seconds': 0.0}
+    totals['reruns'] += 1
+    totals['seconds'] += elapsed
+    totals['cpu_seconds'] += cpu
+    st.session_state[SESSION_TOTALS_KEY] = totals
+
+def get_session_totals() -> Dict:
+    """This session's rerun count, wall seconds and script-thread CPU seconds"""
+    return dict(st.session_state.get(SESSION_TOTALS_KEY) or {'reruns': 0, 'seconds': 0.0, 'cpu_seconds': 0.0})
+
+def _profile_result(profiler: cProfile.Profile, page: str, elapsed: float) -> Dict:
+    """cProfile output as a text summary and a .prof file (for snakeviz / pstats)"""
+    text = io.StringIO()
+    stats = pstats.Stats(profiler, stream=text)
+    stats.sort_stats('cumulative').print_stats(40)
+    fd, path = tempfile.mkstemp(suffix='.prof')
+    os.close(fd)
+    try:
+        stats.dump_stats(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+    finally:
+        os.remove(path)
+    return {'page': page, 'elapsed': elapsed, 'summary': text.getvalue(), 'data': data,
+            'captured_at': time.strftime('%Y%m%d_%H%M%S')}
+
+def request_profile():
+    """Capture a cProfile of this session's next rerun"""
+    st.session_state[PROFILE_REQUEST_KEY] = True
+
+def get_render_stats() -> Dict:
+    """Percentiles (ms) per page and section, widget counts and per-session rerun rates"""
+    now = time.monotonic()
+    with _lock:
+        reruns = {page: list(samples) for page, samples in _reruns.items()}
+        sections = {name: list(samples) for name, samples in _sections.items()}
+        section_calls = {name: list(samples) for name, samples in _section_calls.items()}
+        widgets = {page: list(samples) for page, samples in _widgets.items()}
+        rates = [sum(1 for t in stamps if now - t <= RENDER_RATE_WINDOW) * 60.0 / RENDER_RATE_WINDOW
+                 for stamps in _sessions.values()]
+
+    def summary(samples: List[float]) -> Dict:
+        return {
+            'count': len(samples),
+            'p50_ms': percentile(samples, 50) * 1000,
+            'p95_ms': percentile(samples, 95) * 1000,
+            'p99_ms': percentile(samples, 99) * 1000,
+            'max_ms': max(samples) * 1000 if samples else 0.0
+        }
+
+    return {
+        'pages': {page: {**summary(samples),
+                         'widgets_last': widgets[page][-1] if widgets.get(page) else None,
+                         'widgets_max': max(widgets[page]) if widgets.get(page) else None}
+                  for page, samples in reruns.items()},
+        'sections': {name: {**summary(samples),
+                            'calls_per_rerun': sum(section_calls[name]) / len(section_calls[name])}
+                     for name, samples in sections.items()},
+        'sessions': {
+            'active': sum(1 for r in rates if r > 0),
+            'avg_reruns_per_min': sum(rates) / len(rates) if rates else 0.0,
+            'max_reruns_per_min': max(rates) if rates else 0.0
+        }
+    }
+
+def reset_render_stats():
+    with _lock:
+        for store in (_reruns, _sections, _section_calls, _widgets, _sessions):
+            store.clear()
+
+def _session_metrics() -> List[Dict]:
+    """Sessions that reran within the rate window"""
+    now = time.monotonic()
+    with _lock:
+        active = sum(1 for stamps in _sessions.values() if stamps and now - stamps[-1] <= RENDER_RATE_WINDOW)
+    return [{'name': 'metalwall_active_sessions', 'type': 'gauge',
+             'help': f'Sessions with a rerun in the last {RENDER_RATE_WINDOW} seconds',
+             'samples': [({}, active)]}]
+
+register_collector(_session_metrics)
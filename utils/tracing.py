@@ -0,0 +1,180 @@
+# File: metalwall_app/utils/tracing.py
+# ===========================
+# IN-PROCESS TRACING
+# ===========================
+"""
+Lightweight spans for the discovery and posting pipelines.
+
+A pipeline entry point opens a trace with `start_trace(name)`; inside it every
+`span(name)` (or `@traced()` function) records its start, duration, attributes
+and parent. Spans outside a trace cost a context-variable lookup and are not
+recorded, so instrumented helpers can be called from anywhere. Finished traces
+go to a ring buffer that Admin Tools shows as a waterfall and exports as JSON.
+
+The current span lives in a ContextVar: threads started with
+contextvars.copy_context().run (as the parallel candidate evaluation does)
+attach their spans to the right parent.
+"""
+
+import functools
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from config import TRACING_ENABLED, TRACE_BUFFER_SIZE, TRACE_MAX_SPANS
+
+class Trace:
+    """One pipeline run: its spans, in the order they started"""
+
+    def __init__(self, trace_id: int, name: str, attributes: Dict):
+        self.trace_id = trace_id
+        self.name = name
+        self.attributes = attributes
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.spans: List[Dict] = []
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def to_dict(self) -> Dict:
+        with self.lock:
+            spans = [dict(s) for s in self.spans]
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'attributes': self.attributes,
+            'started_at': self.started_at.isoformat(),
+            'duration_ms': self.duration_ms,
+            'dropped_spans': self.dropped,
+            'spans': spans
+        }
+
+# (trace, span dict) of the innermost open span
+_current: ContextVar = ContextVar('trace_span', default=None)
+_traces = deque(maxlen=TRACE_BUFFER_SIZE)
+_traces_lock = threading.Lock()
+_ids = itertools.count(1)
+
+def _open_span(trace: Trace, name: str, parent_id: Optional[int], attributes: Dict) -> Optional[Dict]:
+    record = {
+        'span_id': next(_ids),
+        'parent_id': parent_id,
+        'name': name,
+        # Offset from the start of the trace, so the waterfall needs no clock math
+        'start_ms': (time.perf_counter() - trace.start) * 1000,
+        'duration_ms': None,
+        'thread': threading.current_thread().name,
+        'attributes': attributes,
+        'error': None
+    }
+    with trace.lock:
+        if len(trace.spans) >= TRACE_MAX_SPANS:
+            trace.dropped += 1
+            return None
+        trace.spans.append(record)
+    return record
+
+def _close_span(trace: Trace, record: Dict, error: Optional[Exception]):
+    with trace.lock:
+        record['duration_ms'] = (time.perf_counter() - trace.start) * 1000 - record['start_ms']
+        if error is not None:
+            record['error'] = f"{type(error).__name__}: {error}"
+
+@contextmanager
+def start_trace(name: str, **attributes):
+    """
+    Open a trace around a pipeline run (a root span named `name`) and yield its
+    attribute dict. Nested inside another trace it behaves like a plain span.
+    """
+    if not TRACING_ENABLED or _current.get() is not None:
+        with span(name, **attributes) as record:
+            yield record
+        return
+
+    # The root span shares the trace's attribute dict, so results set on it show in listings
+    trace = Trace(next(_ids), name, attributes)
+    root = _open_span(trace, name, None, attributes)
+    token = _current.set((trace, root))
+    error = None
+    try:
+        yield attributes
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        _current.reset(token)
+        _close_span(trace, root, error)
+        trace.duration_ms = root['duration_ms']
+        with _traces_lock:
+            _traces.append(trace)
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Record a span under the current one. Yields the span's attribute dict (so
+    results can be added on the way out), or a throwaway dict outside a trace.
+    """
+    current = _current.get()
+    if current is None:
+        yield {}
+        return
+
+    trace, parent = current
+    record = _open_span(trace, name, parent['span_id'] if parent else None, attributes)
+    if record is None:
+        yield {}
+        return
+    token = _current.set((trace, record))
+    error = None
+    try:
+        yield record['attributes']
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        _current.reset(token)
+        _close_span(trace, record, error)
+
+def set_attribute(key: str, value):
+    """Add an attribute to the innermost open span (no-op outside a trace)"""
+    current = _current.get()
+    if current is not None and current[1] is not None:
+        current[1]['attributes'][key] = value
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator: run the function inside a span (named module.function by default)"""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def get_recent_traces(limit: Optional[int] = None, name: Optional[str] = None) -> List[Dict]:
+    """Finished traces, newest first (optionally only those with a given root name)"""
+    with _traces_lock:
+        traces = list(_traces)
+    traces.reverse()
+    if name:
+        traces = [t for t in traces if t.name == name]
+    return [t.to_dict() for t in traces[:limit]]
+
+def export_traces_json(limit: Optional[int] = None) -> str:
+    """Recent traces as a JSON document"""
+    return json.dumps({'exported_at': datetime.now().isoformat(),
+                       'traces': get_recent_traces(limit)}, indent=2, default=str)
+
+def clear_traces():
+    with _traces_lock:
+        _traces.clear()